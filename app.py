@@ -2,7 +2,16 @@ import streamlit as st
 import pandas as pd
 import os
 import time
+from datetime import datetime
+import pytz
 from minio import Minio
+from cities import CITIES, DEFAULT_CITY
+from calendar_dim import TIME_PLANS, Calendar, build_calendar, merge_holidays, plan_label, resolve_plan_time
+from lake_reader import GoldCache
+from spatial import SpatialIndex, allowed_categories, recommend_near
+from time_rules import RuleTable
+from trait_matrix import TraitMatrix
+from weather import WeatherForecast, weather_class
 
 # --- 1. KONFIGURASI DAN KONEKSI MINIO ---
 st.set_page_config(
@@ -15,32 +24,32 @@ MINIO_ACCESS_KEY = "minioadmin"
 MINIO_SECRET_KEY = "minioadmin"
 BUCKET_NAME = "datalake"
 
-# Path File Sementara di Container App
-FILE_RECS = "/tmp/recommendations.parquet"
-FILE_WEATHER = "/tmp/context_weather.parquet"
+# Objek gold yang dibaca dashboard (nama logis di pointer gold/_CURRENT.json)
+GOLD_NAMES = ["context_weather", "gold_archetype_category", "gold_calendar", "gold_holidays", "gold_location_index", "gold_rule_table", "gold_trait_matrix", "weather_forecast"]
+# Tabel besar: hanya footer yang dimuat, isinya dibaca per archetype + slot (pushdown row group)
+GOLD_LAZY_NAMES = ["recommendations"]
+# Kolom rekomendasi yang benar-benar dirender UI
+RECS_COLUMNS = ["nama_tempat", "kategori", "lat", "lon", "pesan_strategi", "warna_border"]
 
-def sync_data_from_lake():
+# Kota, timezone & titik awal "Lokasi Saya" (pusat kota) diambil dari registry cities.py
+
+@st.cache_resource
+def get_gold_cache():
     """
-    Fungsi ini bertugas mengambil data matang (Gold Layer) 
-    dari Data Lake (MinIO) ke lokal container agar bisa dibaca Pandas.
+    Satu GoldCache per proses Streamlit, dibagi semua sesi.
+    Data gold (Gold Layer) disimpan di memori; MinIO hanya dicek (stat pointer) sekali per TTL,
+    jadi ganti archetype / rencana waktu tidak memicu download apa pun.
     """
-    try:
-        client = Minio(
-            MINIO_ENDPOINT,
-            access_key=MINIO_ACCESS_KEY,
-            secret_key=MINIO_SECRET_KEY,
-            secure=False
-        )
-        if not client.bucket_exists(BUCKET_NAME):
-            return False, "Menunggu Pipeline..."
-            
-        client.fget_object(BUCKET_NAME, "gold/recommendations.parquet", FILE_RECS)
-        client.fget_object(BUCKET_NAME, "gold/context_weather.parquet", FILE_WEATHER)
-        return True, "Data Terupdate"
-    except Exception as e:
-        return False, f"Menunggu Koneksi... ({str(e)})"
+    client = Minio(
+        MINIO_ENDPOINT,
+        access_key=MINIO_ACCESS_KEY,
+        secret_key=MINIO_SECRET_KEY,
+        secure=False
+    )
+    return GoldCache(client, BUCKET_NAME, GOLD_NAMES, lazy_names=GOLD_LAZY_NAMES)
 
-db_status, db_msg = sync_data_from_lake()
+gold_cache = get_gold_cache()
+snapshot, (db_status, db_msg) = gold_cache.get()
 
 # --- 2. STYLE UI (DIPERTAHANKAN 100% SESUAI PERMINTAAN) ---
 st.markdown("""
@@ -145,28 +154,124 @@ ALL_POSSIBLE_ARCHETYPES = [
     "Religius", "Social Butterfly", "Sporty", "Techie"
 ]
 
-def load_data_recs():
-    """Membaca file Parquet Rekomendasi"""
+def load_available_cities():
+    """Kota yang punya partisi rekomendasi di snapshot ini (snapshot lama tanpa partisi city -> kosong)"""
     try:
-        return pd.read_parquet(FILE_RECS)
+        return snapshot.derive("cities", lambda s: s.table("recommendations").distinct("city"))
     except:
-        return pd.DataFrame()
+        return []
 
-def load_data_weather():
-    """Membaca file Parquet Cuaca"""
+def load_available_archetypes():
+    """Archetype yang ada di tabel Rekomendasi (hanya kolom archetype yang dibaca, sekali per snapshot)"""
     try:
-        df = pd.read_parquet(FILE_WEATHER)
+        return snapshot.derive("archetypes", lambda s: s.table("recommendations").distinct("archetype"))
+    except:
+        return []
+
+def city_filter(city):
+    return {"city": city} if city else {}
+
+def load_recs(city, archetype, slot):
+    """Rekomendasi satu archetype di satu slot: hanya partisi (kota, archetype, slot) & kolom yang dibutuhkan yang diambil dari MinIO"""
+    if not snapshot: return pd.DataFrame(columns=RECS_COLUMNS)
+    return snapshot.query("recommendations", columns=RECS_COLUMNS, archetype=archetype, **city_filter(city), **slot)
+
+def load_data_weather(city):
+    """Cuaca kota terpilih dari snapshot gold di memori"""
+    try:
+        df = snapshot.frame("context_weather")
+        if city and 'city' in df.columns: df = df[df['city'] == city]
         return df.iloc[0]['main'], df.iloc[0]['description'], df.iloc[0]['temp']
     except:
         return "Unknown", "Offline", 0
 
-# --- 4. LOGIKA DATA & STATE ---
-df_recs = load_data_recs()
-cuaca_main, cuaca_desc, suhu = load_data_weather()
+def build_snapshot_calendar(s):
+    # Snapshot lama belum punya gold_calendar -> dibangun dari gold_holidays
+    if not s.frame("gold_calendar").empty: return Calendar(s.frame("gold_calendar"))
+    return Calendar(build_calendar(merge_holidays(s.frame("gold_holidays"))))
+
+def load_calendar():
+    """Kalender (day_category efektif per tanggal) untuk menentukan slot, dibangun sekali per snapshot"""
+    try:
+        return snapshot.derive("calendar", build_snapshot_calendar)
+    except:
+        return Calendar()
+
+def load_forecast():
+    """Prakiraan cuaca per (kota, jam) dari pipeline, dibangun sekali per snapshot (snapshot lama -> kosong)"""
+    try:
+        return snapshot.derive("forecast", lambda s: WeatherForecast(s.frame("weather_forecast")))
+    except:
+        return WeatherForecast()
 
-if not df_recs.empty:
-    available_archs = sorted(df_recs['archetype'].unique().tolist())
-    if 'Global' in available_archs: available_archs.remove('Global')
+def load_rule_table():
+    """Grid rule 7x24 terkompilasi pipeline (fase sosial per slot), dibangun sekali per snapshot"""
+    try:
+        return snapshot.derive("rule_table", lambda s: RuleTable.from_frame(s.frame("gold_rule_table")))
+    except:
+        return None
+
+def build_archetype_categories(s):
+    df = s.frame("gold_archetype_category")
+    return df.groupby('archetype')['kategori'].agg(set).to_dict() if not df.empty else None
+
+def load_archetype_categories():
+    """Mapping archetype -> set kategori dari pipeline, dibangun sekali per snapshot (snapshot lama -> None)"""
+    try:
+        return snapshot.derive("archetype_categories", build_archetype_categories)
+    except:
+        return None
+
+def load_trait_matrix():
+    """Matriks archetype x trait (mode "deskripsikan dia"), dibangun sekali per snapshot (snapshot lama -> None)"""
+    try:
+        return snapshot.derive("trait_matrix", lambda s: TraitMatrix.from_frame(s.frame("gold_trait_matrix"), ALL_POSSIBLE_ARCHETYPES))
+    except:
+        return None
+
+def build_city_index(s, city):
+    # Index gabungan semua kota: tiap kota satu blok yang sudah terurut grid_cell
+    df = s.frame("gold_location_index")
+    if city and 'city' in df.columns: df = df[df['city'] == city].reset_index(drop=True)
+    return SpatialIndex(df)
+
+def load_location_index(city):
+    """Index spasial lokasi satu kota (sudah terurut grid_cell dari pipeline), dibangun sekali per snapshot"""
+    try:
+        return snapshot.derive(f"location_index:{city}", lambda s: build_city_index(s, city))
+    except:
+        return None
+
+# Slot waktu: rekomendasi sudah dihitung pipeline untuk semua (day_category, hour, weather_class)
+def city_now(timezone):
+    return datetime.now(pytz.timezone(timezone))
+
+def resolve_slot(when, calendar, weather_main, hourly=None):
+    """
+    Filter slot kubus untuk satu waktu; hari libur dianggap 'Minggu' (lookup dimensi kalender).
+    Kelas cuaca dari prakiraan jam itu kalau ada, kalau tidak dari cuaca sekarang.
+    """
+    day_category = calendar.day_category(when.date())
+    cls = hourly['weather_class'] if hourly else weather_class(weather_main)
+    return {"day_category": day_category, "hour": when.hour, "weather_class": cls}
+
+# --- 4. LOGIKA DATA & STATE ---
+# Kota: hanya yang ada di registry; pilihan dibaca dari session_state sebelum sidebar dirender
+opsi_kota = [c for c in load_available_cities() if c in CITIES]
+selected_city = st.session_state.get("city_selector")
+if selected_city not in opsi_kota: selected_city = opsi_kota[0] if opsi_kota else None
+city_info = CITIES.get(selected_city or DEFAULT_CITY, CITIES[DEFAULT_CITY])
+
+available_archs = load_available_archetypes()
+cuaca_main, cuaca_desc, suhu = load_data_weather(selected_city)
+calendar = load_calendar()
+forecast = load_forecast()
+rule_table = load_rule_table()
+trait_matrix = load_trait_matrix()
+loc_index = load_location_index(selected_city)
+
+if available_archs:
+    available_archs = [a for a in available_archs if a != 'Global']
     opsi_archetype = [a for a in ALL_POSSIBLE_ARCHETYPES if a in available_archs]
     if not opsi_archetype: opsi_archetype = ALL_POSSIBLE_ARCHETYPES
 else:
@@ -190,9 +295,23 @@ with st.sidebar:
     else:
         st.warning(f"🟡 {db_msg}")
         
+    if len(opsi_kota) > 1:
+        st.selectbox("Kota:", options=opsi_kota, index=opsi_kota.index(selected_city), key='city_selector',
+                     format_func=lambda slug: CITIES[slug]["name"])
+
     st.write("### Pilih Tipe Wanita Mu Hari Ini")
-    
-    if opsi_archetype:
+
+    # Mode "deskripsikan dia": archetype dipilih dari ciri yang diamati (cosine ke matriks trait, per interaksi)
+    describe = bool(trait_matrix) and st.checkbox("🔎 Deskripsikan dia, kami pilihkan tipenya", key='describe_mode')
+    if describe:
+        ciri = st.multiselect("Ciri yang kamu lihat:", options=trait_matrix.trait_names(), key='trait_selector')
+        ranked = [(a, score) for a, score in trait_matrix.match(ciri) if a in opsi_archetype]
+        if ranked:
+            st.session_state.selected_arch_state = ranked[0][0]
+            st.caption("Paling cocok: " + " · ".join(f"**{a}** {score:.0%}" for a, score in ranked[:3]))
+        else:
+            st.caption("Pilih beberapa ciri untuk mencocokkan tipenya.")
+    elif opsi_archetype:
         idx = 0
         if st.session_state.selected_arch_state in opsi_archetype:
             idx = opsi_archetype.index(st.session_state.selected_arch_state)
@@ -209,16 +328,28 @@ with st.sidebar:
 
     # Tombol Refresh Manual
     if st.button("🔄 Segarkan Data"):
-        sync_data_from_lake()
+        gold_cache.invalidate()
         st.rerun()
 
-    selected_arch = st.session_state.arch_selector if 'arch_selector' in st.session_state else "Sporty"
+    if describe: selected_arch = st.session_state.selected_arch_state
+    else: selected_arch = st.session_state.arch_selector if 'arch_selector' in st.session_state else "Sporty"
+
+    # Pilih slot lain langsung dari kubus yang sudah dimuat (tanpa menunggu pipeline)
+    plan_now = city_now(city_info["timezone"])
+    selected_plan = st.selectbox("Rencana Waktu:", options=TIME_PLANS, format_func=lambda plan: plan_label(plan, plan_now))
+
+    # Cari tempat terdekat dari posisi user (pakai index spasial gold_location_index)
+    with st.expander("📍 Lokasi Saya"):
+        near_me = st.checkbox("Tampilkan tempat terdekat", value=False, disabled=loc_index is None)
+        my_lat = st.number_input("Latitude", value=city_info["center"][0], format="%.5f")
+        my_lon = st.number_input("Longitude", value=city_info["center"][1], format="%.5f")
+        radius_km = st.slider("Radius (km)", min_value=0.5, max_value=10.0, value=2.0, step=0.5)
     st.markdown("---")
     st.info("**Status:** Saat ini kamu perlu mencari pasangan hidup‼️")
 
 # --- 6. DASHBOARD UTAMA ---
 st.title("Temu Loka Dashboard")
-st.markdown("### Rekomendasi Tempat untuk Menemukan Pasangan di Kota Banjarmasin")
+st.markdown(f"### Rekomendasi Tempat untuk Menemukan Pasangan di Kota {city_info['name']}")
 st.divider()
 
 c1, c2, c3 = st.columns(3)
@@ -231,24 +362,33 @@ else:
     c3.metric("💈 Pilih Area", "OUTDOOR MODE", "Aman", delta_color="normal")
 
 try:
-    if df_recs.empty:
+    if not available_archs:
         st.warning("⚠️ Data Kosong. Pipeline ELT sedang bekerja, silakan tunggu sebentar dan refresh.")
     else:
-        result = df_recs[df_recs['archetype'] == selected_arch]
+        plan_time = resolve_plan_time(selected_plan, plan_now)
+        hourly = forecast.at(selected_city, plan_time) if selected_city else None
+        slot = resolve_slot(plan_time, calendar, cuaca_main, hourly)
+        phase = rule_table.phase(slot["day_category"], slot["hour"]) if rule_table else None
+        if phase:
+            prakiraan = f" · prakiraan {hourly['description']} {hourly['temp']:.0f}°C" if hourly and selected_plan != TIME_PLANS[0] else ""
+            st.caption(f"🕒 {slot['day_category']} {slot['hour']:02d}:00 · {phase['phase_name']} "
+                       f"(kampus {phase['status_kampus']}, suasana {phase['status_sosial']}){prakiraan}")
+        result = load_recs(selected_city, selected_arch, slot)
         
         is_fallback = False
 
         if result.empty:
             is_fallback = True
-            result = df_recs[df_recs['archetype'] == 'Global']
+            result = load_recs(selected_city, 'Global', slot)
 
         if not result.empty:
+            recs_slot = result
             result = result.sample(frac=1).head(5) 
             
             hero = result.iloc[0]
 
             if is_fallback:
-                st.info(f"💡 Belum ada rekomendasi spesifik untuk **{selected_arch}**. Menampilkan **Rekomendasi Terpopuler** di Banjarmasin.")
+                st.info(f"💡 Belum ada rekomendasi spesifik untuk **{selected_arch}**. Menampilkan **Rekomendasi Terpopuler** di {city_info['name']}.")
 
             st.markdown(f"""
             <div class="rec-card" style="border-left: 6px solid {hero['warna_border']};">
@@ -271,6 +411,24 @@ try:
                 gmaps_url = f"https://www.google.com/maps?q={hero['lat']},{hero['lon']}"            
                 st.link_button("Buka Maps", gmaps_url, use_container_width=True)
 
+            if near_me and loc_index is not None:
+                arch_categories = load_archetype_categories()
+                if rule_table is not None and arch_categories is not None:
+                    near_categories = allowed_categories(rule_table, arch_categories, selected_arch, slot["day_category"], slot["hour"])
+                else:
+                    # Snapshot lama tanpa grid rule / mapping archetype -> kategori yang ada di rekomendasi slot ini
+                    near_categories = set(recs_slot['kategori'])
+                nearby = recommend_near(loc_index, near_categories, my_lat, my_lon, k=5, radius_m=radius_km * 1000)
+                st.markdown("---")
+                st.subheader("🧭 Terdekat dari Kamu")
+                if nearby.empty:
+                    st.caption(f"Tidak ada tempat yang cocok dalam radius {radius_km:g} km.")
+                else:
+                    st.map(nearby[['lat', 'lon']])
+                    for _, row in nearby.iterrows():
+                        near_url = f"https://www.google.com/maps?q={row['lat']},{row['lon']}"
+                        st.markdown(f"- [{row['nama_tempat']}]({near_url}) ({row['kategori']}) · {row['jarak_m'] / 1000:.1f} km")
+
             alternatives = result.iloc[1:]
             
             if not alternatives.empty:
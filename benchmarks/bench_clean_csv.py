@@ -0,0 +1,79 @@
+"""
+Benchmark clean_csv_quotes: versi lama (readlines + StringIO) vs stream per chunk.
+
+    python -m benchmarks.bench_clean_csv --rows 1000000
+
+Tiap varian dijalankan di subprocess terpisah supaya peak RSS tidak saling tercampur.
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.generators import generate_survey_csv
+
+
+def legacy_clean_csv_quotes(file_path):
+    """Salinan clean_csv_quotes sebelum versi streaming (pembanding)."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f: lines = f.readlines()
+    except UnicodeDecodeError:
+        with open(file_path, 'r', encoding='latin-1') as f: lines = f.readlines()
+    cleaned = []
+    for line in lines:
+        s = line.strip()
+        if s.startswith('"') and s.endswith('"'):
+            s = s[1:-1].replace('""', '"')
+        cleaned.append(s)
+    return io.StringIO("\n".join(cleaned))
+
+
+def run_variant(variant, path, chunksize):
+    t0 = time.perf_counter()
+    if variant == "legacy":
+        rows = len(pd.read_csv(legacy_clean_csv_quotes(path)))
+    else:
+        from elt_pipeline import clean_csv_quotes
+        rows = 0
+        with clean_csv_quotes(path) as stream:
+            for chunk in pd.read_csv(stream, chunksize=chunksize): rows += len(chunk)
+    wall = time.perf_counter() - t0
+    # ru_maxrss dalam KB di Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"variant": variant, "rows": rows, "wall_s": round(wall, 3), "peak_rss_mb": round(peak_mb, 1)}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--chunksize", type=int, default=50_000)
+    ap.add_argument("--path", default="/tmp/social_radar_bench/hasil_survey.csv")
+    ap.add_argument("--variant", choices=["legacy", "streaming"])
+    args = ap.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.path, args.chunksize)
+        return
+
+    os.makedirs(os.path.dirname(args.path), exist_ok=True)
+    print(f"Generating {args.rows} baris -> {args.path}")
+    generate_survey_csv(args.path, args.rows)
+    print(f"Ukuran file: {os.path.getsize(args.path) / 1e6:.1f} MB")
+
+    for variant in ["legacy", "streaming"]:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_clean_csv", "--variant", variant,
+             "--path", args.path, "--chunksize", str(args.chunksize)],
+            capture_output=True, text=True, check=True,
+        )
+        print(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
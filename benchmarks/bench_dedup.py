@@ -0,0 +1,59 @@
+"""
+Benchmark tahap lokasi: loop per elemen + groupby(lat, lon).size() lama vs parse kolumnar + dedup_venues.
+
+    python -m benchmarks.bench_dedup --venues 200000
+
+Selain waktu, dicetak jumlah baris yang masuk ke join rekomendasi dan sebaran score.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.generators import generate_osm_elements
+from elt_pipeline import parse_osm_elements
+from spatial import dedup_venues
+
+
+def legacy_locations(elements):
+    """Salinan parse + scoring sebelum dedup (pembanding)."""
+    rows = []
+    for el in elements:
+        tags = el.get("tags", {})
+        name = tags.get("name")
+        if not name: continue
+        cat = "other"
+        for k in ["amenity", "leisure", "shop", "tourism", "building"]:
+            if tags.get(k): cat = tags[k]; break
+        lat = el.get("lat") or el.get("center", {}).get("lat")
+        lon = el.get("lon") or el.get("center", {}).get("lon")
+        if lat and lon: rows.append({"nama_tempat": name, "kategori": cat, "lat": lat, "lon": lon})
+    df_loc = pd.DataFrame(rows)
+    return df_loc.groupby(['kategori', 'nama_tempat', 'lat', 'lon']).size().reset_index(name='score')
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--venues", type=int, default=200_000)
+    ap.add_argument("--dup-rate", type=float, default=0.4)
+    args = ap.parse_args()
+
+    elements = generate_osm_elements(args.venues, dup_rate=args.dup_rate)
+
+    t0 = time.perf_counter()
+    legacy = legacy_locations(elements)
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    parsed = parse_osm_elements(elements)
+    parse_s = time.perf_counter() - t0
+    venues = dedup_venues(parsed)
+    dedup_s = time.perf_counter() - t0 - parse_s
+
+    print(f"elements={len(elements):,} venues={args.venues:,}")
+    print(f"  legacy         : {legacy_s:.2f}s -> {len(legacy):,} baris, score>1: {(legacy['score'] > 1).sum():,}")
+    print(f"  parse + dedup  : {parse_s:.2f}s + {dedup_s:.2f}s -> {len(venues):,} baris, score>1: {(venues['score'] > 1).sum():,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark silver lokasi: json.load + parse_osm_elements sekaligus vs write_osm_parquet (streaming per batch).
+
+    python -m benchmarks.bench_osm_parse --venues 500000
+    python -m benchmarks.bench_osm_parse --venues 500000 --batch-rows 10000 --batch-rows 100000
+
+Tiap mode jalan di proses baru (spawn) supaya RSS puncak satu mode tidak terbawa ke mode lain.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+from benchmarks.generators import generate_osm_json
+from metrics import peak_rss_bytes
+
+
+def run_load(path, out_path, batch_rows):
+    from elt_pipeline import parse_osm_elements
+    with open(path, "r") as f: data = json.load(f)
+    df_loc = parse_osm_elements(data.get("elements", []))
+    df_loc.to_parquet(out_path, index=False)
+    return len(data.get("elements", [])), len(df_loc)
+
+
+def run_stream(path, out_path, batch_rows):
+    from elt_pipeline import write_osm_parquet
+    return write_osm_parquet(path, out_path, batch_rows=batch_rows)
+
+
+MODES = {"load": run_load, "stream": run_stream}
+
+
+def measure(mode, path, out_path, batch_rows):
+    """Dijalankan di proses anak: (elemen, lokasi, detik, RSS puncak setelah import, RSS puncak akhir)"""
+    import elt_pipeline  # noqa: F401 - biaya import tidak ikut diukur
+    rss0 = peak_rss_bytes()
+    t0 = time.perf_counter()
+    rows_in, rows_out = MODES[mode](path, out_path, batch_rows)
+    return rows_in, rows_out, time.perf_counter() - t0, rss0, peak_rss_bytes()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--venues", type=int, default=200_000)
+    ap.add_argument("--batch-rows", type=int, action="append", help="ukuran batch streaming (bisa diulang)")
+    ap.add_argument("--work-dir", default="/tmp/social_radar_bench/osm")
+    args = ap.parse_args()
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    path = os.path.join(args.work_dir, f"osm-{args.venues}.json")
+    if not os.path.exists(path): generate_osm_json(path, args.venues)
+    out_path = os.path.join(args.work_dir, "locations.parquet")
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"input {path}: {size_mb:.1f} MB")
+
+    runs = [("load", None)] + [("stream", b) for b in (args.batch_rows or [10_000])]
+    ctx = multiprocessing.get_context("spawn")
+    for mode, batch_rows in runs:
+        with ctx.Pool(1) as pool:
+            rows_in, rows_out, seconds, rss0, rss = pool.apply(measure, (mode, path, out_path, batch_rows))
+        label = mode + (f" (batch {batch_rows:,})" if batch_rows else "")
+        print(f"  {label:<24}: {seconds:6.2f}s  {rows_in / seconds:>10,.0f} elemen/s  {size_mb / seconds:6.1f} MB/s  "
+              f"RSS puncak {rss / 1e6:7.1f} MB (import {rss0 / 1e6:.0f} MB) -> {rows_out:,} lokasi")
+
+
+if __name__ == "__main__":
+    main()
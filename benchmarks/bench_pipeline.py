@@ -0,0 +1,215 @@
+"""
+Benchmark end-to-end run_elt_pipeline, sepenuhnya offline:
+  - input sintetis (hasil_survey.csv, respon Overpass, social_time_rules.csv, holidays.db) di-generate per --scale
+  - Google Sheets / GitHub raw / OpenWeather dilayani StubHTTPServer lokal, MinIO diganti MemoryObjectStore
+  - run "cold" (lake kosong), "warm" (input sama, semua stage harus skip), "incremental" (survey bertambah)
+
+Waktu per stage diambil dari run report metrics.RunMetrics. Tiap run ditambahkan sebagai satu baris JSON
+(beserta commit git) ke --results, supaya regresi bisa dibandingkan antar commit:
+
+    python -m benchmarks.bench_pipeline --scale 100k
+    python -m benchmarks.bench_pipeline --compare --scale 100k
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.fakes import MemoryObjectStore, StubHTTPServer
+from benchmarks.generators import (
+    forecast_payload, generate_holidays_db, generate_osm_json, generate_rules_csv, generate_survey_csv,
+)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# survey_rows = jumlah respon; venues = venue unik sebelum duplikat OSM (node + way)
+SCALES = {
+    "1k": {"survey_rows": 1_000, "venues": 1_000, "rule_phases": 3, "holiday_years": 1},
+    "10k": {"survey_rows": 10_000, "venues": 5_000, "rule_phases": 3, "holiday_years": 1},
+    "100k": {"survey_rows": 100_000, "venues": 20_000, "rule_phases": 4, "holiday_years": 2},
+    "1m": {"survey_rows": 1_000_000, "venues": 100_000, "rule_phases": 6, "holiday_years": 5},
+    "10m": {"survey_rows": 10_000_000, "venues": 500_000, "rule_phases": 8, "holiday_years": 10},
+}
+
+
+def _cached(path, build):
+    """Generate input sekali saja (survey 10M baris butuh beberapa menit); nama file memuat parameternya"""
+    if not os.path.exists(path):
+        t0 = time.perf_counter()
+        build(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        print(f"   🧪 {os.path.basename(path)}: {os.path.getsize(path) / 1e6:.1f} MB ({time.perf_counter() - t0:.1f}s)")
+    return path
+
+
+def prepare_inputs(data_dir, params, incremental_rows, seed):
+    os.makedirs(data_dir, exist_ok=True)
+    rows = params["survey_rows"]
+    # Seed sama -> file rows+N diawali rows baris yang identik, jadi run incremental = respon baru saja
+    return {
+        "survey": _cached(os.path.join(data_dir, f"survey-{rows}-{seed}.csv"), lambda p: generate_survey_csv(p, rows, seed)),
+        "survey_more": _cached(os.path.join(data_dir, f"survey-{rows + incremental_rows}-{seed}.csv"),
+                               lambda p: generate_survey_csv(p, rows + incremental_rows, seed)) if incremental_rows else None,
+        "lokasi": _cached(os.path.join(data_dir, f"osm-{params['venues']}-{seed}.json"),
+                          lambda p: generate_osm_json(p, params["venues"], seed)),
+        "rules": _cached(os.path.join(data_dir, f"rules-{params['rule_phases']}-{seed}.csv"),
+                         lambda p: generate_rules_csv(p, params["rule_phases"], seed)),
+        "holidays": _cached(os.path.join(data_dir, f"holidays-{params['holiday_years']}-{seed}.db"),
+                            lambda p: generate_holidays_db(p, params["holiday_years"], seed=seed)),
+    }
+
+
+def git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def stage_key(stage):
+    labels = stage.get("labels") or {}
+    return stage["name"] + (f"[{','.join(f'{k}={v}' for k, v in labels.items())}]" if labels else "")
+
+
+def run_once(pipeline, store, http, label, verbose):
+    sent, received = store.bytes_sent, store.bytes_received
+    http_sent, not_modified = http.bytes_sent, sum(http.not_modified.values())
+    t0 = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if not verbose: stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        report = pipeline.run_elt_pipeline()
+    wall = time.perf_counter() - t0
+    stages = {}
+    for s in report["stages"]:
+        stages[stage_key(s)] = {k: s[k] for k in ("wall_s", "cpu_s", "rows_in", "rows_out", "bytes", "bytes_uploaded") if k in s}
+    return {
+        "run": label, "status": report["status"], "wall_s": round(wall, 4), "cpu_s": round(report["cpu_s"], 4),
+        "peak_rss_mb": round(report["peak_rss_bytes"] / 1e6, 1), "stages": stages,
+        "store": {
+            "objects": len(store.objects), "bytes_stored": store.total_bytes(),
+            "bytes_put": store.bytes_received - received, "bytes_get": store.bytes_sent - sent,
+        },
+        "http": {"bytes_downloaded": http.bytes_sent - http_sent, "not_modified": sum(http.not_modified.values()) - not_modified},
+    }
+
+
+def run_benchmark(args):
+    params = dict(SCALES[args.scale])
+    if args.survey_rows: params["survey_rows"] = args.survey_rows
+    if args.venues: params["venues"] = args.venues
+    incremental_rows = args.incremental_rows if args.incremental_rows is not None else max(10, params["survey_rows"] // 100)
+    work_dir = os.path.abspath(args.work_dir)
+    print(f"⚙️ scale={args.scale} {params} incremental_rows={incremental_rows}")
+    inputs = prepare_inputs(os.path.join(work_dir, "data"), params, incremental_rows, args.seed)
+
+    # Lake & folder kerja selalu mulai kosong -> run pertama benar-benar cold
+    run_dir = os.path.join(work_dir, "run")
+    shutil.rmtree(run_dir, ignore_errors=True)
+    os.makedirs(os.path.join(run_dir, "cwd"))
+    shutil.copy(inputs["rules"], os.path.join(run_dir, "cwd", "social_time_rules.csv"))
+
+    store = MemoryObjectStore()
+    with StubHTTPServer(delay_s=args.http_delay) as http:
+        http.serve_file("/sheet.csv", inputs["survey"], "text/csv")
+        http.serve_file("/lokasi.json", inputs["lokasi"], "application/json")
+        http.routes["/forecast"] = (json.dumps(forecast_payload()).encode("utf-8"), "application/json")
+        # extract.py / elt_pipeline.py membaca env saat import -> env diset dulu, baru modulnya di-import
+        os.environ.update({
+            "SHEET_URL": http.url("/sheet.csv"), "LOKASI_URL": http.url("/lokasi.json"),
+            "OPENWEATHER_FORECAST_URL": http.url("/forecast"), "OPENWEATHER_API_KEY": "benchmark",
+            "HOLIDAYS_DB": inputs["holidays"], "EXTRACT_RETRY_BACKOFF": "0",
+            "PIPELINE_TEMP_DIR": os.path.join(run_dir, "tmp"),
+            "METRICS_PROM_FILE": os.path.join(run_dir, "metrics.prom"),
+            "LAKEHOUSE_DB": os.path.join(run_dir, "lakehouse.duckdb") if args.lakehouse else "",
+        })
+        sys.path.insert(0, REPO_DIR)
+        import elt_pipeline
+        elt_pipeline.client = store
+        os.chdir(os.path.join(run_dir, "cwd"))
+
+        plan = ["cold"] + ["warm"] * args.warm_runs + (["incremental"] if incremental_rows else [])
+        results = []
+        for label in plan:
+            if label == "incremental": http.serve_file("/sheet.csv", inputs["survey_more"], "text/csv")
+            result = run_once(elt_pipeline, store, http, label, args.verbose)
+            results.append(result)
+            print(f"   ⏱️ {label:<12} {result['wall_s']:8.2f}s  rss {result['peak_rss_mb']:7.1f} MB  "
+                  f"put {result['store']['bytes_put'] / 1e6:8.2f} MB  http {result['http']['bytes_downloaded'] / 1e6:7.2f} MB "
+                  f"({result['http']['not_modified']} x 304)  [{result['status']}]")
+            if args.verbose or args.stages:
+                for key, s in sorted(result["stages"].items(), key=lambda kv: -kv[1]["wall_s"]):
+                    print(f"        {key:<40} {s['wall_s']:8.3f}s")
+
+    meta = {
+        "commit": git_commit(), "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.scale, "params": params, "incremental_rows": incremental_rows, "seed": args.seed,
+        "lakehouse": bool(args.lakehouse), "http_delay": args.http_delay,
+        "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, "a", encoding="utf-8") as f:
+        for result in results: f.write(json.dumps({**meta, **result}) + "\n")
+    print(f"📝 {len(results)} run ditambahkan ke {args.results}")
+
+
+def compare(results_path, scale):
+    """Bandingkan commit terakhir dengan commit sebelumnya (median per run/stage) untuk satu scale"""
+    with open(results_path, encoding="utf-8") as f:
+        rows = [r for r in map(json.loads, f) if r["scale"] == scale]
+    commits = list(dict.fromkeys(r["commit"] for r in rows))
+    if len(commits) < 2:
+        print(f"Butuh hasil dari minimal 2 commit untuk scale {scale} (ada: {commits})")
+        return
+    base, head = commits[-2], commits[-1]
+
+    def median(values):
+        values = sorted(values)
+        return values[len(values) // 2] if values else None
+
+    def collect(commit):
+        out = {}
+        for r in rows:
+            if r["commit"] != commit: continue
+            out.setdefault((r["run"], "TOTAL"), []).append(r["wall_s"])
+            for key, s in r["stages"].items(): out.setdefault((r["run"], key), []).append(s["wall_s"])
+        return {k: median(v) for k, v in out.items()}
+
+    a, b = collect(base), collect(head)
+    print(f"scale={scale}: {base} -> {head}")
+    for key in sorted(set(a) | set(b)):
+        va, vb = a.get(key), b.get(key)
+        delta = f"{(vb - va) / va * 100:+7.1f}%" if va and vb is not None else "      -"
+        fmt = lambda v: f"{v:9.3f}s" if v is not None else "        -"
+        print(f"  {key[0]:<12} {key[1]:<40} {fmt(va)} {fmt(vb)} {delta}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", choices=list(SCALES), default="10k")
+    ap.add_argument("--survey-rows", type=int, help="override jumlah respon survey dari --scale")
+    ap.add_argument("--venues", type=int, help="override jumlah venue OSM dari --scale")
+    ap.add_argument("--incremental-rows", type=int, help="respon baru untuk run incremental (default 1%%, 0 = tanpa)")
+    ap.add_argument("--warm-runs", type=int, default=1)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--lakehouse", action="store_true", help="pakai DuckDB persisten (LAKEHOUSE_DB) alih-alih in-memory")
+    ap.add_argument("--http-delay", type=float, default=0.0, help="latensi buatan per request HTTP (detik)")
+    ap.add_argument("--work-dir", default="/tmp/social_radar_bench/pipeline")
+    ap.add_argument("--results", default=os.path.join(REPO_DIR, ".benchmarks", "pipeline.jsonl"))
+    ap.add_argument("--stages", action="store_true", help="tampilkan waktu per stage")
+    ap.add_argument("--verbose", action="store_true", help="tampilkan log pipeline")
+    ap.add_argument("--compare", action="store_true", help="bandingkan dua commit terakhir di --results")
+    args = ap.parse_args()
+    if args.compare: compare(args.results, args.scale)
+    else: run_benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark join archetype -> lokasi: rantai OR lama vs equi-join ke tabel archetype_category.
+
+    python -m benchmarks.bench_recs_join --locations 1000000
+
+Yang diukur hanya inti join (gold_features x gold_locations), karena itu bagian yang
+di-nested-loop oleh rantai OR; hasil kedua varian harus identik.
+"""
+import argparse
+import time
+
+import duckdb
+import pandas as pd
+
+from benchmarks.generators import generate_locations
+from elt_pipeline import SURVEY_ARCHETYPES, load_dimension_tables
+
+LEGACY_JOIN_SQL = """
+    SELECT t1.archetype, t2.nama_tempat, t2.kategori, t2.score
+    FROM gold_features t1
+    JOIN gold_locations t2 ON 
+        (
+            (t1.archetype = 'Sporty' AND t2.kategori IN ('gym', 'park', 'stadium', 'sports_centre')) OR
+            (t1.archetype = 'Religius' AND t2.kategori IN ('place_of_worship', 'mosque')) OR
+            (t1.archetype = 'Intellectual' AND t2.kategori IN ('library', 'university', 'book_store', 'school')) OR
+            (t1.archetype = 'Social Butterfly' AND t2.kategori IN ('cafe', 'food_court', 'restaurant', 'fast_food')) OR
+            (t1.archetype = 'Healing' AND t2.kategori IN ('park', 'garden', 'river_bank', 'viewpoint')) OR
+            (t1.archetype = 'Techie' AND t2.kategori IN ('electronics', 'computer_shop', 'cafe', 'coworking_space')) OR
+            (t1.archetype = 'Creative' AND t2.kategori IN ('arts_centre', 'gallery', 'museum', 'cafe')) OR
+            (t1.archetype = 'Active' AND t2.kategori IN ('park', 'playground', 'recreation_ground'))
+        )
+"""
+
+TABLE_JOIN_SQL = """
+    SELECT t1.archetype, t2.nama_tempat, t2.kategori, t2.score
+    FROM gold_features t1
+    JOIN archetype_category ac ON ac.archetype = t1.archetype
+    JOIN gold_locations t2 ON t2.kategori = ac.kategori
+"""
+
+
+def timed(con, sql, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = con.execute(f"SELECT archetype, kategori, COUNT(*), SUM(score) FROM ({sql}) GROUP BY ALL ORDER BY ALL").fetchall()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--locations", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df_loc = generate_locations(args.locations)
+    df_feat = pd.DataFrame({"archetype": SURVEY_ARCHETYPES, "count": 1})
+    con = duckdb.connect(":memory:")
+    load_dimension_tables(con)
+    con.execute("CREATE TABLE gold_locations AS SELECT * FROM df_loc")
+    con.execute("CREATE TABLE gold_features AS SELECT * FROM df_feat")
+
+    legacy_s, legacy_rows = timed(con, LEGACY_JOIN_SQL, args.repeat)
+    table_s, table_rows = timed(con, TABLE_JOIN_SQL, args.repeat)
+    assert legacy_rows == table_rows, "hasil join berbeda!"
+
+    n = sum(r[2] for r in table_rows)
+    print(f"locations={args.locations:,} joined_rows={n:,}")
+    print(f"  OR chain   : {legacy_s:.3f}s")
+    print(f"  equi-join  : {table_s:.3f}s  ({legacy_s / table_s:.1f}x)")
+    con.close()
+
+
+if __name__ == "__main__":
+    main()
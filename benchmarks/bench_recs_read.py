@@ -0,0 +1,97 @@
+"""
+Benchmark baca recommendations di dashboard:
+  legacy      : fget seluruh objek ke /tmp, read_parquet semua kolom, filter archetype + slot di Pandas
+  pushdown    : lake_reader.ParquetObject (range request, proyeksi kolom, skip row group via statistik)
+  partitioned : lake_reader.PartitionedDataset (layout Hive city/archetype/day_category/hour, hanya satu part diambil)
+
+    python -m benchmarks.bench_recs_read --per-slot 100
+
+Objek disimpan di object store in-memory supaya yang diukur hanya I/O yang diminta pembaca.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.fakes import MemoryObjectStore
+from benchmarks.generators import generate_recs_cube
+from elt_pipeline import RECS_PARTITION_BY
+from lake_reader import ParquetObject, PartitionedDataset
+from storage import partition_object_name, sha256_bytes, split_partitions, table_to_parquet_bytes
+
+ROW_GROUP = 1024
+
+UI_COLUMNS = ["nama_tempat", "kategori", "lat", "lon", "pesan_strategi", "warna_border"]
+SLOT = {"city": "banjarmasin", "archetype": "Sporty", "day_category": "Sabtu", "hour": 19, "weather_class": "Clear"}
+
+
+def legacy_read(store, name, tmp_path):
+    store.fget_object("datalake", name, tmp_path)
+    df = pd.read_parquet(tmp_path)
+    mask = pd.Series(True, index=df.index)
+    for c, v in SLOT.items(): mask &= df[c] == v
+    return df[mask]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--per-slot", type=int, default=100, help="jumlah tempat per (archetype, slot, cuaca)")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    df = generate_recs_cube(args.per_slot).assign(city=SLOT["city"])
+    store = MemoryObjectStore()
+    # Layout lama: urutan slot dulu, row group default; layout baru: urut archetype + row group kecil
+    legacy_df = df.sort_values(["day_category", "hour", "weather_class", "archetype", "rank_urutan"])
+    store.objects["legacy.parquet"] = table_to_parquet_bytes(legacy_df)
+    store.objects["sorted.parquet"] = table_to_parquet_bytes(df, row_group_size=ROW_GROUP)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    parts = []
+    for values, part in split_partitions(table, RECS_PARTITION_BY):
+        data = table_to_parquet_bytes(part)
+        name = partition_object_name("recommendations", RECS_PARTITION_BY, values, sha256_bytes(data))
+        store.objects[name] = data
+        parts.append({"path": name, "values": values, "rows": part.num_rows})
+    store.objects["recommendations.json"] = json.dumps({
+        "dataset": "recommendations", "partition_by": RECS_PARTITION_BY, "parts": parts,
+        "columns": [c for c in table.schema.names if c not in RECS_PARTITION_BY],
+    }).encode("utf-8")
+
+    tmp_path = os.path.join(tempfile.gettempdir(), "bench_recommendations.parquet")
+    store.bytes_sent = 0
+    t0 = time.perf_counter()
+    for _ in range(args.repeat): expected = legacy_read(store, "legacy.parquet", tmp_path)
+    legacy_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+    legacy_bytes = store.bytes_sent / args.repeat
+
+    obj = ParquetObject(store, "datalake", "sorted.parquet")
+    footer_bytes = obj.source.bytes_read
+    store.bytes_sent = 0
+    t0 = time.perf_counter()
+    for _ in range(args.repeat): got = obj.read(UI_COLUMNS, **SLOT)
+    pushdown_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+    pushdown_bytes = store.bytes_sent / args.repeat
+    assert sorted(got["nama_tempat"]) == sorted(expected["nama_tempat"]), "hasil berbeda!"
+
+    dataset = PartitionedDataset(store, "datalake", "recommendations.json")
+    store.bytes_sent = 0
+    t0 = time.perf_counter()
+    for _ in range(args.repeat): got = dataset.read(UI_COLUMNS, **SLOT)
+    part_ms = (time.perf_counter() - t0) * 1000 / args.repeat
+    part_bytes = store.bytes_sent / args.repeat
+    assert sorted(got["nama_tempat"]) == sorted(expected["nama_tempat"]), "hasil berbeda!"
+
+    print(f"rows={len(df):,} object={len(store.objects['sorted.parquet']) / 1e6:.1f} MB "
+          f"row_groups={obj.metadata.num_row_groups} dibaca={len(obj.row_groups(SLOT))}")
+    print(f"  legacy   : {legacy_ms:.1f} ms/request, {legacy_bytes / 1e6:.2f} MB/request")
+    print(f"  pushdown : {pushdown_ms:.1f} ms/request, {pushdown_bytes / 1e6:.3f} MB/request (+ footer {footer_bytes / 1e3:.0f} KB sekali)")
+    print(f"  partisi  : {part_ms:.1f} ms/request, {part_bytes / 1e6:.3f} MB/request "
+          f"({len(parts)} partisi, manifest {len(store.objects['recommendations.json']) / 1e3:.0f} KB sekali)")
+
+
+if __name__ == "__main__":
+    main()
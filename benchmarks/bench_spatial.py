@@ -0,0 +1,72 @@
+"""
+Benchmark query "near me": index grid (spatial.SpatialIndex) vs scan haversine semua baris.
+
+    python -m benchmarks.bench_spatial --locations 1000000 --spread 1.0
+
+Titik query diambil acak dari sekitar pusat data; hasil index dicek sama dengan brute force.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.generators import generate_locations
+from spatial import SpatialIndex, haversine_m
+
+
+def brute_force(df, lat, lon, k, radius_m, categories):
+    dist = haversine_m(lat, lon, df['lat'].to_numpy(), df['lon'].to_numpy())
+    mask = (dist <= radius_m) & df['kategori'].isin(categories).to_numpy()
+    idx = np.flatnonzero(mask)
+    return set(df['nama_tempat'].to_numpy()[idx[np.argsort(dist[idx], kind='stable')[:k]]])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--locations", type=int, default=1_000_000)
+    ap.add_argument("--spread", type=float, default=1.0, help="sebaran titik dalam derajat (0.03 = kota, 1.0 = provinsi)")
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--radius", type=float, default=2000)
+    ap.add_argument("--k", type=int, default=5)
+    args = ap.parse_args()
+
+    df = generate_locations(args.locations, spread_deg=args.spread)
+    categories = {"cafe", "park", "library"}
+
+    t0 = time.perf_counter()
+    index = SpatialIndex(df)
+    build_s = time.perf_counter() - t0
+
+    rng = np.random.default_rng(7)
+    points = np.column_stack([-3.32 + rng.normal(0, args.spread / 2, args.queries),
+                              114.59 + rng.normal(0, args.spread / 2, args.queries)])
+
+    t0 = time.perf_counter()
+    found = 0
+    for lat, lon in points:
+        found += len(index.nearest_positions(lat, lon, k=args.k, radius_m=args.radius, categories=categories)[0])
+    index_ms = (time.perf_counter() - t0) * 1000 / args.queries
+
+    t0 = time.perf_counter()
+    for lat, lon in points:
+        index.nearest(lat, lon, k=args.k, radius_m=args.radius, categories=categories)
+    frame_ms = (time.perf_counter() - t0) * 1000 / args.queries
+
+    # Brute force cukup di sebagian kecil titik (lambat), sekaligus cek kebenaran
+    sample = points[:20]
+    t0 = time.perf_counter()
+    for lat, lon in sample:
+        expected = brute_force(df, lat, lon, args.k, args.radius, categories)
+        got = set(index.nearest(lat, lon, k=args.k, radius_m=args.radius, categories=categories)['nama_tempat'])
+        assert got == expected, "hasil index berbeda dengan brute force!"
+    brute_ms = (time.perf_counter() - t0) * 1000 / len(sample)
+
+    print(f"locations={args.locations:,} spread={args.spread}° radius={args.radius:.0f}m k={args.k}")
+    print(f"  build index : {build_s:.2f}s")
+    print(f"  grid index  : {index_ms:.3f} ms/query (rata-rata {found / args.queries:.1f} hasil)")
+    print(f"  + DataFrame : {frame_ms:.3f} ms/query")
+    print(f"  brute force : {brute_ms:.1f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Pengganti MinIO dan sumber HTTP untuk benchmark offline.
+
+MemoryObjectStore meniru subset API minio.Minio yang dipakai pipeline dan dashboard; StubHTTPServer
+melayani file sumber lewat HTTP lokal sungguhan (extract.py tetap lewat requests, URL-nya saja yang diarahkan).
+"""
+import hashlib
+import io
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytz
+
+
+class NoSuchKey(Exception):
+    pass
+
+
+class _Response(io.BytesIO):
+    def release_conn(self): pass
+
+    @property
+    def data(self): return self.getvalue()
+
+
+class _ObjectInfo:
+    def __init__(self, object_name, data):
+        self.object_name = object_name
+        self.size = len(data)
+        self.etag = hashlib.md5(data).hexdigest()
+        self.last_modified = datetime.now(pytz.utc)
+
+
+class MemoryObjectStore:
+    """
+    Object store in-memory (satu namespace, nama bucket diabaikan) dengan hitungan byte:
+    bytes_sent = dibaca klien (get/fget, termasuk range request), bytes_received = ditulis klien.
+    """
+    def __init__(self):
+        self.objects = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        with self._lock:
+            self.requests += 1
+            if name not in self.objects: raise NoSuchKey(name)
+            return self.objects[name]
+
+    def _put(self, name, data):
+        with self._lock:
+            self.requests += 1
+            self.objects[name] = data
+            self.bytes_received += len(data)
+
+    def bucket_exists(self, bucket): return True
+    def make_bucket(self, bucket): pass
+
+    def put_object(self, bucket, name, data, length, **kwargs):
+        self._put(name, data.read(length) if length >= 0 else data.read())
+
+    def fput_object(self, bucket, name, path, **kwargs):
+        with open(path, "rb") as f: self._put(name, f.read())
+
+    def get_object(self, bucket, name, offset=0, length=0, **kwargs):
+        data = self._get(name)
+        data = data[offset:offset + length] if length else data[offset:]
+        self.bytes_sent += len(data)
+        return _Response(data)
+
+    def fget_object(self, bucket, name, path, **kwargs):
+        data = self._get(name)
+        with open(path, "wb") as f: f.write(data)
+        self.bytes_sent += len(data)
+
+    def stat_object(self, bucket, name, **kwargs):
+        return _ObjectInfo(name, self._get(name))
+
+    def list_objects(self, bucket, prefix="", recursive=False, **kwargs):
+        with self._lock:
+            items = sorted((n, d) for n, d in self.objects.items() if n.startswith(prefix))
+        return [_ObjectInfo(n, d) for n, d in items]
+
+    def remove_object(self, bucket, name, **kwargs):
+        with self._lock: self.objects.pop(name, None)
+
+    def total_bytes(self):
+        return sum(len(d) for d in self.objects.values())
+
+
+class StubHTTPServer:
+    """
+    HTTP lokal di thread daemon: routes = {path: (bytes, content_type)}, bisa diganti saat jalan.
+    delay_s mensimulasikan latensi jaringan per request. Tiap respon membawa ETag (md5 body);
+    If-None-Match yang cocok dijawab 304 tanpa body (dihitung di not_modified).
+
+        with StubHTTPServer({"/sheet.csv": (data, "text/csv")}) as http:
+            os.environ["SHEET_URL"] = http.url("/sheet.csv")
+    """
+    def __init__(self, routes=None, delay_s=0.0):
+        self.routes = dict(routes or {})
+        self.delay_s = delay_s
+        self.hits = {}
+        self.not_modified = {}
+        self.bytes_sent = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                stub.hits[path] = stub.hits.get(path, 0) + 1
+                if stub.delay_s: time.sleep(stub.delay_s)
+                if path not in stub.routes:
+                    self.send_error(404)
+                    return
+                body, content_type = stub.routes[path]
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    stub.not_modified[path] = stub.not_modified.get(path, 0) + 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+                stub.bytes_sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def serve_file(self, path, file_path, content_type="application/octet-stream"):
+        with open(file_path, "rb") as f: self.routes[path] = (f.read(), content_type)
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
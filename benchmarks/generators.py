@@ -0,0 +1,189 @@
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+
+# --- GENERATOR DATA SINTETIS (bentuknya mengikuti hasil_survey.csv) ---
+SURVEY_PREFIXES = ["intel", "creative", "social", "sporty", "techie", "relig", "mini", "active"]
+SURVEY_COLUMNS = (
+    ["timestamp", "gender"]
+    + [f"{p}_fisik_cowo" for p in SURVEY_PREFIXES]
+    + [f"{p}_fisik_cewe" for p in SURVEY_PREFIXES]
+    + [f"{p}_lokasi" for p in SURVEY_PREFIXES]
+)
+
+TRAITS = [
+    "Kaca mata", "Baju Kemeja / Berkerah / Rapi", "Batik", "Hijab Syar'i", "Kaosan", "Celana Jeans",
+    "Menggunakan Rok/Celana Kain Panjang", "Flatshoes", "Sepatu Sneaker / Running", "Tote Bag",
+    "Tas Laptop", "Tas Ransel", "Rambut Diikat Satu", "Rambut Digerai Rapi", "Menggunakan Headphone",
+    "Membawa Buku/Laptop Tebal", "Makeup Natural", "Tanpa Makeup", "Aktif Ikut Organisasi",
+    "Aktif Ikut Seminar", "Baju Oversize", "Membawa Kamera Analog", "Jersey Olahraga", "Smartwatch",
+]
+HABITATS = [
+    "Kampus", "Perpustakaan", "Toko Buku", "Museum", "Cafe", "Restoran", "Mall", "Taman Kota",
+    "Tempat Ibadah", "Gym", "Art Gallery", "Thrift Shop", "Car Free Day",
+]
+
+
+def _multi(rng, vocab, lo, hi):
+    return ", ".join(rng.sample(vocab, rng.randint(lo, hi)))
+
+
+def iter_survey_rows(rows, seed=42, start=datetime(2025, 12, 1, 8, 0, 0)):
+    """Yield baris survey sintetis (list kolom), timestamp naik per respon."""
+    rng = random.Random(seed)
+    ts = start
+    for _ in range(rows):
+        ts += timedelta(seconds=rng.randint(1, 90))
+        row = [ts.strftime("%m/%d/%Y %H:%M:%S"), rng.choice(["Laki-laki", "Perempuan"])]
+        # Kolom fisik kadang kosong, sama seperti respon asli
+        row += [_multi(rng, TRAITS, 2, 8) if rng.random() > 0.2 else "" for _ in range(16)]
+        row += [_multi(rng, HABITATS, 1, 4) for _ in range(8)]
+        yield row
+
+
+def generate_survey_csv(path, rows, seed=42):
+    """Tulis CSV format Google Sheet: header biasa, tiap baris data dibungkus quote."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(SURVEY_COLUMNS) + "\n")
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="")
+        for row in iter_survey_rows(rows, seed):
+            buf.seek(0); buf.truncate()
+            w.writerow(row)
+            f.write('"' + buf.getvalue().replace('"', '""') + '"\n')
+    return path
+
+
+LOCATION_CATEGORIES = [
+    "cafe", "restaurant", "fast_food", "food_court", "park", "garden", "mosque", "place_of_worship",
+    "library", "university", "school", "book_store", "museum", "gallery", "arts_centre", "gym",
+    "stadium", "sports_centre", "playground", "recreation_ground", "electronics", "computer_shop",
+    "coworking_space", "mall", "clothes", "viewpoint", "river_bank", "pharmacy", "bank", "fuel",
+]
+
+
+def generate_locations(rows, seed=42, spread_deg=0.03):
+    """
+    DataFrame lokasi sintetis berbentuk gold_locations (nama_tempat, lat, lon, kategori, score).
+    spread_deg ~0.03 = skala kota Banjarmasin, ~1.0 = skala provinsi Kalsel.
+    """
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "nama_tempat": [f"Tempat {i}" for i in range(rows)],
+        "lat": -3.32 + rng.normal(0, spread_deg, rows),
+        "lon": 114.59 + rng.normal(0, spread_deg, rows),
+        "kategori": rng.choice(LOCATION_CATEGORIES, rows),
+        "score": rng.integers(1, 6, rows),
+    })
+
+
+def generate_osm_elements(venues, seed=42, dup_rate=0.4, jitter_m=30, spread_deg=0.03):
+    """
+    Elemen Overpass sintetis: tiap venue muncul sebagai node dan kadang juga way (center) dengan
+    koordinat bergeser <= jitter_m -- pola duplikat yang ada di lokasi_bjm.json asli.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    lat = -3.32 + rng.normal(0, spread_deg, venues)
+    lon = 114.59 + rng.normal(0, spread_deg, venues)
+    kategori = rng.choice(LOCATION_CATEGORIES, venues)
+    jitter_deg = jitter_m / 111_320
+    elements = []
+    for v in range(venues):
+        tags = {"amenity": str(kategori[v]), "name": f"{str(kategori[v]).title()} {v}"}
+        elements.append({"type": "node", "id": len(elements), "lat": float(lat[v]), "lon": float(lon[v]), "tags": tags})
+        while rng.random() < dup_rate:
+            dlat, dlon = rng.uniform(-jitter_deg, jitter_deg, 2) / 2
+            elements.append({"type": "way", "id": len(elements), "tags": dict(tags),
+                             "center": {"lat": float(lat[v] + dlat), "lon": float(lon[v] + dlon)}})
+    return elements
+
+
+def generate_recs_cube(places_per_slot=10, seed=42):
+    """Tabel berbentuk gold recommendations: archetype x day_category x hour x weather_class x peringkat."""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    archetypes = ["Active", "Creative", "Healing", "Intellectual", "Religius", "Social Butterfly", "Sporty", "Techie"]
+    days = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+    idx = pd.MultiIndex.from_product(
+        [archetypes, days, range(24), ["Rain", "Clear"], range(1, places_per_slot + 1)],
+        names=["archetype", "day_category", "hour", "weather_class", "rank_urutan"],
+    ).to_frame(index=False)
+    n = len(idx)
+    idx["hour"] = idx["hour"].astype("int32")
+    idx["nama_tempat"] = [f"Tempat {i}" for i in rng.integers(0, 50_000, n)]
+    idx["kategori"] = rng.choice(LOCATION_CATEGORIES, n)
+    idx["lat"] = -3.32 + rng.normal(0, 0.03, n)
+    idx["lon"] = 114.59 + rng.normal(0, 0.03, n)
+    idx["score"] = rng.integers(1, 10, n)
+    idx["metode"] = "Personalized"
+    idx["pesan_strategi"] = "Strategi : Cuaca mendukung. Segera meluncur!"
+    idx["warna_border"] = "#f9a8d4"
+    return idx
+
+
+def generate_osm_json(path, venues, seed=42, **kwargs):
+    """Tulis file berbentuk respon Overpass ({"elements": [...]}) seperti lokasi_bjm.json."""
+    import json
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": 0.6, "generator": "benchmarks", "elements": generate_osm_elements(venues, seed, **kwargs)}, f)
+    return path
+
+
+DAYS = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+RULE_PRIORITIES = HABITATS + ["Rumah", "Kost", "Hotel", "Restoran", "Coworking Space"]
+
+
+def generate_rules_csv(path, phases_per_day=3, seed=42):
+    """
+    social_time_rules.csv sintetis: tiap hari dibagi phases_per_day fase berurutan (0-24 jam),
+    baris dibungkus quote dan rekomendasi_prioritas multi-value seperti file asli.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("day_category,start_hour,end_hour,phase_name,status_kampus,status_sosial,rekomendasi_prioritas\n")
+        buf = io.StringIO()
+        w = csv.writer(buf, lineterminator="")
+        for day in DAYS:
+            cuts = sorted(rng.sample(range(1, 24), min(phases_per_day, 24) - 1))
+            for i, (start, end) in enumerate(zip([0] + cuts, cuts + [24])):
+                buf.seek(0); buf.truncate()
+                w.writerow([day, start, end, f"Fase {i + 1}", rng.choice(["Tutup", "Aktif", "Sangat Aktif"]),
+                            rng.choice(["Sepi", "Sedang", "Ramai"]), _multi(rng, RULE_PRIORITIES, 2, 6)])
+                f.write('"' + buf.getvalue().replace('"', '""') + '"\n')
+    return path
+
+
+def generate_holidays_db(path, years=1, start_year=2024, per_year=16, seed=42):
+    """SQLite holidays (skema init_db.py) berisi per_year tanggal libur acak per tahun."""
+    import os
+    import sqlite3
+    rng = random.Random(seed)
+    if os.path.exists(path): os.remove(path)
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE holidays (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, name TEXT NOT NULL)")
+    rows = []
+    for year in range(start_year, start_year + years):
+        for day in sorted(rng.sample(range(365), per_year)):
+            rows.append(((datetime(year, 1, 1) + timedelta(days=day)).strftime("%Y-%m-%d"), f"Libur {len(rows) + 1}"))
+    con.executemany("INSERT INTO holidays (date, name) VALUES (?, ?)", rows)
+    con.commit()
+    con.close()
+    return path
+
+
+def forecast_payload(start=None, steps=40, seed=42):
+    """Respon forecast OpenWeather (langkah 3 jam) minimal yang dibaca weather.parse_forecast; hujan/cerah acak."""
+    rng = random.Random(seed)
+    start = int((start or datetime.now()).timestamp()) // 10800 * 10800
+    conditions = [("Rain", "hujan ringan"), ("Clear", "cerah"), ("Clouds", "berawan")]
+    items = []
+    for i in range(steps):
+        main, description = rng.choice(conditions)
+        items.append({"dt": start + i * 10800, "main": {"temp": round(rng.uniform(24, 33), 1)},
+                      "weather": [{"main": main, "description": description}]})
+    return {"cod": "200", "cnt": steps, "list": items, "city": {"name": "Banjarmasin", "timezone": 28800}}
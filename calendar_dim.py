@@ -0,0 +1,134 @@
+import json
+import sqlite3
+from datetime import date, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- DIMENSI KALENDER ---
+# Satu baris per tanggal: day_category efektif (nama hari, atau 'Minggu' kalau libur) + metadata libur.
+# Dibangun sekali dari semua sumber libur (holidays.db + holidays.json), lalu dipakai pipeline, scheduler
+# dan dashboard sebagai lookup dict per tanggal, tanpa query SQLite/DuckDB per pengecekan.
+DAY_MAP = {0: 'Senin', 1: 'Selasa', 2: 'Rabu', 3: 'Kamis', 4: 'Jumat', 5: 'Sabtu', 6: 'Minggu'}
+HOLIDAY_DAY_CATEGORY = 'Minggu'
+# Rentang minimal di sekitar tahun berjalan, diperluas ke tahun libur tertua/terbaru di sumber
+CALENDAR_YEARS_BACK = 1
+CALENDAR_YEARS_AHEAD = 1
+
+HOLIDAY_COLUMNS = ['date', 'name', 'type']
+CALENDAR_SCHEMA = pa.schema([
+    ("date", pa.date32()), ("weekday", pa.int8()), ("day_name", pa.string()), ("day_category", pa.string()),
+    ("is_holiday", pa.bool_()), ("holiday_name", pa.string()), ("holiday_type", pa.string()),
+])
+
+
+def read_holidays_db(path):
+    """Libur dari SQLite (skema init_db.py, tanpa kolom type)"""
+    con = sqlite3.connect(path)
+    try: df = pd.read_sql_query("SELECT date, name FROM holidays", con)
+    finally: con.close()
+    return df.assign(type=None)
+
+
+def read_holidays_json(path):
+    """Libur dari holidays.json: [{"date", "name", "type"}]"""
+    with open(path, 'r', encoding='utf-8') as f: return pd.DataFrame(json.load(f)).reindex(columns=HOLIDAY_COLUMNS)
+
+
+def _join_names(names):
+    return ' / '.join(dict.fromkeys(names))
+
+
+def merge_holidays(*frames):
+    """
+    Gabung semua sumber -> satu baris per tanggal. Nama berbeda di tanggal yang sama digabung ' / ',
+    type diambil dari sumber pertama yang punya (holidays.json lebih lengkap dari holidays.db).
+    """
+    frames = [f.reindex(columns=HOLIDAY_COLUMNS) for f in frames if f is not None and not f.empty]
+    if not frames: return pd.DataFrame({c: pd.Series(dtype='object') for c in HOLIDAY_COLUMNS})
+    df = pd.concat(frames, ignore_index=True)
+    df['date'] = pd.to_datetime(df['date']).dt.date
+    df = df.dropna(subset=['date', 'name'])
+    # Nama duplikat dibuang saat join (bukan drop_duplicates baris) -> type dari baris duplikat sumber lain tetap terbaca
+    return df.groupby('date', sort=True).agg(name=('name', _join_names), type=('type', 'first')).reset_index()
+
+
+def build_calendar(holidays, today=None):
+    """DataFrame kalender harian (CALENDAR_SCHEMA), dibangun kolumnar dari pd.date_range"""
+    today = today or date.today()
+    years = [d.year for d in holidays['date']] if not holidays.empty else []
+    start = date(min(years + [today.year - CALENDAR_YEARS_BACK]), 1, 1)
+    end = date(max(years + [today.year + CALENDAR_YEARS_AHEAD]), 12, 31)
+    days = pd.date_range(start, end, freq='D')
+    info = holidays.set_index(pd.to_datetime(holidays['date']))[['name', 'type']].reindex(days)
+    weekday = days.weekday.to_numpy()
+    day_name = pd.Series(weekday).map(DAY_MAP)
+    is_holiday = info['name'].notna().to_numpy()
+    return pd.DataFrame({
+        'date': days.date, 'weekday': weekday.astype('int8'), 'day_name': day_name.to_numpy(),
+        'day_category': day_name.where(~is_holiday, HOLIDAY_DAY_CATEGORY).to_numpy(),
+        'is_holiday': is_holiday, 'holiday_name': info['name'].to_numpy(), 'holiday_type': info['type'].to_numpy(),
+    })
+
+
+def write_calendar(df, path):
+    pq.write_table(pa.Table.from_pandas(df, schema=CALENDAR_SCHEMA, preserve_index=False), path)
+
+
+class Calendar:
+    """
+    Lookup O(1) per tanggal di atas tabel kalender. Tanggal di luar rentang tabel jatuh ke nama hari biasa.
+
+        cal = Calendar.from_parquet(path)
+        cal.day_category(now.date())
+    """
+    def __init__(self, df=None):
+        df = df if df is not None else pd.DataFrame(columns=CALENDAR_SCHEMA.names)
+        dates = pd.to_datetime(df['date']).dt.date
+        self._category = dict(zip(dates, df['day_category']))
+        holidays = df[df['is_holiday'].astype(bool)]
+        types = holidays['holiday_type'].astype(object).where(holidays['holiday_type'].notna(), None)
+        self._holidays = dict(zip(pd.to_datetime(holidays['date']).dt.date, zip(holidays['holiday_name'], types)))
+
+    @classmethod
+    def from_parquet(cls, path):
+        return cls(pq.read_table(path).to_pandas())
+
+    def __len__(self):
+        return len(self._category)
+
+    def day_category(self, day):
+        return self._category.get(day) or DAY_MAP[day.weekday()]
+
+    def is_holiday(self, day):
+        return day in self._holidays
+
+    def holiday(self, day):
+        """(nama, type) libur, atau None"""
+        return self._holidays.get(day)
+
+    def holiday_dates(self):
+        return set(self._holidays)
+
+
+# --- RENCANA WAKTU DASHBOARD ---
+# Pilihan "Rencana Waktu" -> waktu di zona kota. Malam dimulai jam EVENING_HOUR: setelah itu "Nanti Malam" berarti
+# malam yang sedang berjalan (sekarang), bukan besok malam yang sudah punya pilihan sendiri.
+TIME_PLANS = ["Sekarang", "Nanti Malam (19:00)", "Besok Pagi (08:00)", "Besok Malam (19:00)"]
+EVENING_HOUR = 19
+
+
+def resolve_plan_time(plan, now):
+    """now = datetime sadar zona kota; return waktu slot yang direncanakan (menit dibulatkan ke jam untuk slot terjadwal)"""
+    today = now.replace(minute=0, second=0, microsecond=0)
+    if plan == TIME_PLANS[1]: return today.replace(hour=EVENING_HOUR) if now.hour < EVENING_HOUR else now
+    if plan == TIME_PLANS[2]: return (today + timedelta(days=1)).replace(hour=8)
+    if plan == TIME_PLANS[3]: return (today + timedelta(days=1)).replace(hour=EVENING_HOUR)
+    return now
+
+
+def plan_label(plan, now):
+    """Label pilihan di selectbox: setelah jam malam dimulai, 'Nanti Malam' ditampilkan sebagai malam ini (sekarang)"""
+    if plan == TIME_PLANS[1] and now.hour >= EVENING_HOUR: return "Malam Ini (sekarang)"
+    return plan
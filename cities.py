@@ -0,0 +1,72 @@
+import os
+
+# --- REGISTRY KOTA ---
+# Satu deployment melayani beberapa kota; tiap kota punya sumber lokasi, query cuaca dan timezone sendiri.
+# Sumber lokasi: URL file statis (LOKASI_URL_<SLUG>, default lokasi_bjm.json untuk Banjarmasin)
+# atau query Overpass dari bbox kota. PIPELINE_CITIES = daftar slug yang diproses, dipisah koma.
+OVERPASS_URL = os.environ.get("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+OVERPASS_TIMEOUT = int(os.environ.get("OVERPASS_TIMEOUT", "90"))
+# Tag OSM yang diambil dari Overpass (elemen bernama saja, urutan sama dengan OSM_CATEGORY_TAGS pipeline)
+OVERPASS_TAGS = ["amenity", "leisure", "shop", "tourism"]
+
+DEFAULT_CITY = "banjarmasin"
+PIPELINE_CITIES = [c.strip() for c in os.environ.get("PIPELINE_CITIES", DEFAULT_CITY).split(",") if c.strip()]
+
+# bbox = (south, west, north, east), center = (lat, lon) titik awal "Lokasi Saya" di dashboard
+CITIES = {
+    "banjarmasin": {
+        "name": "Banjarmasin", "timezone": "Asia/Makassar", "weather_query": "Banjarmasin,ID",
+        "bbox": (-3.40, 114.52, -3.25, 114.67), "center": (-3.3186, 114.5944),
+        "lokasi_url": os.environ.get("LOKASI_URL", "https://raw.githubusercontent.com/rizkiiirr/Social-Radar/refs/heads/main/lokasi_bjm.json"),
+        "lokasi_file": "lokasi_bjm.json", "seed": "lokasi_bjm.json",
+    },
+    "banjarbaru": {
+        "name": "Banjarbaru", "timezone": "Asia/Makassar", "weather_query": "Banjarbaru,ID",
+        "bbox": (-3.52, 114.72, -3.38, 114.92), "center": (-3.4424, 114.8320),
+    },
+    "palangkaraya": {
+        "name": "Palangka Raya", "timezone": "Asia/Jakarta", "weather_query": "Palangkaraya,ID",
+        "bbox": (-2.30, 113.82, -2.12, 114.00), "center": (-2.2096, 113.9135),
+    },
+    "samarinda": {
+        "name": "Samarinda", "timezone": "Asia/Makassar", "weather_query": "Samarinda,ID",
+        "bbox": (-0.60, 117.05, -0.40, 117.25), "center": (-0.5022, 117.1536),
+    },
+    "balikpapan": {
+        "name": "Balikpapan", "timezone": "Asia/Makassar", "weather_query": "Balikpapan,ID",
+        "bbox": (-1.30, 116.78, -1.13, 117.00), "center": (-1.2379, 116.8529),
+    },
+    "pontianak": {
+        "name": "Pontianak", "timezone": "Asia/Pontianak", "weather_query": "Pontianak,ID",
+        "bbox": (-0.10, 109.27, 0.05, 109.40), "center": (-0.0263, 109.3425),
+    },
+}
+
+
+def get_city(slug):
+    """Entri registry + slug-nya; kota tidak dikenal -> ValueError"""
+    if slug not in CITIES: raise ValueError(f"Kota tidak dikenal: {slug} (pilihan: {', '.join(CITIES)})")
+    return {"slug": slug, **CITIES[slug]}
+
+
+def active_cities(slugs=None):
+    """Kota yang diproses pipeline (default PIPELINE_CITIES), urutan sesuai konfigurasi"""
+    return [get_city(slug) for slug in dict.fromkeys(slugs or PIPELINE_CITIES)]
+
+
+def overpass_query(bbox, timeout=OVERPASS_TIMEOUT):
+    """Query Overpass QL: semua node/way/relation bernama dengan tag kategori di dalam bbox, way pakai titik tengah"""
+    box = ",".join(str(v) for v in bbox)
+    selectors = "".join(f'nwr["{tag}"]["name"]({box});' for tag in OVERPASS_TAGS)
+    return f"[out:json][timeout:{timeout}];({selectors});out center;"
+
+
+def lokasi_request(city):
+    """(url, params) sumber lokasi kota: URL statis kalau ada, kalau tidak query Overpass dari bbox"""
+    url = os.environ.get(f"LOKASI_URL_{city['slug'].upper()}") or city.get("lokasi_url")
+    if url: return url, None
+    return OVERPASS_URL, {"data": overpass_query(city["bbox"])}
+
+
+def lokasi_file(city):
+    return city.get("lokasi_file") or f"lokasi_{city['slug']}.json"
@@ -0,0 +1,244 @@
+import cProfile
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import pytz
+
+from metrics import StageMetrics, peak_rss_bytes, reset_peak_rss
+
+# --- DAG RUNNER KECIL UNTUK PIPELINE ---
+# Tiap task mendeklarasikan dependency dan cache key-nya. Hasil task (dict JSON) disimpan di state file
+# setelah task selesai, jadi run ulang setelah gagal melewati task yang hasilnya masih valid
+# dan mulai lagi dari node yang gagal.
+
+
+class TaskFailed(Exception):
+    pass
+
+
+class Task:
+    """
+    Satu node DAG.
+    - fn(inputs) -> dict hasil (JSON-serializable); inputs = {nama dependency: hasilnya}.
+    - isolated=True -> jalan di process pool (fn harus fungsi level modul, input/hasil di-pickle).
+    - key_fn(inputs) -> nilai yang menentukan hasil (misal hash file input); None = selalu dijalankan.
+      Hasil boleh berisi "files": file output yang harus masih ada supaya cache dianggap valid,
+      dan "status": "failed" supaya tidak di-cache.
+    - stage: (nama, labels) untuk metrik; None kalau fn mengukur dirinya sendiri.
+    """
+    def __init__(self, name, fn, deps=(), isolated=False, key_fn=None, stage=None):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.isolated = isolated
+        self.key_fn = key_fn
+        self.stage = stage
+
+
+def _call_isolated(fn, inputs, profile_path=None, reset_rss=False):
+    """
+    Dijalankan di worker: hasil + ukuran wall/CPU/RSS.
+    profile_path diisi -> fn dijalankan di bawah cProfile di worker itu sendiri (profiler proses induk tidak melihat
+    kerja di process pool), dump-nya ditulis ke profile_path dan path-nya dikembalikan di stats.
+    reset_rss=True (worker pool dipakai ulang antar task) -> high-water RSS worker di-reset dulu, jadi peak_rss_bytes
+    = puncak selama task ini (rss_scope "task"); tanpa reset = high-water seumur proses (rss_scope "process").
+    """
+    rss_scope = "task" if reset_rss and reset_peak_rss() else "process"
+    rss0 = peak_rss_bytes()
+    profiler = cProfile.Profile() if profile_path else None
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    if profiler: profiler.enable()
+    try:
+        result = fn(inputs)
+    finally:
+        if profiler: profiler.disable()
+    peak = peak_rss_bytes()
+    stats = {"wall_s": time.perf_counter() - t0, "cpu_s": time.process_time() - cpu0, "peak_rss_bytes": peak,
+             "rss_growth_bytes": peak - rss0, "rss_scope": rss_scope}
+    if profiler:
+        os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+        profiler.dump_stats(profile_path)
+        stats["profile"] = profile_path
+    return result, stats
+
+
+class DagRunner:
+    """
+    Eksekusi task sesuai dependency: task isolated yang siap dikirim ke process pool (spawn, aman untuk
+    DuckDB/thread di proses induk), task biasa jalan di proses utama sambil menunggu worker.
+    workers=0 -> semua task jalan berurutan di proses utama.
+    """
+    def __init__(self, tasks, state_path, workers=0, metrics=None):
+        self.tasks = {t.name: t for t in tasks}
+        self.state_path = state_path
+        self.workers = workers
+        self.metrics = metrics
+        self.state = self._load_state()
+        for t in tasks:
+            missing = [d for d in t.deps if d not in self.tasks]
+            if missing: raise ValueError(f"Task {t.name}: dependency tidak dikenal {missing}")
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f: return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as f: json.dump(self.state, f, indent=2, default=str)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+    def _ancestors(self, names):
+        needed, todo = set(), list(names)
+        while todo:
+            name = todo.pop()
+            if name in needed: continue
+            if name not in self.tasks: raise ValueError(f"Task tidak dikenal: {name}")
+            needed.add(name)
+            todo.extend(self.tasks[name].deps)
+        return needed
+
+    def _cache_key(self, task, inputs, keys):
+        if task.key_fn is None: return None
+        dep_keys = [keys.get(d) for d in task.deps]
+        payload = json.dumps([task.name, task.key_fn(inputs), dep_keys], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cached(self, name, key):
+        entry = self.state.get(name)
+        if key is None or not entry or entry.get("key") != key: return None
+        result = entry.get("result") or {}
+        if result.get("status") == "failed": return None
+        if not all(os.path.exists(f) for f in result.get("files", [])): return None
+        return result
+
+    def _finish(self, task, key, result, stats=None):
+        self.state[task.name] = {"key": key, "result": result, "finished_at": datetime.now(pytz.utc).isoformat()}
+        self._save_state()
+        if self.metrics is not None and stats is not None and task.stage:
+            name, labels = task.stage
+            rec = self.metrics.record(name, stats["wall_s"], status=result.get("status", "ok"), rows_in=result.get("rows_in"),
+                                      rows_out=result.get("rows_out"), bytes=result.get("bytes"), labels=labels, worker="process",
+                                      rss_scope=stats["rss_scope"])
+            rec.cpu_s, rec.peak_rss_bytes, rec.rss_growth_bytes = stats["cpu_s"], stats["peak_rss_bytes"], stats["rss_growth_bytes"]
+            rec.profile = stats.get("profile")
+
+    def _profile_path(self, task):
+        """Path .prof task isolated saat profiling aktif (nama sama dengan dump stage di proses utama)"""
+        if self.metrics is None or not self.metrics.profile_dir or not task.stage: return None
+        name, labels = task.stage
+        return os.path.join(self.metrics.profile_dir, f"{StageMetrics(name, labels).key}.prof")
+
+    def _forget(self, name):
+        """Task gagal bisa meninggalkan file output setengah jadi -> hasil lama tidak boleh dipakai lagi sebagai cache"""
+        if self.state.pop(name, None) is not None: self._save_state()
+
+    def _run_inline(self, task, inputs):
+        if self.metrics is None or not task.stage:
+            return task.fn(inputs)
+        name, labels = task.stage
+        with self.metrics.stage(name, **labels) as st:
+            result = task.fn(inputs)
+            st.rows_in, st.rows_out, st.bytes = result.get("rows_in"), result.get("rows_out"), result.get("bytes")
+            st.status = result.get("status", "ok")
+        return result
+
+    def run(self, targets=None, force=(), only=False):
+        """
+        Jalankan targets (default semua task) beserta dependency-nya.
+        force = task yang cache-nya diabaikan; only=True -> hanya targets, hasil dependency diambil dari state.
+        Return {task: hasil}. Task gagal -> task lain yang tidak bergantung padanya tetap diselesaikan, lalu TaskFailed.
+        """
+        targets = list(targets or self.tasks)
+        needed = set(targets) if only else self._ancestors(targets)
+        force = set(force)
+        results, keys = {}, {}
+        if only:
+            for name in needed:
+                for dep in self.tasks[name].deps:
+                    if dep in needed: continue
+                    if dep not in self.state: raise TaskFailed(f"{name}: hasil {dep} belum pernah ada, jalankan tanpa --only")
+                    results[dep], keys[dep] = self.state[dep]["result"], self.state[dep]["key"]
+
+        pending = [n for n in self.tasks if n in needed]
+        running, failed = {}, {}
+        pool = None
+        try:
+            while pending or running:
+                progressed = False
+                for name in list(pending):
+                    task = self.tasks[name]
+                    if any(d in failed for d in task.deps):
+                        pending.remove(name)
+                        failed[name] = "dependency gagal"
+                        progressed = True
+                        continue
+                    if not all(d in results for d in task.deps): continue
+                    inputs = {d: results[d] for d in task.deps}
+                    key = self._cache_key(task, inputs, keys)
+                    cached = None if name in force else self._cached(name, key)
+                    if cached is not None:
+                        print(f"   ⏭️ [DAG] {name}: hasil cache dipakai")
+                        results[name], keys[name] = cached, key
+                        pending.remove(name)
+                        progressed = True
+                        continue
+                    if task.isolated and self.workers:
+                        if pool is None:
+                            pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                        running[pool.submit(_call_isolated, task.fn, inputs, self._profile_path(task), True)] = (task, key)
+                        pending.remove(name)
+                        progressed = True
+                # Task biasa: satu per putaran (worker tetap jalan di background)
+                for name in list(pending):
+                    task = self.tasks[name]
+                    if task.isolated and self.workers: continue
+                    if not all(d in results for d in task.deps): continue
+                    inputs = {d: results[d] for d in task.deps}
+                    key = self._cache_key(task, inputs, keys)
+                    pending.remove(name)
+                    try:
+                        if task.isolated:
+                            result, stats = _call_isolated(task.fn, inputs, self._profile_path(task))
+                            self._finish(task, key, result, stats)
+                        else:
+                            result = self._run_inline(task, inputs)
+                            self._finish(task, key, result)
+                        results[name], keys[name] = result, key
+                    except Exception as e:
+                        print(f"   ❌ [DAG] {name} gagal: {e}")
+                        failed[name] = str(e)
+                        self._forget(name)
+                    progressed = True
+                    break
+                if progressed: continue
+                if not running:
+                    raise TaskFailed(f"Dependency tidak terpenuhi: {pending}")
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, key = running.pop(future)
+                    try:
+                        result, stats = future.result()
+                        self._finish(task, key, result, stats)
+                        results[task.name], keys[task.name] = result, key
+                    except Exception as e:
+                        print(f"   ❌ [DAG] {task.name} gagal: {e}")
+                        failed[task.name] = str(e)
+                        self._forget(task.name)
+        finally:
+            if pool is not None: pool.shutdown(wait=True)
+        if failed:
+            raise TaskFailed("; ".join(f"{n}: {err}" for n, err in failed.items()))
+        return results
+
+    def describe(self):
+        """Baris (task, deps, isolated, status cache terakhir) untuk --list"""
+        for name, task in self.tasks.items():
+            entry = self.state.get(name) or {}
+            yield name, task.deps, task.isolated, entry.get("finished_at")
@@ -1,360 +1,1232 @@
 import pandas as pd
+import numpy as np
 import os
 import io
+import codecs
+import hashlib
 import shutil
-import requests
-import sqlite3
 import json
-import duckdb
-from datetime import datetime
+import glob
+import argparse
+import itertools
+import functools
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import date, datetime
 import pytz
 from minio import Minio
+from cities import active_cities, lokasi_file
+from calendar_dim import build_calendar, merge_holidays, read_holidays_db, read_holidays_json, write_calendar
+from dag import DagRunner, Task
+from extract import run_extract
+from lakehouse import connect_lakehouse, merge_frame, load_new_parts, reset_parts
+from metrics import RunMetrics
+from spatial import add_grid_index, dedup_venues
+from time_rules import RuleTable, compile_rules
+from trait_matrix import count_traits, add_trait_counts, trait_matrix_from_counts
+from weather import DEFAULT_WEATHER, hourly_forecast, parse_forecast, write_forecast
+from storage import (
+    ArtifactWriter, table_to_parquet_bytes, sha256_bytes, new_version_id, read_json_object,
+    load_gold_pointer, commit_gold_pointer, prune_gold_versions, GOLD_VERSION_PREFIX,
+    GOLD_DATASET_PREFIX, split_partitions, partition_object_name, prune_dataset_parts,
+)
 
 # --- KONFIGURASI MINIO ---
 MINIO_ENDPOINT = os.environ.get("MINIO_ENDPOINT", "minio:9000")
 MINIO_ACCESS_KEY = os.environ.get("MINIO_ACCESS_KEY", "minioadmin")
 MINIO_SECRET_KEY = os.environ.get("MINIO_SECRET_KEY", "minioadmin")
-OPENWEATHER_API_KEY = os.environ.get("OPENWEATHER_API_KEY", "")
 BUCKET_NAME = "datalake"
 
-# Folder Kerja Sementara (Ephemeral)
+# Folder Kerja Sementara (Ephemeral); bisa dipindah lewat env, misal untuk benchmark yang tidak boleh menyentuh data run asli
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-TEMP_DIR = "/tmp/social_radar"
+TEMP_DIR = os.environ.get("PIPELINE_TEMP_DIR", "/tmp/social_radar")
 os.makedirs(TEMP_DIR, exist_ok=True)
 
+# Silver survey disimpan sebagai kumpulan part file + watermark (incremental)
+# Fakta berupa kode integer; teks trait/habitat ada di tabel dimensi silver/dim_*.parquet
+SURVEY_SILVER_FOLDER = "silver/survey_data"
+SURVEY_TRAIT_FOLDER = "silver/survey_traits"
+SURVEY_HABITAT_FOLDER = "silver/survey_habitats"
+SURVEY_PART_FOLDERS = [SURVEY_SILVER_FOLDER, SURVEY_TRAIT_FOLDER, SURVEY_HABITAT_FOLDER]
+SURVEY_SILVER_DIR = os.path.join(TEMP_DIR, 'survey_data')
+SURVEY_WATERMARK_OBJECT = f"{SURVEY_SILVER_FOLDER}/_watermark.json"
+SURVEY_TS_FORMAT = "%m/%d/%Y %H:%M:%S"
+SURVEY_FULL_REFRESH = os.environ.get("SURVEY_FULL_REFRESH", "0") == "1"
+SURVEY_CHUNK_ROWS = int(os.environ.get("SURVEY_CHUNK_ROWS", "50000"))
+
+SURVEY_ARCH_MAP = {
+    'Religius': ('relig_fisik_cowo', 'relig_lokasi'), 'Intellectual': ('intel_fisik_cowo', 'intel_lokasi'),
+    'Creative': ('creative_fisik_cowo', 'creative_lokasi'), 'Social Butterfly': ('social_fisik_cowo', 'social_lokasi'), 
+    'Sporty': ('sporty_fisik_cowo', 'sporty_lokasi'), 'Techie': ('techie_fisik_cowo', 'techie_lokasi'),
+    'Active': ('active_fisik_cowo', 'active_lokasi'), 'Healing': ('active_fisik_cowo', 'active_lokasi') 
+}
+SURVEY_ARCHETYPES = list(SURVEY_ARCH_MAP)
+# Match ciri -> archetype: archetype yang kolom fisiknya sama dengan archetype sebelumnya (Healing = kolom Active)
+# punya baris matriks identik dan tidak akan pernah menang -> tidak ikut matriks trait
+TRAIT_ARCHETYPES = [a for i, a in enumerate(SURVEY_ARCHETYPES)
+                    if SURVEY_ARCH_MAP[a][0] not in [SURVEY_ARCH_MAP[b][0] for b in SURVEY_ARCHETYPES[:i]]]
+# Pisah di koma, kecuali koma di dalam kurung: "Aksesoris Etnik (Gelang Manik, Cincin Batu)"
+MULTI_VALUE_SPLIT = r",\s*(?![^()]*\))"
+
+SURVEY_FACT_SCHEMA = pa.schema([
+    ("response_id", pa.int64()), ("timestamp", pa.timestamp("ns")),
+    ("gender", pa.dictionary(pa.int8(), pa.string())), ("archetype_id", pa.int8()),
+])
+SURVEY_TRAIT_SCHEMA = pa.schema([("response_id", pa.int64()), ("archetype_id", pa.int8()), ("trait_id", pa.int32())])
+SURVEY_HABITAT_SCHEMA = pa.schema([("response_id", pa.int64()), ("archetype_id", pa.int8()), ("habitat_id", pa.int32())])
+
+# Manifest hash sumber/artefak -> stage yang inputnya tidak berubah dilewati
+MANIFEST_OBJECT = "_manifest.json"
+GOLD_KEEP_VERSIONS = int(os.environ.get("GOLD_KEEP_VERSIONS", "3"))
+
+# DuckDB lakehouse persisten + MERGE. Default file di TEMP_DIR, di sebelah part silver survey: catatan part yang sudah
+# di-MERGE (lakehouse_parts) ikut bertahan antar run -> biaya sebanding baris baru, bukan seluruh history.
+# LAKEHOUSE_DB="" (diset kosong) = in-memory, dibangun ulang tiap run
+LAKEHOUSE_DB = os.environ.get("LAKEHOUSE_DB", os.path.join(TEMP_DIR, "lakehouse.duckdb"))
+DUCKDB_MEMORY_LIMIT = os.environ.get("DUCKDB_MEMORY_LIMIT", "")
+DUCKDB_TEMP_DIR = os.environ.get("DUCKDB_TEMP_DIR", os.path.join(TEMP_DIR, "duckdb_spill"))
+
+# Ukuran row group gold_location_index (parquet terurut grid_cell -> min/max per row group jadi index kasar)
+LOCATION_INDEX_ROW_GROUP = 8192
+
+# Recommendations ditulis sebagai dataset Hive: satu part per (city, archetype, day_category, hour)
+RECS_PARTITION_BY = ["city", "archetype", "day_category", "hour"]
+
+# Metrik per run: file Prometheus lokal (di-serve scheduler); PIPELINE_PROFILE=1 -> dump cProfile per stage
+METRICS_PROM_FILE = os.environ.get("METRICS_PROM_FILE", os.path.join(TEMP_DIR, "metrics.prom"))
+PIPELINE_PROFILE = os.environ.get("PIPELINE_PROFILE", "0") == "1"
+
+# DAG task pipeline: task isolated jalan di process pool (0 = semua serial di proses utama);
+# hasil + cache key tiap task disimpan di DAG_STATE_FILE supaya run ulang mulai dari task yang gagal
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", str(min(4, os.cpu_count() or 1))))
+DAG_STATE_FILE = os.path.join(TEMP_DIR, "_dag_state.json")
+
+# Kota yang diproses (registry di cities.py): lokasi -> gold_locations -> rekomendasi jalan per kota di process pool,
+# survey/gold_features, rule & kalender dihitung sekali untuk semua kota
+CITIES = [city["slug"] for city in active_cities()]
+
+# Sumber bronze (nama di manifest["sources"]); file libur tidak di-upload ulang ke bronze
+SOURCE_FILES = {
+    "survey": "hasil_survey.csv", "rules": "social_time_rules.csv",
+    "holidays": "holidays.db", "holidays_json": "holidays.json",
+    **{f"lokasi:{city['slug']}": lokasi_file(city) for city in active_cities()},
+    **{f"weather:{city}": f"weather_forecast_{city}.json" for city in CITIES},
+}
+# Forecast ikut ke bronze -> replica/container baru punya cache cuaca sebelum fetch pertama
+BRONZE_UPLOADS = ["survey", "rules"] + [f"lokasi:{city}" for city in CITIES] + [f"weather:{city}" for city in CITIES]
+
+# Output lokal task silver/gold (dibaca ulang oleh task berikutnya)
+RULES_SILVER_PATH = os.path.join(TEMP_DIR, 'rules_data.parquet')
+HOLIDAYS_SILVER_PATH = os.path.join(TEMP_DIR, 'holidays.parquet')
+CALENDAR_SILVER_PATH = os.path.join(TEMP_DIR, 'calendar.parquet')
+RULE_TABLE_PATH = os.path.join(TEMP_DIR, 'rule_table.parquet')
+TRAIT_MATRIX_PATH = os.path.join(TEMP_DIR, 'gold_trait_matrix.parquet')
+# Akumulasi hitungan (archetype, trait) dari part survey_traits yang sudah dibaca -> run berikutnya hanya membaca part baru
+TRAIT_COUNTS_PATH = os.path.join(TEMP_DIR, 'trait_counts.parquet')
+TRAIT_COUNTS_STATE = os.path.join(TEMP_DIR, 'trait_counts.json')
+GOLD_FEATURES_PATH = os.path.join(TEMP_DIR, 'gold_features.parquet')
+GOLD_HOLIDAYS_PATH = os.path.join(TEMP_DIR, 'gold_holidays.parquet')
+# Gabungan semua kota (kolom city) yang di-publish ke gold
+WEATHER_FORECAST_PATH = os.path.join(TEMP_DIR, 'weather_forecast.parquet')
+CONTEXT_WEATHER_PATH = os.path.join(TEMP_DIR, 'context_weather.parquet')
+GOLD_LOCATIONS_PATH = os.path.join(TEMP_DIR, 'gold_locations.parquet')
+LOCATION_INDEX_PATH = os.path.join(TEMP_DIR, 'gold_location_index.parquet')
+
+def city_path(city, filename):
+    """Output lokal per kota: TEMP_DIR/city=<slug>/<filename> (silver di-upload ke silver/city=<slug>/...)"""
+    os.makedirs(os.path.join(TEMP_DIR, f"city={city}"), exist_ok=True)
+    return os.path.join(TEMP_DIR, f"city={city}", filename)
+
+# Kelas cuaca di kubus rekomendasi; dashboard memilih 'Rain' kalau cuaca sekarang mengandung "Rain"
+WEATHER_CLASSES = ['Rain', 'Clear']
+
 # Inisialisasi MinIO Client
 client = Minio(MINIO_ENDPOINT, access_key=MINIO_ACCESS_KEY, secret_key=MINIO_SECRET_KEY, secure=False)
 
 # --- FUNGSI BANTU MINIO ---
-def upload_file(folder, filename, file_path):
-    """Upload file lokal ke MinIO bucket"""
+def load_survey_watermark():
+    """
+    Ambil state survey terakhir dari MinIO: (watermark, next_response_id, seen).
+    seen = hash baris yang sudah masuk tepat di detik watermark (boundary_rows) & baris tanpa timestamp (undated_rows);
+    None = state format lama (sebelum ada hash baris)
+    """
+    state = read_json_object(client, BUCKET_NAME, SURVEY_WATERMARK_OBJECT)
+    if not state: return None, 0, {"boundary_rows": [], "undated_rows": []}
+    watermark = pd.Timestamp(state["watermark"]) if state.get("watermark") else None
+    seen = {k: state.get(k) for k in ["boundary_rows", "undated_rows"]}
+    return watermark, int(state.get("next_response_id", 0)), seen
+
+def save_survey_watermark(watermark, part_name, next_response_id, boundary_rows=(), undated_rows=()):
+    """Simpan watermark setelah part file & dimensi berhasil di-upload"""
+    payload = json.dumps({
+        "watermark": watermark.isoformat() if watermark is not None else None, "last_part": part_name,
+        "next_response_id": int(next_response_id), "boundary_rows": sorted(boundary_rows), "undated_rows": sorted(undated_rows),
+    }).encode("utf-8")
+    try:
+        client.put_object(BUCKET_NAME, SURVEY_WATERMARK_OBJECT, io.BytesIO(payload), len(payload), content_type="application/json")
+        print(f"   🔖 [WATERMARK] Survey s/d {watermark}")
+        return True
+    except Exception as e:
+        print(f"   ❌ Error Simpan Watermark: {e}")
+        return False
+
+def local_part_dir(folder):
+    return os.path.join(TEMP_DIR, os.path.basename(folder))
+
+def sync_survey_parts():
+    """Samakan part file silver survey lokal dengan yang ada di MinIO"""
+    for folder in SURVEY_PART_FOLDERS:
+        os.makedirs(local_part_dir(folder), exist_ok=True)
+        try:
+            for obj in client.list_objects(BUCKET_NAME, prefix=f"{folder}/"):
+                name = os.path.basename(obj.object_name)
+                local_path = os.path.join(local_part_dir(folder), name)
+                if name.startswith("part-") and not os.path.exists(local_path):
+                    client.fget_object(BUCKET_NAME, obj.object_name, local_path)
+        except Exception as e: print(f"   ⚠️ Gagal sync part survey: {e}")
+
+def reset_survey_silver():
+    """Hapus semua part file, dimensi + watermark (dipakai saat SURVEY_FULL_REFRESH=1)"""
+    for folder in SURVEY_PART_FOLDERS:
+        shutil.rmtree(local_part_dir(folder), ignore_errors=True)
+        os.makedirs(local_part_dir(folder), exist_ok=True)
+    for dim in ["trait", "habitat"]:
+        if os.path.exists(os.path.join(TEMP_DIR, f"dim_{dim}.parquet")): os.remove(os.path.join(TEMP_DIR, f"dim_{dim}.parquet"))
     try:
-        if not client.bucket_exists(BUCKET_NAME): client.make_bucket(BUCKET_NAME)
-        object_name = f"{folder}/{filename}"
-        client.fput_object(BUCKET_NAME, object_name, file_path)
-        print(f"   ☁️ [MINIO] Uploaded: {object_name}")
-    except Exception as e: print(f"   ❌ Error Upload MinIO: {e}")
+        for folder in SURVEY_PART_FOLDERS:
+            for obj in client.list_objects(BUCKET_NAME, prefix=f"{folder}/"):
+                client.remove_object(BUCKET_NAME, obj.object_name)
+        for dim in ["trait", "habitat"]:
+            client.remove_object(BUCKET_NAME, f"silver/dim_{dim}.parquet")
+    except Exception as e: print(f"   ⚠️ Gagal reset silver survey: {e}")
+
+def sync_dimensions():
+    """Ambil dimensi silver/dim_<name>.parquet terbaru dari MinIO ke cache lokal"""
+    for name in ["trait", "habitat"]:
+        try: client.fget_object(BUCKET_NAME, f"silver/dim_{name}.parquet", os.path.join(TEMP_DIR, f"dim_{name}.parquet"))
+        except Exception: pass
+
+def load_dimension(name):
+    """Baca dimensi lokal dim_<name>.parquet -> dict {nilai: id} (id stabil antar run)"""
+    path = os.path.join(TEMP_DIR, f"dim_{name}.parquet")
+    if not os.path.exists(path): return {}
+    df = pd.read_parquet(path)
+    return dict(zip(df[name], df[f"{name}_id"]))
+
+def save_dimension(name, mapping):
+    """Tulis dimensi ke cache lokal; return path (di-upload oleh proses utama)"""
+    df = pd.DataFrame({f"{name}_id": list(mapping.values()), name: list(mapping.keys())})
+    df[f"{name}_id"] = df[f"{name}_id"].astype("int32")
+    path = os.path.join(TEMP_DIR, f"dim_{name}.parquet")
+    with open(path, 'wb') as f: f.write(table_to_parquet_bytes(df))
+    return path
+
+def encode_values(values, mapping):
+    """Dictionary-encode Series string; nilai baru diberi id berikutnya (mapping di-update)"""
+    for v in pd.unique(values[~values.isin(list(mapping))]):
+        mapping[v] = len(mapping)
+    return values.map(mapping).astype("int32")
+
+def explode_multi_value(long, col, id_name, mapping):
+    """Pecah kolom 'a, b, c' jadi satu baris per nilai, lalu ganti teks dengan kode integer"""
+    ex = long[['response_id', 'archetype_id']].assign(value=long[col].str.split(MULTI_VALUE_SPLIT, regex=True))
+    ex = ex.explode('value')
+    ex['value'] = ex['value'].str.strip()
+    ex = ex[ex['value'].notna() & (ex['value'] != '')]
+    ex[id_name] = encode_values(ex['value'], mapping)
+    return ex[['response_id', 'archetype_id', id_name]].drop_duplicates()
+
+def cewe_column(fisik_cowo):
+    """Kolom ciri fisik versi cewe: hanya masuk survey_traits (matriks trait), fakta & habitat tetap dari kolom cowo"""
+    return fisik_cowo.replace('_fisik_cowo', '_fisik_cewe')
+
+def unpivot_survey(df_raw, first_response_id):
+    """
+    Unpivot vektor: (respon x archetype) dalam satu langkah numpy, tanpa loop + concat per archetype.
+    Hasil: satu baris per respon-archetype yang punya ciri_fisik atau ciri_fisik_cewe
+    (fakta & habitat hanya memakai baris dengan ciri_fisik, lihat build_survey_parts).
+    """
+    n, k = len(df_raw), len(SURVEY_ARCHETYPES)
+    f_cols = [f for f, _ in SURVEY_ARCH_MAP.values()]
+    l_cols = [l for _, l in SURVEY_ARCH_MAP.values()]
+    long = pd.DataFrame({
+        'response_id': np.repeat(np.arange(first_response_id, first_response_id + n, dtype='int64'), k),
+        'timestamp': np.repeat(df_raw['timestamp'].to_numpy(), k),
+        'gender': np.repeat(df_raw['gender'].to_numpy(), k),
+        'archetype_id': np.tile(np.arange(k, dtype='int8'), n),
+        'ciri_fisik': df_raw.reindex(columns=f_cols).to_numpy(dtype=object).ravel(),
+        'ciri_fisik_cewe': df_raw.reindex(columns=[cewe_column(f) for f in f_cols]).to_numpy(dtype=object).ravel(),
+        'habitat': df_raw.reindex(columns=l_cols).to_numpy(dtype=object).ravel(),
+    })
+    return long[long['ciri_fisik'].notna() | long['ciri_fisik_cewe'].notna()]
+
+def explode_traits(long, mapping):
+    """Ciri dari kolom cowo + cewe -> satu baris per (respon, archetype, trait); ciri di kedua kolom dihitung sekali"""
+    stacked = pd.concat([long[['response_id', 'archetype_id', 'ciri_fisik']],
+                         long[['response_id', 'archetype_id', 'ciri_fisik_cewe']].rename(columns={'ciri_fisik_cewe': 'ciri_fisik'})],
+                        ignore_index=True)
+    return explode_multi_value(stacked, 'ciri_fisik', 'trait_id', mapping)
+
+def survey_row_hashes(df_raw):
+    """Hash isi baris mentah (sebelum parse, semua kolom sebagai teks) -> pengenal baris antar run"""
+    return pd.util.hash_pandas_object(df_raw.fillna('').astype(str), index=False).map('{:016x}'.format)
+
+def build_survey_parts(p_survey, watermark=None, next_id=0, seen=None):
+    """
+    Silver survey incremental: hanya baris dengan timestamp >= watermark yang diproses. Timestamp cuma presisi
+    detik -> respon di detik watermark yang muncul setelah fetch sebelumnya tetap masuk; yang sudah pernah masuk
+    dikenali dari hash isi baris (seen["boundary_rows"]). Baris tanpa timestamp valid juga masuk sekali saja
+    (seen["undated_rows"]). Dua respon dengan isi persis sama di detik yang sama dihitung satu.
+    Murni lokal (aman di process pool): part file + dimensi ditulis ke TEMP_DIR, upload & watermark
+    dikerjakan commit_survey_parts di proses utama.
+    """
+    watermark = pd.Timestamp(watermark) if watermark else None
+    seen = seen or {}
+    # State lama (tanpa hash): baris di detik watermark & baris tanpa timestamp dianggap sudah masuk (run awal)
+    legacy = watermark is not None and seen.get("boundary_rows") is None
+    boundary_rows, undated_rows = set(seen.get("boundary_rows") or ()), set(seen.get("undated_rows") or ())
+    if not os.path.exists(p_survey): return {"objects": [], "files": [], "rows_in": 0, "rows_out": 0}
+
+    trait_map, habitat_map = load_dimension("trait"), load_dimension("habitat")
+    # Nama part berdasarkan state lama (watermark + id respon berikutnya) -> run yang crash akan menimpa part
+    # yang sama, run berikutnya di detik watermark yang sama tidak
+    part_name = f"part-{watermark.strftime('%Y%m%d%H%M%S') if watermark is not None else 'initial'}-{next_id}.parquet"
+    outputs = [
+        (SURVEY_SILVER_FOLDER, SURVEY_FACT_SCHEMA), (SURVEY_TRAIT_FOLDER, SURVEY_TRAIT_SCHEMA),
+        (SURVEY_HABITAT_FOLDER, SURVEY_HABITAT_SCHEMA),
+    ]
+    writers, n_new, n_out, new_watermark = {}, 0, 0, None
+    new_boundary, new_undated = set(), set()
+
+    # Baca per chunk supaya memori tidak ikut membesar dengan ukuran sheet
+    with clean_csv_quotes(p_survey) as stream:
+        for df_raw in pd.read_csv(stream, chunksize=SURVEY_CHUNK_ROWS):
+            df_raw.columns = [c.lower().strip().replace(" ", "_") for c in df_raw.columns]
+            row_hash = survey_row_hashes(df_raw)
+            df_raw['timestamp'] = pd.to_datetime(df_raw['timestamp'], format=SURVEY_TS_FORMAT, errors='coerce')
+            ts, undated = df_raw['timestamp'], df_raw['timestamp'].isna()
+            if legacy:
+                undated_rows.update(row_hash[undated])
+                boundary_rows.update(row_hash[ts == watermark])
+            keep = undated & ~row_hash.isin(undated_rows)
+            if watermark is not None:
+                keep |= (ts > watermark) | ((ts == watermark) & ~row_hash.isin(boundary_rows))
+            else:
+                keep |= ~undated
+            new_undated.update(row_hash[keep & undated])
+            df_raw, row_hash = df_raw[keep], row_hash[keep]
+            if df_raw.empty: continue
+            chunk_max = df_raw['timestamp'].max()
+            if pd.notna(chunk_max) and (new_watermark is None or chunk_max > new_watermark):
+                new_watermark, new_boundary = chunk_max, set()
+            if pd.notna(chunk_max) and chunk_max == new_watermark:
+                new_boundary.update(row_hash[df_raw['timestamp'] == chunk_max])
+
+            long = unpivot_survey(df_raw, next_id + n_new)
+            facts = long[long['ciri_fisik'].notna()]
+            n_new += len(df_raw)
+            n_out += len(facts)
+            tables = [
+                facts[['response_id', 'timestamp', 'gender', 'archetype_id']],
+                explode_traits(long, trait_map),
+                explode_multi_value(facts, 'habitat', 'habitat_id', habitat_map),
+            ]
+            for (folder, schema), df_out in zip(outputs, tables):
+                if df_out.empty: continue
+                if folder not in writers:
+                    os.makedirs(local_part_dir(folder), exist_ok=True)
+                    writers[folder] = pq.ParquetWriter(os.path.join(local_part_dir(folder), part_name), schema)
+                writers[folder].write_table(pa.Table.from_pandas(df_out, schema=schema, preserve_index=False))
+    n_undated = len(new_undated)
+    print(f"   📥 Survey baru sejak {watermark or 'awal'}: {n_new} baris" + (f" ({n_undated} tanpa timestamp valid)" if n_undated else ""))
+    # Watermark tidak mundur; hash batas lama tetap berlaku kalau detik watermark tidak berubah
+    if new_watermark is None or (watermark is not None and new_watermark <= watermark):
+        new_watermark, new_boundary = watermark, boundary_rows | new_boundary
+    for writer in writers.values(): writer.close()
+    objects = [(f"{folder}/{part_name}", os.path.join(local_part_dir(folder), part_name)) for folder in writers]
+    n_bytes = sum(os.path.getsize(path) for _, path in objects)
+    if writers:
+        dims = {"archetype": {a: i for i, a in enumerate(SURVEY_ARCHETYPES)}, "trait": trait_map, "habitat": habitat_map}
+        objects += [(f"silver/dim_{name}.parquet", save_dimension(name, mapping)) for name, mapping in dims.items()]
+    return {
+        "objects": objects, "files": [path for _, path in objects], "part_name": part_name,
+        "new_watermark": new_watermark.isoformat() if new_watermark is not None else None,
+        "boundary_rows": sorted(new_boundary), "undated_rows": sorted(undated_rows | new_undated),
+        "next_id": next_id + n_new, "rows_in": n_new, "rows_out": n_out, "bytes": n_bytes,
+    }
+
+def commit_survey_parts(artifacts, manifest, staged, result, lock=None):
+    """
+    Upload part + dimensi hasil build_survey_parts, lalu majukan watermark (False jika gagal simpan).
+    Idempoten: part yang sudah ter-upload di-skip, state hanya maju (next_id, naik tiap ada respon baru).
+    lock (ObjectLock) dicek tepat sebelum watermark ditulis -> LockLost kalau sudah dipegang replica lain.
+    """
+    names = [obj for obj, path in result.get("objects", []) if stage_upload(artifacts, manifest, staged, obj, file_path=path)]
+    # Watermark baru disimpan setelah semua part & dimensi benar-benar ter-upload
+    uploaded = commit_uploads(artifacts, manifest, staged, names)
+    if uploaded and result.get("rows_in"):
+        new_watermark = pd.Timestamp(result["new_watermark"]) if result.get("new_watermark") else None
+        _, current_id, _ = load_survey_watermark()
+        if result["next_id"] > current_id:
+            if lock: lock.ensure()
+            uploaded = save_survey_watermark(new_watermark, result["part_name"], result["next_id"],
+                                             result["boundary_rows"], result["undated_rows"])
+    return uploaded
+
+# --- MANIFEST (FINGERPRINT KONTEN) ---
+def file_sha256(file_path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""): h.update(block)
+    return h.hexdigest()
+
+def fingerprint(*parts):
+    """Hash gabungan beberapa nilai (hash sumber, slot waktu, dll)"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def load_manifest():
+    """Manifest berisi hash per sumber bronze & per artefak turunan yang terakhir sukses"""
+    manifest = read_json_object(client, BUCKET_NAME, MANIFEST_OBJECT, default={}) or {}
+    for key in ["sources", "artifacts", "inputs"]: manifest.setdefault(key, {})
+    return manifest
+
+def save_manifest(manifest):
+    manifest["updated_at"] = datetime.now(pytz.utc).isoformat()
+    payload = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+    try: client.put_object(BUCKET_NAME, MANIFEST_OBJECT, io.BytesIO(payload), len(payload), content_type="application/json")
+    except Exception as e: print(f"   ❌ Error Simpan Manifest: {e}")
+
+def stage_upload(artifacts, manifest, staged, object_name, file_path=None, data=None, key=None, source=None, digest=None):
+    """
+    Antre upload hanya jika konten berbeda dari manifest (key = nama logis, default object_name).
+    digest = sha256 konten kalau sudah diketahui (tidak di-hash ulang).
+    Hash baru dicatat saat commit_uploads, setelah upload benar-benar sukses.
+    """
+    key = key or object_name
+    h = digest or (sha256_bytes(data) if data is not None else file_sha256(file_path))
+    if manifest["artifacts"].get(key) == h:
+        print(f"   ⏭️ [SKIP] {key} tidak berubah")
+        return False
+    if data is not None: artifacts.put_bytes(object_name, data)
+    else: artifacts.put_file(object_name, file_path)
+    staged[object_name] = (key, h, source)
+    return True
+
+def commit_uploads(artifacts, manifest, staged, object_names=None):
+    """
+    Flush upload paralel (semua, atau hanya object_names); artefak gagal -> hash sumbernya dibuang
+    supaya di-retry cycle berikutnya
+    """
+    results = artifacts.flush(object_names)
+    for object_name in [n for n in staged if object_names is None or n in object_names]:
+        key, h, source = staged.pop(object_name)
+        if results.get(object_name): manifest["artifacts"][key] = h
+        elif source: manifest["sources"].pop(source, None)
+    return all(results.values())
+
+def publish_gold(artifacts, manifest, staged, pointer, gold_version, gold_objects, lock=None):
+    """
+    Upload gold paralel; pointer hanya dipindah kalau SEMUA upload sukses, lalu manifest disimpan (return sukses/tidak).
+    Lock hilang sebelum pointer dipindah -> LockLost (pointer & manifest tidak disentuh, replica lain yang memegang).
+    """
+    new_names = [n for n, obj in gold_objects.items() if pointer["objects"].get(n) != obj]
+    ok = commit_uploads(artifacts, manifest, staged)
+    artifacts.close()
+    if lock: lock.ensure()
+    if ok and new_names:
+        try: commit_gold_pointer(client, BUCKET_NAME, gold_version, gold_objects)
+        except Exception as e:
+            ok = False
+            print(f"   ❌ Error Commit Pointer Gold: {e}")
+        if ok:
+            prune_gold_versions(client, BUCKET_NAME, {"objects": gold_objects}, keep=GOLD_KEEP_VERSIONS)
+            # Part dataset yang tidak dirujuk manifest versi mana pun dihapus (dan dilupakan dari manifest)
+            for name, obj in gold_objects.items():
+                if obj.endswith(".json"):
+                    for removed in prune_dataset_parts(client, BUCKET_NAME, name): manifest["artifacts"].pop(removed, None)
+    if not ok:
+        # Jangan geser pointer ke set yang setengah jadi; hash gold baru dilupakan supaya di-retry
+        for n in new_names: manifest["artifacts"].pop(f"gold/{os.path.basename(gold_objects[n])}", None)
+        manifest["inputs"].pop("gold/recommendations.parquet", None)
+        print("❌ [GOLD] Ada upload gagal, pointer tetap di versi lama")
+    save_manifest(manifest)
+    return ok
 
 # --- FUNGSI LOGIKA 
-def clean_csv_quotes(file_path):
-    """ Mencoba membaca file dengan berbagai encoding agar tidak crash. """
+def detect_encoding(file_path, sample_size=65536):
+    """Deteksi encoding sekali dari sampel awal file (UTF-8, fallback Latin-1)"""
+    with open(file_path, 'rb') as f: sample = f.read(sample_size)
     try:
-        with open(file_path, 'r', encoding='utf-8') as f: lines = f.readlines()
+        # Decoder incremental supaya karakter multibyte yang terpotong di ujung sampel tidak dianggap error
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
     except UnicodeDecodeError:
         print(f"Warning: Encoding file {os.path.basename(file_path)} bukan UTF-8. Mencoba Latin-1...")
+        return 'latin-1'
+
+class CleanQuotedCsv(io.TextIOBase):
+    """
+    File-like streaming untuk CSV Google Sheet yang tiap barisnya dibungkus quote.
+    Baris dibuka satu per satu saat pd.read_csv meminta data, jadi memori tetap kecil.
+    Decode strict per baris: baris yang bukan encoding hasil deteksi (file campuran, byte rusak setelah sampel)
+    dibaca ulang sebagai Latin-1 dan dihitung di fallback_lines, bukan diam-diam diganti U+FFFD.
+    """
+    def __init__(self, file_path):
+        self.encoding_used = detect_encoding(file_path)
+        self.fallback_lines = 0
+        self._name = os.path.basename(file_path)
+        self._f = open(file_path, 'rb')
+        self._buf = ""
+
+    def _decode(self, raw):
         try:
-            with open(file_path, 'r', encoding='latin-1') as f: lines = f.readlines()
-        except Exception as e:
-            return io.StringIO("") 
+            return raw.decode(self.encoding_used)
+        except UnicodeDecodeError:
+            if not self.fallback_lines:
+                print(f"Warning: {self._name} punya baris bukan {self.encoding_used}. Baris itu dibaca sebagai Latin-1...")
+            self.fallback_lines += 1
+            return raw.decode('latin-1')
 
-    cleaned = []
-    for line in lines:
-        s = line.strip()
+    def _unwrap(self, raw):
+        s = self._decode(raw).strip()
         if s.startswith('"') and s.endswith('"'):
             s = s[1:-1].replace('""', '"')
-        cleaned.append(s)
-    
-    return io.StringIO("\n".join(cleaned))
-
-def get_allowed_categories_by_time(con):
-    tz = pytz.timezone('Asia/Makassar')
-    now = datetime.now(tz)
-    current_date_str = now.strftime("%Y-%m-%d")
-    current_hour = now.hour
-    
-    day_map = {0: 'Senin', 1: 'Selasa', 2: 'Rabu', 3: 'Kamis', 4: 'Jumat', 5: 'Sabtu', 6: 'Minggu'}
-    real_day = day_map[now.weekday()]
-    category_to_use = real_day 
-    print(f"\n[TIME CHECK] Real Time: {real_day}, {current_date_str} @ {current_hour}:00 WITA")
+        return s + "\n"
+
+    def readable(self): return True
+
+    def readline(self, size=-1):
+        if self._buf:
+            line, self._buf = self._buf, ""
+            return line
+        raw = self._f.readline()
+        return self._unwrap(raw) if raw else ""
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            out = self._buf + "".join(self._unwrap(line) for line in self._f)
+            self._buf = ""
+            return out
+        parts, total = [self._buf], len(self._buf)
+        while total < size:
+            raw = self._f.readline()
+            if not raw: break
+            line = self._unwrap(raw)
+            parts.append(line); total += len(line)
+        data = "".join(parts)
+        out, self._buf = data[:size], data[size:]
+        return out
 
+    def __iter__(self): return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line: raise StopIteration
+        return line
+
+    def close(self):
+        if self.fallback_lines and not self.closed:
+            print(f"Warning: {self.fallback_lines} baris {self._name} dibaca sebagai Latin-1")
+        self._f.close()
+        super().close()
+
+def clean_csv_quotes(file_path):
+    """ Buka CSV sebagai stream yang sudah dibersihkan (encoding dideteksi sekali dari sampel). """
     try:
-        tbl_exists = con.execute("SELECT count(*) FROM information_schema.tables WHERE table_name = 'gold_holidays'").fetchone()[0]
-        if tbl_exists > 0:
-            res_holiday = con.execute(f"SELECT name FROM gold_holidays WHERE CAST(date AS VARCHAR) = '{current_date_str}'").fetchone()
-            if res_holiday:
-                category_to_use = 'Minggu'
-                print(f"HOLIDAY DETECTED: {res_holiday[0]}! (Mode Liburan Aktif)")
-    except Exception as e: print(f"Gagal cek hari libur: {e}")
-
-    # Ambil Rule
+        return CleanQuotedCsv(file_path)
+    except Exception:
+        return io.StringIO("")
+
+# Dictionary Mapping: label di rekomendasi_prioritas -> kategori teknis OSM
+HABITAT_CATEGORY_MAP = {
+    "kampus": ["university", "school", "college"], "perpustakaan": ["library"], "toko buku": ["book_store"],
+    "museum": ["museum", "arts_centre", "gallery"], "cafe": ["cafe", "coffee_shop", "restaurant", "fast_food", "food_court"],
+    "restoran": ["restaurant", "fast_food", "food_court"], "mall": ["mall", "department_store", "shop", "electronics", "clothes"],
+    "taman kota": ["park", "garden", "playground", "recreation_ground", "viewpoint", "river_bank"],
+    "tempat ibadah":["place_of_worship", "mosque"], "gym": ["gym", "sports_centre", "stadium"],
+    "art gallery": ["arts_centre", "gallery"], "thrift shop": ["shop", "clothes"],
+    "car free day": ["park", "street"], "hotel": ["hotel"], "rumah": ["residential"], "kost": ["residential"]
+}
+
+# Archetype -> kategori teknis OSM yang cocok (dulu rantai OR di query final_recs)
+ARCHETYPE_CATEGORY_MAP = {
+    'Sporty': ['gym', 'park', 'stadium', 'sports_centre'],
+    'Religius': ['place_of_worship', 'mosque'],
+    'Intellectual': ['library', 'university', 'book_store', 'school'],
+    'Social Butterfly': ['cafe', 'food_court', 'restaurant', 'fast_food'],
+    'Healing': ['park', 'garden', 'river_bank', 'viewpoint'],
+    'Techie': ['electronics', 'computer_shop', 'cafe', 'coworking_space'],
+    'Creative': ['arts_centre', 'gallery', 'museum', 'cafe'],
+    'Active': ['park', 'playground', 'recreation_ground'],
+}
+
+# Kategori yang dianggap indoor (aman saat hujan)
+INDOOR_CATEGORIES = [
+    'mall', 'cafe', 'library', 'museum', 'book_store', 'restaurant', 'fast_food', 'food_court',
+    'shop', 'electronics', 'clothes', 'gym', 'mosque', 'place_of_worship',
+]
+
+def archetype_category_frame():
+    """ARCHETYPE_CATEGORY_MAP sebagai tabel (archetype, kategori); juga dipublish ke gold untuk filter "terdekat" di dashboard"""
+    return pd.DataFrame(
+        [(arch, cat) for arch, cats in ARCHETYPE_CATEGORY_MAP.items() for cat in cats], columns=['archetype', 'kategori']
+    )
+
+def load_dimension_tables(con):
+    """Muat mapping statis sebagai tabel dimensi DuckDB supaya join-nya equi-join (hash join)"""
+    df_archetypes = pd.DataFrame({'archetype_id': np.arange(len(SURVEY_ARCHETYPES), dtype='int8'), 'archetype': SURVEY_ARCHETYPES})
+    df_arch_cat = archetype_category_frame()
+    df_label_map = pd.DataFrame(
+        [(label, cat) for label, cats in HABITAT_CATEGORY_MAP.items() for cat in cats], columns=['label', 'kategori']
+    )
+    df_indoor = pd.DataFrame({'kategori': INDOOR_CATEGORIES})
+    con.execute("CREATE OR REPLACE TABLE archetypes AS SELECT * FROM df_archetypes")
+    con.execute("CREATE OR REPLACE TABLE archetype_category AS SELECT * FROM df_arch_cat")
+    con.execute("CREATE OR REPLACE TABLE habitat_category AS SELECT * FROM df_label_map")
+    con.execute("CREATE OR REPLACE TABLE category_indoor AS SELECT * FROM df_indoor")
+
+def load_rule_slots(con, rules):
+    """
+    Grid rule terkompilasi -> tabel rule_slots (day_category, hour) yang tercakup rule
+    dan slot_categories: kategori teknis yang boleh di tiap slot.
+    """
+    df_slots = rules.to_frame()
+    df_slot_cat = df_slots[['day_category', 'hour', 'categories']].explode('categories').dropna(subset=['categories'])
+    df_slot_cat = df_slot_cat.rename(columns={'categories': 'kategori'}).astype({'hour': 'int32'})
+    df_slots = df_slots[['day_category', 'hour', 'phase_name']].astype({'hour': 'int32'})
+    con.execute("CREATE OR REPLACE TABLE rule_slots AS SELECT * FROM df_slots")
+    con.execute("CREATE OR REPLACE TABLE slot_categories AS SELECT * FROM df_slot_cat")
+
+# Semua nilai dinamis di-bind sebagai parameter; mapping datang dari tabel dimensi (equi-join)
+FINAL_RECS_SQL = """
+    CREATE OR REPLACE TABLE final_recs AS
+    WITH Combined AS (
+        -- LOGIC A: PERSONALIZED (per slot: hanya kategori yang diizinkan rule di slot itu)
+        SELECT 
+            sc.day_category, sc.hour,
+            t1.archetype, 
+            t2.nama_tempat, t2.lat, t2.lon, t2.kategori, t2.score,
+            'Personalized' as metode
+        FROM gold_features t1
+        JOIN archetype_category ac ON ac.archetype = t1.archetype
+        JOIN gold_locations t2 ON t2.kategori = ac.kategori
+        JOIN slot_categories sc ON sc.kategori = t2.kategori
+
+        UNION ALL
+
+        -- LOGIC B: FALLBACK untuk archetype yang belum punya data survey (sama untuk semua slot)
+        SELECT 
+            s.day_category, s.hour,
+            m.archetype,
+            t2.nama_tempat, t2.lat, t2.lon, t2.kategori, t2.score,
+            'Global Top (Fallback)' as metode
+        FROM (SELECT archetype FROM archetypes ANTI JOIN gold_features USING (archetype)) m
+        CROSS JOIN (
+            SELECT * FROM gold_locations 
+            ORDER BY score DESC 
+            LIMIT $fallback_top_n
+        ) t2
+        CROSS JOIN (SELECT DISTINCT day_category, hour FROM rule_slots) s
+    ),
+    Ranked AS (
+        -- Ranking sebelum dikali cuaca, supaya pilihan tempat sama untuk hujan/cerah.
+        -- Seri dipecah hash (bukan random) -> partisi yang inputnya sama menghasilkan file yang sama persis
+        SELECT *,
+            ROW_NUMBER() OVER (PARTITION BY day_category, hour, archetype ORDER BY score DESC, hash(nama_tempat, day_category, hour)) as rank_urutan
+        FROM Combined
+        WHERE archetype IS NOT NULL
+    )
+    SELECT r.*, w.weather_class,
+        CASE 
+            WHEN w.weather_class = 'Rain' AND ci.kategori IS NULL 
+            THEN 'Strategi : Cuaca hujan. Bawa payung atau cari opsi indoor.'
+            ELSE 'Strategi : Cuaca mendukung. Segera meluncur!'
+        END as pesan_strategi,
+        CASE 
+            WHEN w.weather_class = 'Rain' AND ci.kategori IS NULL 
+            THEN '#9d174d' ELSE '#f9a8d4' 
+        END as warna_border
+    FROM Ranked r
+    CROSS JOIN (SELECT unnest($weather_classes::VARCHAR[]) AS weather_class) w
+    LEFT JOIN category_indoor ci ON ci.kategori = r.kategori
+    WHERE r.rank_urutan <= $max_rank
+    ORDER BY archetype, day_category, hour, weather_class, rank_urutan
+"""
+
+def build_final_recs(con, max_rank=10, fallback_top_n=20):
+    """Bangun kubus final_recs dari gold_features, gold_locations, slot_categories & tabel dimensi"""
+    con.execute(FINAL_RECS_SQL, {"weather_classes": WEATHER_CLASSES, "max_rank": max_rank, "fallback_top_n": fallback_top_n})
+
+# Urutan tag OSM yang menentukan kategori tempat
+OSM_CATEGORY_TAGS = ["amenity", "leisure", "shop", "tourism", "building"]
+OSM_LOCATION_SCHEMA = pa.schema([("nama_tempat", pa.string()), ("kategori", pa.string()), ("lat", pa.float64()), ("lon", pa.float64())])
+# Elemen Overpass per batch saat parse streaming (dump provinsi/negara tidak dimuat utuh ke memori)
+OSM_BATCH_ROWS = int(os.environ.get("OSM_BATCH_ROWS", "10000"))
+
+def parse_osm_elements(elements):
+    """Elemen Overpass -> DataFrame (nama_tempat, kategori, lat, lon) secara kolumnar, bukan loop per elemen"""
+    columns = ['nama_tempat', 'kategori', 'lat', 'lon']
+    if not elements: return pd.DataFrame(columns=columns)
+    df_el = pd.DataFrame.from_records(elements)
+    tags = pd.DataFrame.from_records([t if isinstance(t, dict) else {} for t in df_el.get('tags', [None] * len(df_el))])
+    tags = tags.reindex(columns=['name'] + OSM_CATEGORY_TAGS).replace('', np.nan)
+    # Node punya lat/lon langsung; way/relation pakai 'center'
+    center = pd.DataFrame.from_records([c if isinstance(c, dict) else {} for c in df_el.get('center', [None] * len(df_el))])
+    center = center.reindex(columns=['lat', 'lon'])
+    df_loc = pd.DataFrame({
+        'nama_tempat': tags['name'],
+        'kategori': tags[OSM_CATEGORY_TAGS].bfill(axis=1).iloc[:, 0].fillna('other'),
+        'lat': df_el.reindex(columns=['lat'])['lat'].fillna(center['lat']),
+        'lon': df_el.reindex(columns=['lon'])['lon'].fillna(center['lon']),
+    })
+    return df_loc.dropna(subset=columns).reset_index(drop=True)
+
+JSON_DELIMITERS = frozenset(' \t\r\n,:]}')
+
+def iter_json_array(path, key, chunk_size=1 << 20):
+    """
+    Stream item array `key` dari objek JSON top-level tanpa memuat seluruh file:
+    file dibaca per chunk, tiap item di-decode sendiri (raw_decode, scanner C bawaan json).
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf, pos, eof = "", 0, False
+
+        def read_more():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+        def peek():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n': pos += 1
+                if pos < len(buf) or eof: return buf[pos] if pos < len(buf) else ''
+                read_more()
+
+        def decode():
+            nonlocal pos
+            while True:
+                peek()
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # Angka di ujung buffer bisa saja terpotong ("0." dari "0.6") -> diterima kalau diikuti pemisah
+                    if eof or (end < len(buf) and buf[end] in JSON_DELIMITERS):
+                        pos = end
+                        return value
+                except ValueError:
+                    if eof: raise
+                read_more()
+
+        def expect(char):
+            nonlocal pos
+            if peek() != char: raise ValueError(f"{path}: JSON tidak valid di sekitar offset {pos} (harap '{char}')")
+            pos += 1
+
+        expect('{')
+        while peek() not in ('}', ''):
+            if peek() == ',': pos += 1
+            name = decode()
+            expect(':')
+            if name != key:
+                decode()
+                continue
+            expect('[')
+            while peek() != ']':
+                if peek() == '': raise ValueError(f"{path}: array '{key}' terpotong")
+                if peek() == ',': pos += 1
+                yield decode()
+            pos += 1
+
+def write_osm_parquet(path, out_path, batch_rows=OSM_BATCH_ROWS):
+    """
+    Respon Overpass -> silver locations parquet secara streaming: elemen dibaca per batch, di-parse kolumnar,
+    lalu ditulis sebagai row group. Memori ~ satu batch, tidak ikut membesar dengan ukuran dump.
+    Return (jumlah elemen, jumlah lokasi).
+    """
+    elements = iter_json_array(path, "elements")
+    rows_in = rows_out = 0
+    with pq.ParquetWriter(out_path, OSM_LOCATION_SCHEMA) as writer:
+        while batch := list(itertools.islice(elements, batch_rows)):
+            df_loc = parse_osm_elements(batch)
+            rows_in, rows_out = rows_in + len(batch), rows_out + len(df_loc)
+            writer.write_table(pa.Table.from_pandas(df_loc, schema=OSM_LOCATION_SCHEMA, preserve_index=False))
+    return rows_in, rows_out
+
+def download_bronze(filename, dest):
+    """Fallback extract: ambil salinan bronze terakhir yang pernah sukses dari MinIO"""
     try:
-        query = f"""
-            SELECT rekomendasi_prioritas FROM gold_rules 
-            WHERE day_category = '{category_to_use}' 
-            AND {current_hour} >= CAST(start_hour AS INTEGER) 
-            AND {current_hour} < CAST(end_hour AS INTEGER) LIMIT 1
-        """
-        result = con.execute(query).fetchone()
-        if not result: return [] 
-        raw_list = [x.strip().replace('"', '') for x in result[0].split(',')]
-    except Exception as e: return []
-
-    # Dictionary Mapping 
-    dictionary_map = {
-        "kampus": ["university", "school", "college"], "perpustakaan": ["library"], "toko buku": ["book_store"],
-        "museum": ["museum", "arts_centre", "gallery"], "cafe": ["cafe", "coffee_shop", "restaurant", "fast_food", "food_court"],
-        "restoran": ["restaurant", "fast_food", "food_court"], "mall": ["mall", "department_store", "shop", "electronics", "clothes"],
-        "taman kota": ["park", "garden", "playground", "recreation_ground", "viewpoint", "river_bank"],
-        "tempat ibadah":["place_of_worship", "mosque"], "gym": ["gym", "sports_centre", "stadium"],
-        "art gallery": ["arts_centre", "gallery"], "thrift shop": ["shop", "clothes"],
-        "car free day": ["park", "street"], "hotel": ["hotel"], "rumah": ["residential"], "kost": ["residential"]
-    }
-    
-    allowed_technical_cats = []
-    for item in raw_list:
-        clean_item = item.lower().strip()
-        if clean_item in dictionary_map:
-            allowed_technical_cats.extend(dictionary_map[clean_item])
-    
-    return list(set(allowed_technical_cats))
-
-def extract_lokasi_api():
+        client.fget_object(BUCKET_NAME, f"bronze/{filename}", dest)
+        return True
+    except Exception: return False
+
+# Parse Cuaca (bronze forecast -> tabel per jam; gagal/kosong -> cuaca default)
+def parse_weather_forecast(path, city, now=None):
+    steps = None
     try:
-        api_url = "https://raw.githubusercontent.com/rizkiiirr/Social-Radar/refs/heads/main/lokasi_bjm.json" 
-        response = requests.get(api_url, timeout=10)
-        return response.json() if response.status_code == 200 else None
-    except: return None
-
-# Extract Cuaca 
-def extract_weather_data():
-    data = {"main": "Clouds", "temp": 29.5, "description": "berawan (default)"}
+        if path and os.path.exists(path): steps = parse_forecast(path)
+    except Exception as e: print(f"   ⚠️ Gagal parse cuaca {city}: {e}")
+    return hourly_forecast(steps, city, now=now)
+
+# --- TASK DAG ---
+# Task isolated: murni lokal (file bronze -> file silver/gold), jalan di process pool dan hasilnya di-cache per
+# hash input. MinIO, manifest & DuckDB hanya disentuh task di proses utama.
+def task_silver_survey(inputs):
+    state = inputs["prepare_survey"]
+    if not inputs["extract"]["paths"]["survey"]: return {"status": "skipped"}
+    return build_survey_parts(inputs["extract"]["paths"]["survey"], state["watermark"], state["next_id"], state.get("seen"))
+
+def survey_trait_parts():
+    return sorted(glob.glob(os.path.join(local_part_dir(SURVEY_TRAIT_FOLDER), "part-*.parquet")))
+
+def load_trait_counts(parts):
+    """
+    Hitungan trait terakumulasi + part yang sudah terhitung ({nama: [size, mtime_ns]}). Part lama yang hilang/berubah
+    (full refresh, part crash ditimpa) atau daftar archetype berubah -> mulai dari nol.
+    """
+    empty = (pd.DataFrame({'archetype_id': pd.Series(dtype='int64'), 'trait_id': pd.Series(dtype='int64'),
+                           'responses': pd.Series(dtype='int64')}), np.zeros(len(SURVEY_ARCHETYPES), dtype=np.int64)), {}
     try:
-        if OPENWEATHER_API_KEY:
-            url = f"https://api.openweathermap.org/data/2.5/weather?q=Banjarmasin&appid={OPENWEATHER_API_KEY}&units=metric"
-            r = requests.get(url, timeout=5)
-            if r.status_code == 200:
-                d = r.json()
-                data = {"main": d['weather'][0]['main'], "temp": d['main']['temp'], "description": d['weather'][0]['description']}
-    except: pass
-    return data
-
-def run_elt_pipeline():
-    print("🚀 MEMULAI ELT PIPELINE (LAKEHOUSE MODE)")
+        with open(TRAIT_COUNTS_STATE, encoding='utf-8') as f: state = json.load(f)
+        cells = pd.read_parquet(TRAIT_COUNTS_PATH)
+    except (OSError, ValueError):
+        return empty
+    current = {os.path.basename(p): [os.path.getsize(p), os.stat(p).st_mtime_ns] for p in parts}
+    if state.get("archetypes") != [SURVEY_ARCHETYPES, TRAIT_ARCHETYPES]: return empty
+    if any(current.get(name) != stat for name, stat in state["parts"].items()): return empty
+    return (cells, np.asarray(state["responses"], dtype=np.int64)), state["parts"]
+
+def save_trait_counts(counts, folded):
+    cells, responses = counts
+    cells.to_parquet(TRAIT_COUNTS_PATH, index=False)
+    state = {"archetypes": [SURVEY_ARCHETYPES, TRAIT_ARCHETYPES], "parts": folded, "responses": responses.tolist()}
+    with open(TRAIT_COUNTS_STATE + ".tmp", "w", encoding="utf-8") as f: json.dump(state, f)
+    os.replace(TRAIT_COUNTS_STATE + ".tmp", TRAIT_COUNTS_STATE)
 
-    # 0. WEATHER (Bronze -> Silver -> MinIO)
-    w_data = extract_weather_data()
-    pd.DataFrame([w_data]).to_parquet(os.path.join(TEMP_DIR, 'context_weather.parquet'), index=False)
-    upload_file("gold", "context_weather.parquet", os.path.join(TEMP_DIR, 'context_weather.parquet'))
+def task_gold_traits(inputs):
+    """
+    Part silver survey_traits + dim_trait -> matriks sparse archetype x trait (TF-IDF) untuk match ciri.
+    Hitungan per sel dijumlah antar part -> hanya part baru yang dibaca, matriks dihitung ulang dari akumulasi.
+    """
+    parts = survey_trait_parts()
+    if not parts: return {"status": "skipped"}
+    counts, folded = load_trait_counts(parts)
+    new_parts = [p for p in parts if os.path.basename(p) not in folded]
+    shared = [i for i, a in enumerate(SURVEY_ARCHETYPES) if a not in TRAIT_ARCHETYPES]
+    n_rows = 0
+    if new_parts:
+        df_traits = pa.concat_tables([pq.read_table(p, schema=SURVEY_TRAIT_SCHEMA) for p in new_parts]).to_pandas()
+        df_traits = df_traits[~df_traits['archetype_id'].isin(shared)]
+        counts = add_trait_counts(counts, count_traits(df_traits, len(SURVEY_ARCHETYPES)))
+        folded.update({os.path.basename(p): [os.path.getsize(p), os.stat(p).st_mtime_ns] for p in new_parts})
+        save_trait_counts(counts, folded)
+        n_rows = len(df_traits)
+    traits = {trait_id: name for name, trait_id in load_dimension("trait").items()}
+    matrix = trait_matrix_from_counts(*counts, SURVEY_ARCHETYPES, traits)
+    matrix.write(TRAIT_MATRIX_PATH)
+    n_arch, n_traits = matrix.shape
+    print(f"   🧬 [TRAITS] {n_rows} ciri baru dari {len(new_parts)}/{len(parts)} part -> matriks {n_arch}x{n_traits}, "
+          f"{len(matrix)} sel non-nol")
+    return {"files": [TRAIT_MATRIX_PATH], "rows_in": n_rows, "rows_out": len(matrix), "bytes": os.path.getsize(TRAIT_MATRIX_PATH)}
 
-    # 1. EXTRACT (BRONZE)
-    print("[BRONZE] Extracting Data...")
-    SHEET_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQn2iBR8DjQEgmZeA4ieEFLr1876iA5fi0F1p5hcNqYNuYEa9Qe6YlUoYRLPubzJ0D1jyD1P8on29jY/pub?output=csv" 
-    
-    p_survey = os.path.join(TEMP_DIR, 'hasil_survey.csv')
-    p_rules = os.path.join(TEMP_DIR, 'social_time_rules.csv')
-    p_loc = os.path.join(TEMP_DIR, 'lokasi_bjm.json')
+def traits_key(inputs):
+    """key_fn matriks trait: part silver immutable (nama + ukuran) + dimensi trait + urutan archetype"""
+    dim_path = os.path.join(TEMP_DIR, "dim_trait.parquet")
+    return [[(os.path.basename(p), os.path.getsize(p)) for p in survey_trait_parts()],
+            file_sha256(dim_path) if os.path.exists(dim_path) else None, SURVEY_ARCHETYPES, TRAIT_ARCHETYPES]
 
+def task_silver_rules(inputs):
+    p_rules = inputs["extract"]["paths"]["rules"]
+    if not p_rules: return {"status": "skipped"}
+    df_rules = pd.read_csv(clean_csv_quotes(p_rules))
+    df_rules.columns = [c.lower().strip().replace(" ", "_") for c in df_rules.columns]
+    # Dikompilasi + divalidasi dulu; rule yang rusak tidak menimpa silver/grid terakhir yang valid
+    rules = compile_rules(df_rules, HABITAT_CATEGORY_MAP)
+    for warning in rules.warnings: print(f"   ⚠️ [RULES] {warning}")
+    if rules.errors:
+        for error in rules.errors: print(f"   ❌ [RULES] {error}")
+        return {"status": "failed", "error": f"{len(rules.errors)} rule tidak valid", "rows_in": len(df_rules)}
+    df_rules.to_parquet(RULES_SILVER_PATH, index=False)
+    rules.write(RULE_TABLE_PATH)
+    files = [RULES_SILVER_PATH, RULE_TABLE_PATH]
+    return {"files": files, "rows_in": len(df_rules), "rows_out": len(df_rules), "bytes": sum(os.path.getsize(f) for f in files)}
+
+def task_silver_locations(inputs, city):
+    p_loc = inputs["extract"]["paths"][f"lokasi:{city}"]
+    if not p_loc: return {"status": "skipped"}
+    out_path = city_path(city, 'locations.parquet')
+    rows_in, rows_out = write_osm_parquet(p_loc, out_path)
+    return {"files": [out_path], "rows_in": rows_in, "rows_out": rows_out, "bytes": os.path.getsize(out_path)}
+
+def task_silver_holidays(inputs):
+    """Libur dari holidays.db + holidays.json -> silver holidays (date, name) + dimensi kalender harian"""
+    paths = inputs["extract"]["paths"]
+    if not paths["holidays"] and not paths["holidays_json"]: return {"status": "skipped"}
     try:
-        with open(p_survey, 'wb') as f: f.write(requests.get(SHEET_URL).content)
-        upload_file("bronze", "hasil_survey.csv", p_survey)
-    except: 
-        if os.path.exists('hasil_survey.csv'): shutil.copy('hasil_survey.csv', p_survey)
-
-    if os.path.exists('social_time_rules.csv'):
-        shutil.copy('social_time_rules.csv', p_rules)
-        upload_file("bronze", "social_time_rules.csv", p_rules)
-
-    json_data = extract_lokasi_api()
-    if json_data:
-        with open(p_loc, 'w', encoding='utf-8') as f: json.dump(json_data, f)
-        upload_file("bronze", "lokasi_bjm.json", p_loc)
-    elif os.path.exists('lokasi_bjm.json'):
-        shutil.copy('lokasi_bjm.json', p_loc)
-
-    # 2. TRANSFORM (SILVER)
-    print("[SILVER] Transforming...")
-    
-    # Survey
-    df_silver = pd.DataFrame()
-    if os.path.exists(p_survey):
-        df_raw = pd.read_csv(clean_csv_quotes(p_survey))
-        df_raw.columns = [c.lower().strip().replace(" ", "_") for c in df_raw.columns]
-        arch_map = {
-            'Religius': ('relig_fisik_cowo', 'relig_lokasi'), 'Intellectual': ('intel_fisik_cowo', 'intel_lokasi'),
-            'Creative': ('creative_fisik_cowo', 'creative_lokasi'), 'Social Butterfly': ('social_fisik_cowo', 'social_lokasi'), 
-            'Sporty': ('sporty_fisik_cowo', 'sporty_lokasi'), 'Techie': ('techie_fisik_cowo', 'techie_lokasi'),
-            'Active': ('active_fisik_cowo', 'active_lokasi'), 'Healing': ('active_fisik_cowo', 'active_lokasi') 
-        }
-        rows = []
-        for arch, (f_col, l_col) in arch_map.items():
-            if f_col in df_raw.columns:
-                temp = df_raw[['timestamp', 'gender', f_col, l_col]].copy()
-                temp.rename(columns={f_col:'ciri_fisik', l_col:'habitat'}, inplace=True)
-                temp['archetype'] = arch; temp.dropna(subset=['ciri_fisik'], inplace=True)
-                rows.append(temp)
-        if rows:
-            df_silver = pd.concat(rows, ignore_index=True)
-            path_svy_silver = os.path.join(TEMP_DIR, 'survey_data.parquet')
-            df_silver.to_parquet(path_svy_silver, index=False)
-            upload_file("silver", "survey_data.parquet", path_svy_silver)
-
-    # Rules
-    if os.path.exists(p_rules):
-        df_rules = pd.read_csv(clean_csv_quotes(p_rules))
-        df_rules.columns = [c.lower().strip().replace(" ", "_") for c in df_rules.columns]
-        path_rules_silver = os.path.join(TEMP_DIR, 'rules_data.parquet')
-        df_rules.to_parquet(path_rules_silver, index=False)
-        upload_file("silver", "rules_data.parquet", path_rules_silver)
-
-    # Locations
-    df_loc = pd.DataFrame()
-    if os.path.exists(p_loc):
-        with open(p_loc, 'r') as f: data = json.load(f)
-        rows = []
-        for el in data.get("elements", []):
-            tags = el.get("tags", {})
-            name = tags.get("name")
-            if not name: continue
-            cat = "other"
-            for k in ["amenity", "leisure", "shop", "tourism", "building"]: 
-                if tags.get(k): cat = tags[k]; break
-            lat = el.get("lat") or el.get("center", {}).get("lat")
-            lon = el.get("lon") or el.get("center", {}).get("lon")
-            if lat and lon: rows.append({"nama_tempat": name, "kategori": cat, "lat": lat, "lon": lon})
-        df_loc = pd.DataFrame(rows)
-        path_loc_silver = os.path.join(TEMP_DIR, 'locations.parquet')
-        df_loc.to_parquet(path_loc_silver, index=False)
-        upload_file("silver", "locations.parquet", path_loc_silver)
-
-    # Holidays (SQLite Local)
-    if os.path.exists('holidays.db'):
-        try:
-            con_sql = sqlite3.connect('holidays.db')
-            df_hol = pd.read_sql_query("SELECT date, name FROM holidays", con_sql)
-            con_sql.close()
-            df_hol['date'] = pd.to_datetime(df_hol['date']).dt.date
-            path_hol_silver = os.path.join(TEMP_DIR, 'holidays.parquet')
-            df_hol.to_parquet(path_hol_silver, index=False)
-            upload_file("silver", "holidays.parquet", path_hol_silver)
-        except: pass
-
-    # GOLD
-    print("🏆 [GOLD] Aggregating...")
-    if not df_loc.empty:
-        df_gold_loc = df_loc.groupby(['kategori', 'nama_tempat', 'lat', 'lon']).size().reset_index(name='score').sort_values('score', ascending=False).head(300)
-        path_gold_loc = os.path.join(TEMP_DIR, 'gold_locations.parquet')
-        df_gold_loc.to_parquet(path_gold_loc, index=False)
-        upload_file("gold", "gold_locations.parquet", path_gold_loc)
-    else:
-        df_gold_loc = pd.DataFrame(columns=['kategori', 'nama_tempat', 'lat', 'lon', 'score'])
+        sources = [read_holidays_db(paths["holidays"]) if paths["holidays"] else None,
+                   read_holidays_json(paths["holidays_json"]) if paths["holidays_json"] else None]
+        df_hol = merge_holidays(*sources)
+        df_hol[['date', 'name']].to_parquet(HOLIDAYS_SILVER_PATH, index=False)
+        df_cal = build_calendar(df_hol)
+        write_calendar(df_cal, CALENDAR_SILVER_PATH)
+    except Exception as e:
+        print(f"   ⚠️ Gagal baca holidays: {e}")
+        return {"status": "failed", "error": str(e)}
+    print(f"   📅 [CALENDAR] {len(df_hol)} hari libur, {df_cal['date'].min()} s/d {df_cal['date'].max()}")
+    files = [HOLIDAYS_SILVER_PATH, CALENDAR_SILVER_PATH]
+    return {"files": files, "rows_in": sum(len(df) for df in sources if df is not None), "rows_out": len(df_cal),
+            "bytes": sum(os.path.getsize(f) for f in files)}
 
-    if not df_silver.empty:
-        df_feat = (df_silver.groupby('archetype').size().reset_index(name='jumlah').sort_values('jumlah', ascending=False))
-        path_gold_feat = os.path.join(TEMP_DIR, 'gold_features.parquet')
-        df_feat.to_parquet(path_gold_feat, index=False)
-        upload_file("gold", "gold_features.parquet", path_gold_feat)
-    else:
-        df_feat = pd.DataFrame(columns=['archetype', 'jumlah'])
-
-    all_archs = ['Active', 'Creative', 'Healing', 'Intellectual', 'Religius', 'Social Butterfly', 'Sporty', 'Techie']
-    existing_archs = df_feat['archetype'].tolist() if not df_feat.empty else []
-    missing_archs = [a for a in all_archs if a not in existing_archs]
-
-    print(f"💾 [SQL] Building Data Lakehouse Table (In-Memory)...")
-    
-    con = duckdb.connect(":memory:")
-    
-    con.execute("CREATE TABLE gold_features AS SELECT * FROM df_feat")
-    con.execute("CREATE TABLE gold_locations AS SELECT * FROM df_gold_loc")
-    
-    if os.path.exists(os.path.join(TEMP_DIR, 'rules_data.parquet')):
-        con.execute(f"CREATE TABLE gold_rules AS SELECT * FROM '{os.path.join(TEMP_DIR, 'rules_data.parquet')}'")
-    
-    con.execute(f"CREATE TABLE context_weather AS SELECT * FROM '{os.path.join(TEMP_DIR, 'context_weather.parquet')}'")
-    
-    if os.path.exists(os.path.join(TEMP_DIR, 'holidays.parquet')):
-        con.execute(f"CREATE TABLE gold_holidays AS SELECT * FROM '{os.path.join(TEMP_DIR, 'holidays.parquet')}'")
-    else:
-        con.execute("CREATE TABLE gold_holidays (date DATE, name VARCHAR)")
+def task_gold_locations(inputs, city):
+    silver_path = city_path(city, 'locations.parquet')
+    if not os.path.exists(silver_path): return {"status": "skipped"}
+    df_loc = pd.read_parquet(silver_path)
+    if df_loc.empty: return {"status": "skipped", "rows_in": 0}
+    # Elemen duplikat (node/way tempat yang sama) digabung dulu -> score = jumlah kemunculan venue
+    df_loc_scored = dedup_venues(df_loc)
+    print(f"   🧹 [DEDUP] {city}: {len(df_loc)} elemen OSM -> {len(df_loc_scored)} venue")
+    df_gold_loc = df_loc_scored.sort_values('score', ascending=False).head(300)
+    files = [city_path(city, 'gold_locations.parquet'), city_path(city, 'gold_location_index.parquet')]
+    with open(files[0], 'wb') as f: f.write(table_to_parquet_bytes(df_gold_loc))
+    # Index spasial: semua lokasi terurut grid_cell (statistik row group per sel -> bisa di-prune saat dibaca)
+    df_loc_index = add_grid_index(df_loc_scored)
+    with open(files[1], 'wb') as f: f.write(table_to_parquet_bytes(df_loc_index, row_group_size=LOCATION_INDEX_ROW_GROUP))
+    return {"files": files, "rows_in": len(df_loc), "rows_out": len(df_loc_scored), "bytes": sum(os.path.getsize(f) for f in files)}
 
-    allowed_cats = get_allowed_categories_by_time(con)
-    time_filter_sql = ""
-    if allowed_cats:
-        allowed_sql_str = ", ".join([f"'{x}'" for x in allowed_cats])
-        time_filter_sql = f"AND t2.kategori IN ({allowed_sql_str})"
-    else:
-        time_filter_sql = "AND 1=0" 
-
-    cuaca_main = w_data['main'] 
-    indoor_cats = "'mall', 'cafe', 'library', 'museum', 'book_store', 'restaurant', 'fast_food', 'food_court', 'shop', 'electronics', 'clothes', 'gym', 'mosque', 'place_of_worship'"
-
-    missing_sql_list = ", ".join([f"'{x}'" for x in missing_archs])
-    
-    query = f"""
-        CREATE TABLE final_recs AS
-        WITH Combined AS (
-            -- LOGIC A: PERSONALIZED
-            SELECT 
-                t1.archetype, 
-                t2.nama_tempat, t2.lat, t2.lon, t2.kategori, t2.score,
-                'Personalized' as metode
-            FROM gold_features t1
-            JOIN gold_locations t2 ON 
-                (
-                    (t1.archetype = 'Sporty' AND t2.kategori IN ('gym', 'park', 'stadium', 'sports_centre')) OR
-                    (t1.archetype = 'Religius' AND t2.kategori IN ('place_of_worship', 'mosque')) OR
-                    (t1.archetype = 'Intellectual' AND t2.kategori IN ('library', 'university', 'book_store', 'school')) OR
-                    (t1.archetype = 'Social Butterfly' AND t2.kategori IN ('cafe', 'food_court', 'restaurant', 'fast_food')) OR
-                    (t1.archetype = 'Healing' AND t2.kategori IN ('park', 'garden', 'river_bank', 'viewpoint')) OR
-                    (t1.archetype = 'Techie' AND t2.kategori IN ('electronics', 'computer_shop', 'cafe', 'coworking_space')) OR
-                    (t1.archetype = 'Creative' AND t2.kategori IN ('arts_centre', 'gallery', 'museum', 'cafe')) OR
-                    (t1.archetype = 'Active' AND t2.kategori IN ('park', 'playground', 'recreation_ground'))
-                )
-            WHERE 1=1 {time_filter_sql}
-
-            UNION ALL
-
-            -- LOGIC B: FALLBACK
-            SELECT 
-                m.arch_name as archetype,
-                t2.nama_tempat, t2.lat, t2.lon, t2.kategori, t2.score,
-                'Global Top (Fallback)' as metode
-            FROM (SELECT unnest([{missing_sql_list}]) as arch_name) m
-            CROSS JOIN (
-                SELECT * FROM gold_locations 
-                ORDER BY score DESC 
-                LIMIT 20 
-            ) t2
-            WHERE 1=1
-        ),
-        Finalized AS (
-            SELECT *,
-                CASE 
-                    WHEN '{cuaca_main}' LIKE '%Rain%' AND kategori NOT IN ({indoor_cats}) 
-                    THEN 'Strategi : Cuaca hujan. Bawa payung atau cari opsi indoor.'
-                    ELSE 'Strategi : Cuaca mendukung. Segera meluncur!'
-                END as pesan_strategi,
-                
-                CASE 
-                    WHEN '{cuaca_main}' LIKE '%Rain%' AND kategori NOT IN ({indoor_cats}) 
-                    THEN '#9d174d' ELSE '#f9a8d4' 
-                END as warna_border,
-
-                ROW_NUMBER() OVER (PARTITION BY archetype ORDER BY score DESC, random()) as rank_urutan
-            FROM Combined
-            WHERE archetype IS NOT NULL
-        )
-        SELECT * FROM Finalized WHERE rank_urutan <= 10 AND archetype != 'IGNORE_ME'
-    """
-    
-    if not df_gold_loc.empty:
-        # HACK 
-        if not missing_archs:
-             query = query.replace(f"unnest([{missing_sql_list}])", "unnest(['IGNORE_ME'])")
-
-        con.execute(query)
-        
-        path_final = os.path.join(TEMP_DIR, 'recommendations.parquet')
-        con.execute(f"COPY final_recs TO '{path_final}' (FORMAT PARQUET)")
-        
-        upload_file("gold", "recommendations.parquet", path_final)
-        
-        count = con.execute("SELECT COUNT(*) FROM final_recs").fetchone()[0]
-        print(f"✅ ELT SUCCESS! {count} rekomendasi tersimpan di MinIO (Lakehouse Format).")
-    else:
-        print("❌ Data Lokasi Kosong. Pipeline finish without result.")
+def task_city_recs(inputs, city):
+    """
+    Kubus rekomendasi satu kota di DuckDB in-memory milik worker: gold_features bersama (ditulis sekali oleh
+    gold_shared) + gold_locations kota + grid rule. Hasil parquet lokal, terurut archetype/day_category/hour.
+    """
+    if not inputs[f"gold_locations:{city}"].get("files"): return {"status": "skipped", "rows_in": 0}
+    df_gold_loc = pd.read_parquet(city_path(city, 'gold_locations.parquet'))
+    df_feat = pd.read_parquet(GOLD_FEATURES_PATH)
+    # Tiap worker spill ke folder sendiri
+    con = connect_lakehouse("", DUCKDB_MEMORY_LIMIT, os.path.join(DUCKDB_TEMP_DIR, f"city={city}"))
+    try:
+        load_dimension_tables(con)
+        con.execute("CREATE TABLE gold_features AS SELECT * FROM df_feat")
+        con.execute("CREATE TABLE gold_locations AS SELECT * FROM df_gold_loc")
+        if os.path.exists(RULE_TABLE_PATH):
+            load_rule_slots(con, RuleTable.from_parquet(RULE_TABLE_PATH))
+        else:
+            con.execute("CREATE OR REPLACE TABLE rule_slots (day_category VARCHAR, hour INTEGER, phase_name VARCHAR)")
+            con.execute("CREATE OR REPLACE TABLE slot_categories (day_category VARCHAR, hour INTEGER, kategori VARCHAR)")
+        build_final_recs(con)
+        recs_table = con.execute("SELECT * FROM final_recs").fetch_arrow_table()
+        n_slots = con.execute("SELECT COUNT(DISTINCT (day_category, hour)) FROM final_recs").fetchone()[0]
+    finally:
+        con.close()
+    out_path = city_path(city, 'recommendations.parquet')
+    pq.write_table(recs_table, out_path)
+    return {"files": [out_path], "sha": file_sha256(out_path), "rows_in": len(df_gold_loc), "rows_out": recs_table.num_rows,
+            "bytes": os.path.getsize(out_path), "slots": n_slots}
+
+def recs_key(inputs):
+    """key_fn rekomendasi kota (selain gold_locations kota): hash gold_features + grid rule + mapping yang ikut ke SQL"""
+    return [inputs["gold_shared"]["sha"], sorted(ARCHETYPE_CATEGORY_MAP.items()), INDOOR_CATEGORIES, WEATHER_CLASSES]
+
+def source_key(source):
+    """key_fn task silver: hash file bronze sumbernya (dihitung sekali di task extract)"""
+    return lambda inputs: inputs["extract"]["sha"][source]
+
+def build_pipeline_tasks(metrics, manifest, artifacts, staged, lock=None):
+    """
+    Daftar Task pipeline; task non-isolated adalah closure atas manifest/artifacts/staged run ini.
+    lock = ObjectLock scheduler (None = run manual tanpa lock), dicek sebelum watermark & pointer gold ditulis.
+    """
+    def extract(inputs):
+        # EXTRACT (BRONZE) - semua sumber paralel, tiap sumber punya timeout/retry/fallback sendiri
+        print("[BRONZE] Extracting Data...")
+        bronze = run_extract(TEMP_DIR, cache_loader=download_bronze)
+        for r in bronze.values():
+            # Sumber jalan paralel di thread -> cukup wall time + ukuran file bronze per sumber
+            size = os.path.getsize(r["path"]) if r["path"] and os.path.exists(r["path"]) else None
+            metrics.record("extract_source", r["elapsed"], status="ok" if r["path"] else "failed", bytes=size,
+                           labels={"source": r["name"]}, source_status=r["status"], error=r["error"], bytes_received=r["bytes_received"])
+        p_rules = os.path.join(TEMP_DIR, 'social_time_rules.csv')
+        if os.path.exists('social_time_rules.csv'):
+            shutil.copy('social_time_rules.csv', p_rules)
+        # Sumber gagal tanpa fallback -> pakai file bronze run sebelumnya kalau masih ada di TEMP_DIR
+        paths = {name: bronze[name]["path"] or os.path.join(TEMP_DIR, filename) for name, filename in SOURCE_FILES.items() if name != "rules"}
+        paths = {name: path if os.path.exists(path) else None for name, path in paths.items()}
+        paths["rules"] = p_rules if os.path.exists(p_rules) else None
+        # Hash dari fetcher (dihitung sambil download / tersimpan di validator saat 304) -> file tidak dibaca ulang.
+        # Sumber 304 = hash sama = cache task silver/gold turunannya langsung terpakai
+        sha = {name: (bronze[name]["sha256"] if name in bronze and bronze[name]["path"] == paths[name] else None) for name in SOURCE_FILES}
+        sha = {name: digest or (file_sha256(paths[name]) if paths[name] else None) for name, digest in sha.items()}
+        for name in BRONZE_UPLOADS:
+            if paths[name]: stage_upload(artifacts, manifest, staged, f"bronze/{SOURCE_FILES[name]}", file_path=paths[name], digest=sha[name])
+        return {"paths": paths, "sha": sha}
+
+    def prepare_survey(inputs):
+        """Sinkron part/dimensi survey + watermark dari MinIO sebelum build di worker"""
+        if SURVEY_FULL_REFRESH:
+            reset_survey_silver()
+            for key in [k for k in manifest["artifacts"] if k.startswith(tuple(SURVEY_PART_FOLDERS) + ("silver/dim_",))]:
+                manifest["artifacts"].pop(key)
+            return {"watermark": None, "next_id": 0}
+        sync_survey_parts()
+        sync_dimensions()
+        watermark, next_id, seen = load_survey_watermark()
+        return {"watermark": watermark.isoformat() if watermark is not None else None, "next_id": next_id, "seen": seen}
+
+    def silver_weather(inputs):
+        """Prakiraan per jam semua kota (mulai jam sekarang) + cuaca jam sekarang per kota untuk context_weather"""
+        now = pd.Timestamp.now(tz='UTC')
+        df_forecast = pd.concat([parse_weather_forecast(inputs["extract"]["paths"][f"weather:{city}"], city, now) for city in CITIES],
+                                ignore_index=True)
+        write_forecast(df_forecast, WEATHER_FORECAST_PATH)
+        current = df_forecast.drop_duplicates('city').set_index('city')
+        weather = {city: {c: current.at[city, c] if city in current.index else v for c, v in DEFAULT_WEATHER.items()} for city in CITIES}
+        return {"weather": weather, "rows_out": len(df_forecast)}
+
+    def commit_silver(inputs):
+        """Bronze + silver di-upload paralel sekaligus; hash sumber dicatat di manifest"""
+        for name, filename in SOURCE_FILES.items():
+            if inputs["extract"]["sha"][name]: manifest["sources"][filename] = inputs["extract"]["sha"][name]
+        ok = commit_survey_parts(artifacts, manifest, staged, inputs["silver_survey"], lock)
+        if not ok: manifest["sources"].pop("hasil_survey.csv", None)
+        silver_tasks = [("silver_rules", "social_time_rules.csv"), ("silver_holidays", "holidays.db")]
+        silver_tasks += [(f"silver_locations:{city}", SOURCE_FILES[f"lokasi:{city}"]) for city in CITIES]
+        for task_name, source in silver_tasks:
+            result = inputs[task_name]
+            if result.get("status") == "failed": manifest["sources"].pop(source, None)
+            for path in result.get("files", []):
+                # File per kota -> silver/city=<slug>/<nama>
+                stage_upload(artifacts, manifest, staged, f"silver/{os.path.relpath(path, TEMP_DIR)}", file_path=path, source=source)
+        ok = commit_uploads(artifacts, manifest, staged) and ok
+        return {"status": "ok" if ok else "failed"}
+
+    def gold_shared(inputs):
+        """
+        Lakehouse (sekali untuk semua kota): MERGE survey -> gold_features, lokasi & cuaca semua kota, rule,
+        libur, kalender. Frame gold bersama ditulis ke file lokal -> dibaca worker rekomendasi per kota & task gold.
+        """
+        print(f"💾 [SQL] Building Data Lakehouse Table ({LAKEHOUSE_DB or 'In-Memory'})...")
+        # Lokasi & cuaca semua kota digabung dengan kolom city (urutan CITIES, index spasial tetap terurut per kota)
+        loc_frames, index_frames = [], []
+        for city in CITIES:
+            if not inputs[f"gold_locations:{city}"].get("files"): continue
+            loc_frames.append(pd.read_parquet(city_path(city, 'gold_locations.parquet')).assign(city=city))
+            index_frames.append(pd.read_parquet(city_path(city, 'gold_location_index.parquet')).assign(city=city))
+        if loc_frames:
+            df_gold_loc = pd.concat(loc_frames, ignore_index=True)
+            with open(GOLD_LOCATIONS_PATH, 'wb') as f: f.write(table_to_parquet_bytes(df_gold_loc))
+            df_loc_index = pd.concat(index_frames, ignore_index=True)
+            with open(LOCATION_INDEX_PATH, 'wb') as f: f.write(table_to_parquet_bytes(df_loc_index, row_group_size=LOCATION_INDEX_ROW_GROUP))
+        else:
+            df_gold_loc = pd.DataFrame({
+                'kategori': pd.Series(dtype='str'), 'nama_tempat': pd.Series(dtype='str'), 'lat': pd.Series(dtype='float64'),
+                'lon': pd.Series(dtype='float64'), 'score': pd.Series(dtype='int64'), 'city': pd.Series(dtype='str'),
+            })
+            for path in [GOLD_LOCATIONS_PATH, LOCATION_INDEX_PATH]:
+                if os.path.exists(path): os.remove(path)
+        weather = inputs["silver_weather"]["weather"]
+        df_weather = pd.DataFrame([{"city": city, **weather[city]} for city in CITIES])
+        with open(CONTEXT_WEATHER_PATH, 'wb') as f: f.write(table_to_parquet_bytes(df_weather))
+
+        with metrics.stage("gold_build", dataset="lakehouse") as st:
+            con = connect_lakehouse(LAKEHOUSE_DB, DUCKDB_MEMORY_LIMIT, DUCKDB_TEMP_DIR)
+            load_dimension_tables(con)
 
-    con.close()
+            # History survey: hanya part silver baru/berubah yang di-MERGE (persisten -> run berikutnya mulai hangat)
+            if SURVEY_FULL_REFRESH: reset_parts(con, "survey_responses")
+            n_parts = load_new_parts(con, "survey_responses", SURVEY_SILVER_DIR, ["response_id", "archetype_id"], file_sha256)
+            if n_parts: print(f"   🦆 [LAKEHOUSE] {n_parts} part survey di-merge ke survey_responses")
+            if con.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = 'survey_responses'").fetchone()[0]:
+                df_feat = con.execute("""
+                    SELECT a.archetype, COUNT(*) AS jumlah
+                    FROM survey_responses r JOIN archetypes a USING (archetype_id)
+                    GROUP BY a.archetype ORDER BY jumlah DESC, a.archetype
+                """).df()
+            else:
+                df_feat = pd.DataFrame({'archetype': pd.Series(dtype='str'), 'jumlah': pd.Series(dtype='int64')})
+            with open(GOLD_FEATURES_PATH, 'wb') as f: f.write(table_to_parquet_bytes(df_feat))
+
+            # Tabel gold di-MERGE: baris yang tidak berubah tidak ditulis ulang
+            merge_changes = {
+                "gold_features": merge_frame(con, "gold_features", df_feat, ["archetype"], delete_missing=True),
+                "gold_locations": merge_frame(con, "gold_locations", df_gold_loc, ["city", "kategori", "nama_tempat", "lat", "lon"], delete_missing=True),
+            }
+            if os.path.exists(RULES_SILVER_PATH):
+                merge_changes["gold_rules"] = merge_frame(con, "gold_rules", pd.read_parquet(RULES_SILVER_PATH), ["day_category", "start_hour"], delete_missing=True)
+            if os.path.exists(HOLIDAYS_SILVER_PATH):
+                merge_changes["gold_holidays"] = merge_frame(con, "gold_holidays", pd.read_parquet(HOLIDAYS_SILVER_PATH), ["date"], delete_missing=True)
+            else:
+                con.execute("CREATE TABLE IF NOT EXISTS gold_holidays (date DATE, name VARCHAR)")
+            if os.path.exists(CALENDAR_SILVER_PATH):
+                merge_changes["gold_calendar"] = merge_frame(con, "gold_calendar", pd.read_parquet(CALENDAR_SILVER_PATH), ["date"], delete_missing=True)
+            for table, changes in merge_changes.items():
+                if changes: print(f"   🦆 [MERGE] {table}: {changes}")
+            # rows_out = baris yang benar-benar ditulis MERGE (insert/update/delete), bukan ukuran tabel
+            st.rows_out = sum(sum(changes.values()) for changes in merge_changes.values())
+            st.extra["survey_parts_merged"] = n_parts
+
+            con.execute("CREATE OR REPLACE TABLE context_weather AS SELECT * FROM df_weather")
+            merge_frame(con, "weather_history", df_weather.assign(fetched_at=pd.Timestamp.now(tz='UTC').floor('s')), ["city", "fetched_at"])
+            # Dashboard butuh daftar libur untuk memilih slot day_category sendiri
+            with open(GOLD_HOLIDAYS_PATH, 'wb') as f: f.write(table_to_parquet_bytes(con.execute("SELECT * FROM gold_holidays").fetch_arrow_table()))
+            con.close()
+        sha = {"gold_features": file_sha256(GOLD_FEATURES_PATH)}
+        if os.path.exists(RULE_TABLE_PATH): sha["gold_rule_table"] = file_sha256(RULE_TABLE_PATH)
+        return {"sha": sha, "features": len(df_feat), "rows_out": st.rows_out}
+
+    def gold(inputs):
+        # GOLD - ditulis dari buffer memori ke gold/v/<versi>/, lalu pointer gold/_CURRENT.json di-commit
+        print("🏆 [GOLD] Aggregating...")
+        gold_version = new_version_id()
+        pointer = load_gold_pointer(client, BUCKET_NAME)
+        gold_objects = dict(pointer["objects"])
+
+        def stage_gold(name, data, ext="parquet"):
+            object_name = f"{GOLD_VERSION_PREFIX}/{gold_version}/{name}.{ext}"
+            # Kalau pointer belum punya artefak ini, paksa upload walau hash sama
+            if name not in gold_objects: manifest["artifacts"].pop(f"gold/{name}.{ext}", None)
+            if stage_upload(artifacts, manifest, staged, object_name, data=data, key=f"gold/{name}.{ext}"):
+                gold_objects[name] = object_name
+
+        def stage_gold_file(name, path):
+            with open(path, 'rb') as f: stage_gold(name, f.read())
+
+        def stage_gold_dataset(name, table, partition_by):
+            """Dataset Hive: part content-addressed (hanya partisi yang isinya berubah di-upload) + manifest berversi"""
+            parts = []
+            for values, part in split_partitions(table, partition_by):
+                data = table_to_parquet_bytes(part)
+                object_name = partition_object_name(name, partition_by, values, sha256_bytes(data))
+                stage_upload(artifacts, manifest, staged, object_name, data=data)
+                parts.append({"path": object_name, "values": values, "rows": part.num_rows})
+            ds_manifest = {
+                "dataset": name, "partition_by": partition_by,
+                "columns": [f.name for f in table.schema if f.name not in partition_by], "parts": parts,
+            }
+            n_new = sum(1 for o in staged if o.startswith(f"{GOLD_DATASET_PREFIX}/{name}/"))
+            print(f"   🗂️ [GOLD] {name}: {len(parts)} partisi, {n_new} ditulis ulang")
+            stage_gold(name, json.dumps(ds_manifest, sort_keys=True).encode("utf-8"), ext="json")
+
+        stage_gold_file("context_weather", CONTEXT_WEATHER_PATH)
+        # Prakiraan per jam: dashboard memilih kelas cuaca kubus untuk jam yang direncanakan
+        stage_gold_file("weather_forecast", WEATHER_FORECAST_PATH)
+        if os.path.exists(GOLD_LOCATIONS_PATH):
+            stage_gold_file("gold_locations", GOLD_LOCATIONS_PATH)
+            stage_gold_file("gold_location_index", LOCATION_INDEX_PATH)
+        if inputs["gold_shared"]["features"]: stage_gold_file("gold_features", GOLD_FEATURES_PATH)
+        # Matriks archetype x trait: dashboard mode "deskripsikan dia" memilih archetype dari ciri yang diamati
+        if inputs["gold_traits"].get("files"): stage_gold_file("gold_trait_matrix", TRAIT_MATRIX_PATH)
+        stage_gold_file("gold_holidays", GOLD_HOLIDAYS_PATH)
+        # Grid rule 7x24 terkompilasi: dashboard lookup fase/kategori per slot tanpa parsing rule
+        if os.path.exists(RULE_TABLE_PATH): stage_gold_file("gold_rule_table", RULE_TABLE_PATH)
+        # Archetype -> kategori: bersama grid rule, dashboard menentukan kategori yang boleh untuk "terdekat"
+        stage_gold("gold_archetype_category", table_to_parquet_bytes(archetype_category_frame()))
+        # Kalender harian (day_category efektif per tanggal) -> lookup per tanggal tanpa tabel libur
+        if os.path.exists(CALENDAR_SILVER_PATH): stage_gold_file("gold_calendar", CALENDAR_SILVER_PATH)
+
+        # final_recs = kubus semua slot per kota (dihitung worker city_recs), jadi tidak bergantung jam sekarang
+        city_recs = {city: inputs[f"city_recs:{city}"] for city in CITIES if inputs[f"city_recs:{city}"].get("files")}
+        recs_fp = fingerprint({city: r["sha"] for city, r in city_recs.items()}, RECS_PARTITION_BY)
+        count = None
+        if manifest["inputs"].get("gold/recommendations.parquet") == recs_fp and "recommendations" in gold_objects:
+            print("⏭️ [SKIP] final_recs: input tidak berubah")
+        elif city_recs:
+            with metrics.stage("gold_build", dataset="recommendations") as st:
+                # Part kota digabung berurutan -> tetap terurut city, archetype, day_category, hour
+                recs_table = pa.concat_tables([
+                    pq.read_table(r["files"][0]).add_column(0, "city", pa.array([city] * r["rows_out"], pa.string()))
+                    for city, r in city_recs.items()
+                ])
+                stage_gold_dataset("recommendations", recs_table, RECS_PARTITION_BY)
+                st.rows_in = recs_table.num_rows
+            manifest["inputs"]["gold/recommendations.parquet"] = recs_fp
+            count = recs_table.num_rows
+            n_slots = max(r["slots"] for r in city_recs.values())
+            print(f"✅ ELT SUCCESS! {count} rekomendasi ({len(city_recs)} kota, {n_slots} slot waktu) tersimpan di MinIO (Lakehouse Format).")
+        else:
+            print("❌ Data Lokasi Kosong. Pipeline finish without result.")
+
+        with metrics.stage("upload", layer="gold") as st:
+            if not publish_gold(artifacts, manifest, staged, pointer, gold_version, gold_objects, lock): st.status = "failed"
+        return {"status": st.status, "recommendations": count}
+
+    city_tasks = []
+    for city in CITIES:
+        city_tasks += [
+            Task(f"silver_locations:{city}", functools.partial(task_silver_locations, city=city), deps=["extract"], isolated=True,
+                 key_fn=source_key(f"lokasi:{city}"), stage=("silver", {"dataset": "locations", "city": city})),
+            Task(f"gold_locations:{city}", functools.partial(task_gold_locations, city=city), deps=[f"silver_locations:{city}"],
+                 isolated=True, key_fn=lambda inputs: [LOCATION_INDEX_ROW_GROUP], stage=("gold_build", {"dataset": "locations", "city": city})),
+            Task(f"city_recs:{city}", functools.partial(task_city_recs, city=city), deps=["gold_shared", f"gold_locations:{city}"],
+                 isolated=True, key_fn=recs_key, stage=("final_recs", {"city": city})),
+        ]
+    return [
+        Task("extract", extract, stage=("extract", {})),
+        Task("prepare_survey", prepare_survey, deps=["extract"], stage=("prepare", {"dataset": "survey"})),
+        Task("silver_survey", task_silver_survey, deps=["extract", "prepare_survey"], isolated=True,
+             key_fn=source_key("survey"), stage=("silver", {"dataset": "survey"})),
+        # Mapping label -> kategori ikut dikompilasi ke grid rule
+        Task("silver_rules", task_silver_rules, deps=["extract"], isolated=True,
+             key_fn=lambda inputs: [inputs["extract"]["sha"]["rules"], sorted(HABITAT_CATEGORY_MAP.items())],
+             stage=("silver", {"dataset": "rules"})),
+        # Rentang kalender mengikuti tahun berjalan -> ikut cache key
+        Task("silver_holidays", task_silver_holidays, deps=["extract"], isolated=True,
+             key_fn=lambda inputs: [inputs["extract"]["sha"]["holidays"], inputs["extract"]["sha"]["holidays_json"], date.today().year],
+             stage=("silver", {"dataset": "holidays"})),
+        Task("silver_weather", silver_weather, deps=["extract"], stage=("silver", {"dataset": "weather"})),
+        *city_tasks,
+        Task("commit_silver", commit_silver, deps=["extract", "silver_survey", "silver_rules", "silver_holidays"] + [f"silver_locations:{c}" for c in CITIES],
+             stage=("upload", {"layer": "bronze_silver"})),
+        Task("gold_traits", task_gold_traits, deps=["silver_survey"], isolated=True, key_fn=traits_key,
+             stage=("gold_build", {"dataset": "traits"})),
+        Task("gold_shared", gold_shared, deps=["commit_silver", "silver_weather"] + [f"gold_locations:{c}" for c in CITIES]),
+        Task("gold", gold, deps=["gold_shared", "gold_traits"] + [f"city_recs:{c}" for c in CITIES]),
+    ]
+
+def run_pipeline_stages(metrics, targets=None, force=(), only=False, workers=PIPELINE_WORKERS, lock=None):
+    print("🚀 MEMULAI ELT PIPELINE (LAKEHOUSE MODE)")
+    manifest = load_manifest()
+    artifacts = ArtifactWriter(client, BUCKET_NAME)
+    metrics.attach_uploads(artifacts.upload_stats)
+    staged = {}
+    force = set(force) | ({"silver_survey"} if SURVEY_FULL_REFRESH else set())
+    runner = DagRunner(build_pipeline_tasks(metrics, manifest, artifacts, staged, lock), DAG_STATE_FILE, workers, metrics)
+    try:
+        runner.run(targets, force=force, only=only)
+    finally:
+        # Run sebagian (--task tanpa gold): upload yang sudah diantre tetap di-commit ke manifest.
+        # Lock hilang -> manifest milik replica yang sekarang memegang lock, tidak ditimpa
+        if staged and not (lock and lock.lost):
+            commit_uploads(artifacts, manifest, staged)
+            save_manifest(manifest)
+        artifacts.close()
+
+def run_elt_pipeline(targets=None, force=(), only=False, workers=PIPELINE_WORKERS, lock=None):
+    """
+    Satu siklus ELT (atau sebagian task-nya); run report + file Prometheus tetap ditulis walau siklus gagal di tengah.
+    lock = ObjectLock yang dipegang pemanggil (scheduler); hilang di tengah run -> watermark/pointer tidak ditulis.
+    Return run report.
+    """
+    metrics = RunMetrics(profile_dir=os.path.join(TEMP_DIR, "profiles") if PIPELINE_PROFILE else None)
+    try:
+        run_pipeline_stages(metrics, targets, force, only, workers, lock)
+    except BaseException as e:
+        metrics.fail(e)
+        raise
+    finally:
+        report = metrics.publish(client, BUCKET_NAME, METRICS_PROM_FILE)
+    return report
 
 if __name__ == "__main__":
-    run_elt_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="ELT pipeline Social Radar (DAG task)")
+    parser.add_argument("--task", action="append", help="jalankan task ini + dependency-nya (bisa diulang)")
+    parser.add_argument("--force", action="append", default=[], help="abaikan cache task ini (bisa diulang)")
+    parser.add_argument("--only", action="store_true", help="hanya --task; hasil dependency diambil dari run sebelumnya")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS, help="ukuran process pool (0 = serial)")
+    parser.add_argument("--list", action="store_true", help="tampilkan task, dependency dan waktu selesai terakhir")
+    args = parser.parse_args()
+    if args.list:
+        runner = DagRunner(build_pipeline_tasks(None, None, None, None), DAG_STATE_FILE)
+        for name, deps, isolated, finished_at in runner.describe():
+            print(f"{name:<30} {'process' if isolated else 'main':<8} {finished_at or '-':<34} <- {', '.join(deps) or '-'}")
+    else:
+        run_elt_pipeline(args.task, args.force, args.only, args.workers)
@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import sqlite3
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from cities import active_cities, lokasi_file, lokasi_request
+
+# --- KONFIGURASI SUMBER (BRONZE) ---
+# URL bisa di-override lewat env, misal diarahkan ke stub server lokal saat testing offline
+SHEET_URL = os.environ.get("SHEET_URL", "https://docs.google.com/spreadsheets/d/e/2PACX-1vQn2iBR8DjQEgmZeA4ieEFLr1876iA5fi0F1p5hcNqYNuYEa9Qe6YlUoYRLPubzJ0D1jyD1P8on29jY/pub?output=csv")
+OPENWEATHER_FORECAST_URL = os.environ.get("OPENWEATHER_FORECAST_URL", "https://api.openweathermap.org/data/2.5/forecast")
+OPENWEATHER_API_KEY = os.environ.get("OPENWEATHER_API_KEY", "")
+# Forecast (langkah 3 jam, 5 hari) cukup di-fetch ulang setelah TTL; run di antaranya memakai salinan bronze lokal
+WEATHER_FORECAST_TTL = int(os.environ.get("WEATHER_FORECAST_TTL", "10800"))
+HOLIDAYS_DB = os.environ.get("HOLIDAYS_DB", "holidays.db")
+HOLIDAYS_JSON = os.environ.get("HOLIDAYS_JSON", "holidays.json")
+
+RETRY_BACKOFF = float(os.environ.get("EXTRACT_RETRY_BACKOFF", "0.5"))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Probe sumber tanpa validator HEAD (Google Sheets CSV): isi di-download + di-hash paling sering sekali per interval ini.
+# Default 2x SCHEDULER_POLL_SECONDS -> hash tiap poll kedua, respon baru tetap terlihat dalam ~10 menit
+# (bukan menunggu SCHEDULER_MAX_INTERVAL), download sheet per jam tetap separuh dari hash tiap poll.
+PROBE_HASH_INTERVAL = int(os.environ.get("PROBE_HASH_INTERVAL", str(2 * int(os.environ.get("SCHEDULER_POLL_SECONDS", "300")))))
+
+# Validator HTTP (ETag/Last-Modified) per file bronze disimpan di <file>.validators.json di sebelahnya
+VALIDATORS_SUFFIX = ".validators.json"
+
+# Session dipakai bersama semua sumber (connection pool keep-alive, respon gzip); sumber per kota ikut berbagi pool
+session = requests.Session()
+session.headers["Accept-Encoding"] = "gzip, deflate"
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+
+class SourceUnavailable(Exception):
+    """Sumber gagal diambil setelah semua retry"""
+
+
+class NotModified(Exception):
+    """Server menjawab 304: salinan bronze lokal masih sama dengan sumber (sha256 = hash tersimpan)"""
+    def __init__(self, sha256=None):
+        super().__init__("304 Not Modified")
+        self.sha256 = sha256
+
+
+# --- VALIDATOR CONDITIONAL GET ---
+def load_validators(dest, key):
+    """
+    Validator tersimpan untuk dest. Hanya dipakai kalau URL-nya sama dan file bronze masih persis file hasil
+    fetch itu (ukuran + mtime), bukan salinan dari fallback MinIO/seed.
+    """
+    try:
+        with open(dest + VALIDATORS_SUFFIX, encoding="utf-8") as f: validators = json.load(f)
+        st = os.stat(dest)
+    except (OSError, ValueError):
+        return None
+    if validators.get("key") != key or validators.get("file") != [st.st_size, st.st_mtime_ns]: return None
+    return validators
+
+
+def save_validators(dest, key, etag, last_modified, content_length, sha256):
+    st = os.stat(dest)
+    validators = {
+        "key": key, "etag": etag, "last_modified": last_modified, "content_length": content_length,
+        "sha256": sha256, "file": [st.st_size, st.st_mtime_ns],
+    }
+    with open(dest + VALIDATORS_SUFFIX + ".tmp", "w", encoding="utf-8") as f: json.dump(validators, f)
+    os.replace(dest + VALIDATORS_SUFFIX + ".tmp", dest + VALIDATORS_SUFFIX)
+
+
+# --- FETCHER PER JENIS SUMBER ---
+def fetch_http(url, params=None):
+    """
+    Fetcher HTTP conditional: kirim If-None-Match/If-Modified-Since dari validator tersimpan, 304 -> NotModified
+    (tanpa body). Response 200 di-stream ke file sementara sambil di-hash, baru di-rename kalau sukses.
+    timeout requests hanya berlaku per baca socket; server yang terus menetes pelan dihentikan lewat deadline
+    per sumber (timeout detik sejak request dikirim), dicek tiap blok 8 KiB (blok kecil supaya satu blok di koneksi
+    lambat tidak jauh melewati deadline). Return sha256 isi file.
+    """
+    key = requests.Request("GET", url, params=params).prepare().url
+
+    def fetch(dest, timeout):
+        cached = load_validators(dest, key)
+        headers = {}
+        if cached and cached.get("etag"): headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"): headers["If-Modified-Since"] = cached["last_modified"]
+        tmp, h = dest + ".part", hashlib.sha256()
+        deadline = time.monotonic() + timeout
+        with session.get(url, params=params, headers=headers, timeout=timeout, stream=True) as r:
+            if r.status_code == 304 and cached:
+                # mtime disegarkan (ttl sumber dihitung dari fetch terakhir yang berhasil dicek)
+                os.utime(dest)
+                save_validators(dest, key, cached["etag"], cached["last_modified"], cached["content_length"], cached["sha256"])
+                raise NotModified(cached["sha256"])
+            if r.status_code in RETRYABLE_STATUS:
+                raise requests.HTTPError(f"HTTP {r.status_code}", response=r)
+            if r.status_code != 200:
+                raise SourceUnavailable(f"HTTP {r.status_code}")
+            with open(tmp, 'wb') as f:
+                for block in r.iter_content(chunk_size=1 << 13):
+                    if time.monotonic() > deadline:
+                        raise requests.Timeout(f"download melewati deadline {timeout}s ({f.tell()} byte)")
+                    f.write(block)
+                    h.update(block)
+            etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+            content_length = r.headers.get("Content-Length")
+        os.replace(tmp, dest)
+        if etag or last_modified: save_validators(dest, key, etag, last_modified, content_length, h.hexdigest())
+        elif os.path.exists(dest + VALIDATORS_SUFFIX): os.remove(dest + VALIDATORS_SUFFIX)
+        return h.hexdigest()
+    return fetch
+
+def fetch_forecast(query):
+    """Fetcher prakiraan cuaca OpenWeather untuk satu kota (query 'Nama,ID')"""
+    def fetch(dest, timeout):
+        if not OPENWEATHER_API_KEY: raise SourceUnavailable("OPENWEATHER_API_KEY kosong")
+        return fetch_http(OPENWEATHER_FORECAST_URL, {"q": query, "appid": OPENWEATHER_API_KEY, "units": "metric"})(dest, timeout)
+    return fetch
+
+def fetch_sqlite(db_path):
+    """Snapshot SQLite lokal ke bronze (pakai backup API supaya konsisten)"""
+    def fetch(dest, timeout):
+        if not os.path.exists(db_path): raise SourceUnavailable(f"{db_path} tidak ada")
+        tmp = dest + ".part"
+        if os.path.exists(tmp): os.remove(tmp)
+        src = sqlite3.connect(db_path, timeout=timeout)
+        dst = sqlite3.connect(tmp)
+        try: src.backup(dst)
+        finally:
+            dst.close(); src.close()
+        os.replace(tmp, dest)
+    return fetch
+
+def fetch_file(path):
+    """Salin file lokal ke bronze (tulis ke .part lalu rename)"""
+    def fetch(dest, timeout):
+        if not os.path.exists(path): raise SourceUnavailable(f"{path} tidak ada")
+        shutil.copyfile(path, dest + ".part")
+        os.replace(dest + ".part", dest)
+    return fetch
+
+# name, file bronze, fetcher, timeout (detik), jumlah retry, file seed di repo (+ ttl: salinan lokal yang lebih muda dipakai tanpa fetch)
+# Sumber bersama semua kota; lokasi + cuaca per kota dari city_sources()
+SOURCES = [
+    {"name": "survey", "filename": "hasil_survey.csv", "fetch": fetch_http(SHEET_URL), "timeout": 20, "retries": 3, "seed": "hasil_survey.csv"},
+    {"name": "holidays", "filename": "holidays.db", "fetch": fetch_sqlite(HOLIDAYS_DB), "timeout": 5, "retries": 1, "seed": None},
+    {"name": "holidays_json", "filename": "holidays.json", "fetch": fetch_file(HOLIDAYS_JSON), "timeout": 5, "retries": 0, "seed": None},
+]
+
+
+def city_sources(city):
+    """Sumber per kota: 'weather:<slug>' dan 'lokasi:<slug>' (Overpass butuh timeout lebih panjang)"""
+    url, params = lokasi_request(city)
+    return [
+        {"name": f"weather:{city['slug']}", "filename": f"weather_forecast_{city['slug']}.json", "fetch": fetch_forecast(city["weather_query"]),
+         "timeout": 5, "retries": 2, "seed": None, "ttl": WEATHER_FORECAST_TTL},
+        {"name": f"lokasi:{city['slug']}", "filename": lokasi_file(city), "fetch": fetch_http(url, params),
+         "timeout": 20 if params is None else 120, "retries": 3, "seed": city.get("seed")},
+    ]
+
+
+def pipeline_sources(cities=None):
+    """Sumber bersama + sumber semua kota aktif"""
+    return SOURCES + [s for city in (cities or active_cities()) for s in city_sources(city)]
+
+
+def fetch_with_retry(source, dest):
+    """Jalankan fetcher dengan retry + exponential backoff untuk error jaringan/5xx; return hasil fetcher (sha256 atau None)"""
+    last_error = None
+    for attempt in range(source["retries"] + 1):
+        try:
+            return source["fetch"](dest, source["timeout"])
+        except (SourceUnavailable, NotModified):
+            raise
+        except (requests.RequestException, sqlite3.Error, OSError) as e:
+            last_error = e
+            if attempt < source["retries"]:
+                time.sleep(RETRY_BACKOFF * (2 ** attempt))
+    raise SourceUnavailable(str(last_error))
+
+
+def extract_source(source, bronze_dir, cache_loader=None):
+    """
+    Ambil satu sumber (dilewati kalau salinan bronze lokal masih dalam ttl sumber; 304 -> salinan lokal dipakai
+    apa adanya, status not_modified). Urutan fallback kalau gagal:
+    salinan bronze lokal terakhir -> salinan bronze di cache_loader (MinIO) -> file seed di repo.
+    """
+    dest = os.path.join(bronze_dir, source["filename"])
+    t0 = time.perf_counter()
+    result = {"name": source["name"], "path": dest, "status": "fresh", "error": None, "sha256": None, "bytes_received": 0}
+    if source.get("ttl") and os.path.exists(dest) and time.time() - os.path.getmtime(dest) < source["ttl"]:
+        result["status"], result["elapsed"] = "ttl", time.perf_counter() - t0
+        return result
+    try:
+        result["sha256"] = fetch_with_retry(source, dest)
+        result["bytes_received"] = os.path.getsize(dest)
+    except NotModified as e:
+        result["status"], result["sha256"] = "not_modified", e.sha256
+    except SourceUnavailable as e:
+        result["error"] = str(e)
+        if os.path.exists(dest):
+            result["status"] = "cache"
+        elif cache_loader and cache_loader(source["filename"], dest):
+            result["status"] = "cache"
+        elif source["seed"] and os.path.exists(source["seed"]):
+            shutil.copy(source["seed"], dest)
+            result["status"] = "seed"
+        else:
+            result["status"], result["path"] = "missing", None
+    result["elapsed"] = time.perf_counter() - t0
+    return result
+
+
+def run_extract(bronze_dir, cache_loader=None, sources=None):
+    """Ambil semua sumber secara paralel; total waktu ~ sumber paling lambat"""
+    sources = sources or pipeline_sources()
+    os.makedirs(bronze_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        futures = [pool.submit(extract_source, s, bronze_dir, cache_loader) for s in sources]
+        results = {f.result()["name"]: f.result() for f in futures}
+    for r in results.values():
+        note = f" ({r['error']})" if r["error"] else ""
+        print(f"   📡 [EXTRACT] {r['name']}: {r['status']} {r['elapsed']:.2f}s{note}")
+    return results
+
+
+# --- PROBE MURAH (untuk scheduler) ---
+# {url: (waktu monotonic, fingerprint hash isi)} -> sumber tanpa validator tidak di-download tiap poll
+_probe_hashes = {}
+
+def probe_http(url, timeout=10, hash_interval=PROBE_HASH_INTERVAL):
+    """
+    Fingerprint sumber HTTP tanpa memproses isinya: validator HEAD (ETag/Last-Modified/Content-Length)
+    kalau server memberikannya, kalau tidak isi di-stream dan di-hash (tanpa parse/upload) paling sering
+    sekali per hash_interval detik; di antaranya fingerprint terakhir dipakai ulang.
+    """
+    r = session.head(url, timeout=timeout, allow_redirects=True)
+    validators = [r.headers.get(h) for h in ("ETag", "Last-Modified")]
+    if r.status_code == 200 and any(validators):
+        return "|".join(v or "" for v in validators + [r.headers.get("Content-Length")])
+    hashed_at, fingerprint = _probe_hashes.get(url, (None, None))
+    if hashed_at is not None and time.monotonic() - hashed_at < hash_interval: return fingerprint
+    h = hashlib.sha256()
+    with session.get(url, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        for block in r.iter_content(chunk_size=1 << 16): h.update(block)
+    _probe_hashes[url] = (time.monotonic(), h.hexdigest())
+    return h.hexdigest()
+
+
+def probe_file(path):
+    """Fingerprint file lokal dari mtime + ukuran (tanpa membaca isinya)"""
+    st = os.stat(path)
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def probe_sources(timeout=10, cities=None):
+    """
+    {nama: fingerprint} sumber yang bisa berubah antar run. Cuaca tidak ikut (berubah tiap fetch);
+    sumber yang gagal di-probe bernilai None. Lokasi dari query Overpass juga tidak di-probe
+    (probe = menjalankan query penuh), cukup ikut refresh berkala.
+    """
+    probes = {
+        "survey": lambda: probe_http(SHEET_URL, timeout),
+        "holidays": lambda: probe_file(HOLIDAYS_DB),
+        "holidays_json": lambda: probe_file(HOLIDAYS_JSON),
+    }
+    for city in cities or active_cities():
+        url, params = lokasi_request(city)
+        if params is None: probes[f"lokasi:{city['slug']}"] = lambda url=url: probe_http(url, timeout)
+    fingerprints = {}
+    for name, probe in probes.items():
+        try: fingerprints[name] = probe()
+        except (requests.RequestException, OSError): fingerprints[name] = None
+    return fingerprints
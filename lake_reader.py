@@ -0,0 +1,276 @@
+import io
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from storage import GOLD_POINTER_OBJECT, load_gold_pointer, read_json_object
+
+# --- CACHE GOLD UNTUK DASHBOARD ---
+# Satu instance per proses (dibagi semua sesi Streamlit). Interaksi UI dilayani dari memori;
+# MinIO hanya di-stat (pointer gold) paling sering sekali per TTL.
+GOLD_CACHE_TTL = 30
+QUERY_CACHE_SIZE = 256
+
+
+class MinioObjectFile(io.RawIOBase):
+    """
+    File read-only di atas objek MinIO lewat HTTP range request (tanpa file sementara).
+    Parquet cukup membaca footer + column chunk yang dibutuhkan, bukan seluruh objek.
+    """
+    def __init__(self, client, bucket, object_name, size=None):
+        self.client = client
+        self.bucket = bucket
+        self.object_name = object_name
+        self.size = size if size is not None else client.stat_object(bucket, object_name).size
+        self.pos = 0
+        self.bytes_read = 0
+
+    def readable(self): return True
+    def seekable(self): return True
+    def tell(self): return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET: self.pos = offset
+        elif whence == io.SEEK_CUR: self.pos += offset
+        else: self.pos = self.size + offset
+        return self.pos
+
+    def readinto(self, b):
+        length = min(len(b), self.size - self.pos)
+        if length <= 0: return 0
+        resp = self.client.get_object(self.bucket, self.object_name, offset=self.pos, length=length)
+        try: data = resp.read()
+        finally:
+            resp.close(); resp.release_conn()
+        b[:len(data)] = data
+        self.pos += len(data)
+        self.bytes_read += len(data)
+        return len(data)
+
+
+def _stat_excludes(stats, value):
+    """True kalau statistik min/max row group membuktikan value tidak ada di dalamnya"""
+    if stats is None or not stats.has_min_max: return False
+    try: return value < stats.min or value > stats.max
+    except TypeError: return False
+
+
+class ParquetObject:
+    """
+    Parquet di MinIO yang dibaca sebagian: footer dibaca sekali, lalu tiap query hanya mengambil
+    kolom yang diminta dari row group yang lolos statistik min/max (pushdown filter kesamaan).
+    """
+    def __init__(self, client, bucket, object_name):
+        self.source = MinioObjectFile(client, bucket, object_name)
+        self.file = pq.ParquetFile(self.source)
+        self.metadata = self.file.metadata
+        self.schema = self.file.schema_arrow
+        self._lock = threading.Lock()
+
+    def row_groups(self, filters):
+        """Index row group yang mungkin berisi baris dengan semua nilai filter"""
+        columns = {self.metadata.schema.column(i).name: i for i in range(self.metadata.num_columns)}
+        keep = []
+        for rg in range(self.metadata.num_row_groups):
+            meta = self.metadata.row_group(rg)
+            if not any(_stat_excludes(meta.column(columns[c]).statistics, v) for c, v in filters.items() if c in columns):
+                keep.append(rg)
+        return keep
+
+    def read(self, columns=None, **filters):
+        """DataFrame kolom `columns` untuk baris yang cocok dengan semua filter kolom=nilai"""
+        filters = {c: v for c, v in filters.items() if c in self.schema.names}
+        columns = [c for c in columns if c in self.schema.names] if columns else self.schema.names
+        row_groups = self.row_groups(filters)
+        read_cols = list(dict.fromkeys(columns + list(filters)))
+        # ParquetFile memakai satu file handle -> serialkan akses antar sesi
+        with self._lock:
+            table = self.file.read_row_groups(row_groups, columns=read_cols) if row_groups else self.schema.empty_table().select(read_cols)
+        for c, v in filters.items():
+            table = table.filter(pc.equal(table[c], pa.scalar(v, type=table.schema.field(c).type)))
+        return table.select(columns).to_pandas()
+
+    def distinct(self, column):
+        """Nilai unik satu kolom (hanya kolom itu yang dibaca)"""
+        with self._lock:
+            values = self.file.read(columns=[column])[column]
+        return sorted(pc.unique(values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values).to_pylist())
+
+
+class PartitionedDataset:
+    """
+    Dataset gold berpartisi Hive (manifest JSON berisi daftar part + nilai partisinya).
+    Query hanya mengambil part yang nilai partisinya cocok; filter kolom lain dijalankan di Arrow.
+    """
+    def __init__(self, client, bucket, manifest_object):
+        self.client = client
+        self.bucket = bucket
+        self.manifest = read_json_object(client, bucket, manifest_object)
+        if self.manifest is None: raise IOError(f"Manifest {manifest_object} tidak terbaca")
+        self.partition_by = self.manifest["partition_by"]
+        self.parts = self.manifest["parts"]
+        self.bytes_read = 0
+
+    def files(self, **filters):
+        """Object part untuk filter kolom partisi (juga berguna untuk query DuckDB ad-hoc, hive_partitioning=true)"""
+        keys = {c: v for c, v in filters.items() if c in self.partition_by}
+        return [p["path"] for p in self.parts if all(p["values"][c] == v for c, v in keys.items())]
+
+    def _read_part(self, object_name, columns):
+        resp = self.client.get_object(self.bucket, object_name)
+        try: buf = pa.py_buffer(resp.read())
+        finally:
+            resp.close(); resp.release_conn()
+        self.bytes_read += buf.size
+        return pq.read_table(pa.BufferReader(buf), columns=columns)
+
+    def read(self, columns=None, **filters):
+        part_filters = {c: v for c, v in filters.items() if c in self.partition_by}
+        row_filters = {c: v for c, v in filters.items() if c in self.manifest["columns"]}
+        columns = columns or self.manifest["columns"] + self.partition_by
+        file_cols = [c for c in dict.fromkeys(columns + list(row_filters)) if c in self.manifest["columns"]]
+        tables = []
+        for part in self.parts:
+            if not all(part["values"][c] == v for c, v in part_filters.items()): continue
+            table = self._read_part(part["path"], file_cols)
+            for c, v in row_filters.items():
+                table = table.filter(pc.equal(table[c], pa.scalar(v, type=table.schema.field(c).type)))
+            # Kolom partisi tidak ada di file (ada di path) -> ditambahkan sebagai konstanta kalau diminta
+            for c in self.partition_by:
+                if c in columns: table = table.append_column(c, pa.array([part["values"][c]] * table.num_rows))
+            tables.append(table.select([c for c in columns if c in table.schema.names]))
+        if not tables: return pd.DataFrame(columns=columns)
+        return pa.concat_tables(tables).to_pandas()
+
+    def distinct(self, column):
+        if column in self.partition_by:
+            return sorted({p["values"][column] for p in self.parts})
+        return sorted(set(self.read([column])[column].dropna()))
+
+
+class GoldSnapshot:
+    """
+    Satu versi gold yang utuh: DataFrame per nama logis (tabel kecil, dibaca penuh),
+    ParquetObject untuk tabel besar (dibaca per query), dan objek turunan (index, set libur, ...).
+    """
+    def __init__(self, version, objects, frames, tables=None):
+        self.version = version
+        self.objects = objects
+        self.frames = frames
+        self.tables = tables or {}
+        self._derived = {}
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def frame(self, name):
+        return self.frames.get(name, pd.DataFrame())
+
+    def table(self, name):
+        return self.tables.get(name)
+
+    def query(self, name, columns=None, **filters):
+        """Baca sebagian tabel besar dengan pushdown; hasil di-cache per (kolom, filter) selama snapshot hidup"""
+        table = self.tables.get(name)
+        if table is None: return pd.DataFrame(columns=columns)
+        key = (name, tuple(columns or ()), tuple(sorted(filters.items())))
+        with self._lock:
+            if key in self._queries: return self._queries[key]
+        df = table.read(columns, **filters)
+        with self._lock:
+            if len(self._queries) >= QUERY_CACHE_SIZE: self._queries.pop(next(iter(self._queries)))
+            self._queries[key] = df
+        return df
+
+    def derive(self, key, fn):
+        """Hitung sekali per snapshot, misal SpatialIndex dari gold_location_index"""
+        with self._lock:
+            if key not in self._derived: self._derived[key] = fn(self)
+            return self._derived[key]
+
+
+class GoldCache:
+    """
+    Cache snapshot gold per proses.
+    - Freshness: stat gold/_CURRENT.json (ETag) paling sering sekali per ttl detik.
+    - Objek gold immutable (path berversi) -> DataFrame/footer di-cache per object_name, yang tidak berubah antar versi dipakai ulang.
+    - names dibaca penuh ke memori; lazy_names hanya footer-nya, isinya lewat GoldSnapshot.query.
+    - MinIO mati: snapshot terakhir yang sukses tetap dilayani.
+    """
+    def __init__(self, client, bucket, names, lazy_names=(), required="recommendations", ttl=GOLD_CACHE_TTL):
+        self.client = client
+        self.bucket = bucket
+        self.names = names
+        self.lazy_names = lazy_names
+        self.required = required
+        self.ttl = ttl
+        self.snapshot = None
+        self.status = (False, "Menunggu Pipeline...")
+        self._pointer_etag = None
+        self._checked_at = None
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Paksa cek ulang pointer pada get() berikutnya (tombol Segarkan Data)"""
+        self._checked_at = None
+
+    def _fresh(self):
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.ttl
+
+    def _read_frame(self, object_name):
+        if object_name not in self._loaded:
+            resp = self.client.get_object(self.bucket, object_name)
+            try: buf = pa.py_buffer(resp.read())
+            finally:
+                resp.close(); resp.release_conn()
+            self._loaded[object_name] = pq.read_table(pa.BufferReader(buf)).to_pandas()
+        return self._loaded[object_name]
+
+    def _open_table(self, object_name):
+        if object_name not in self._loaded:
+            # .json = manifest dataset berpartisi; .parquet = objek tunggal (layout lama)
+            reader = PartitionedDataset if object_name.endswith(".json") else ParquetObject
+            self._loaded[object_name] = reader(self.client, self.bucket, object_name)
+        return self._loaded[object_name]
+
+    def _refresh(self):
+        if not self.client.bucket_exists(self.bucket):
+            self.status = (False, "Menunggu Pipeline...")
+            return
+        etag = self.client.stat_object(self.bucket, GOLD_POINTER_OBJECT).etag
+        if self.snapshot is not None and etag == self._pointer_etag:
+            self.status = (True, "Data Terupdate")
+            return
+        pointer = load_gold_pointer(self.client, self.bucket)
+        objects = pointer["objects"]
+        if self.required not in objects:
+            self.status = (False, "Menunggu Pipeline...")
+            return
+        frames = {name: self._read_frame(objects[name]) for name in self.names if name in objects}
+        tables = {name: self._open_table(objects[name]) for name in self.lazy_names if name in objects}
+        self.snapshot = GoldSnapshot(pointer.get("version"), objects, frames, tables)
+        self._pointer_etag = etag
+        # Buang DataFrame objek yang tidak lagi dirujuk versi aktif
+        live = set(objects.values())
+        self._loaded = {k: v for k, v in self._loaded.items() if k in live}
+        self.status = (True, "Data Terupdate")
+
+    def get(self):
+        """(snapshot atau None, (ok, pesan)); dipanggil tiap rerun, murah kalau masih dalam TTL"""
+        if self._fresh(): return self.snapshot, self.status
+        with self._lock:
+            if not self._fresh():
+                try:
+                    self._refresh()
+                except Exception as e:
+                    if self.snapshot is not None:
+                        self.status = (False, f"Offline, memakai data versi {self.snapshot.version} ({e})")
+                    else:
+                        self.status = (False, f"Menunggu Koneksi... ({str(e)})")
+                # Gagal pun dicatat, supaya MinIO yang mati tidak dibanjiri request tiap rerun
+                self._checked_at = time.monotonic()
+        return self.snapshot, self.status
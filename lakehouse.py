@@ -0,0 +1,105 @@
+import os
+from collections import Counter
+
+import duckdb
+
+# --- DUCKDB LAKEHOUSE ---
+# path kosong = :memory: (perilaku lama, dibangun ulang tiap run).
+# Dengan file, tabel silver/gold bertahan antar run dan hanya baris yang berubah yang ditulis (MERGE).
+
+
+def connect_lakehouse(path="", memory_limit="", temp_dir=""):
+    """Buka DuckDB; memory_limit + temp_directory membuat sort/join besar spill ke disk, bukan OOM"""
+    if path: os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    con = duckdb.connect(path or ":memory:")
+    if memory_limit: con.execute(f"SET memory_limit = '{memory_limit}'")
+    if temp_dir:
+        os.makedirs(temp_dir, exist_ok=True)
+        con.execute(f"SET temp_directory = '{temp_dir}'")
+    # Part file silver yang sudah dimuat (nama + hash + size/mtime) -> run berikutnya hanya memuat part baru/berubah.
+    # Kolom size/mtime ditambahkan belakangan: DB lama diupgrade di tempat (NULL -> part di-hash sekali lagi)
+    con.execute("CREATE TABLE IF NOT EXISTS lakehouse_parts (part VARCHAR PRIMARY KEY, sha256 VARCHAR, loaded_at TIMESTAMP)")
+    con.execute("ALTER TABLE lakehouse_parts ADD COLUMN IF NOT EXISTS size BIGINT")
+    con.execute("ALTER TABLE lakehouse_parts ADD COLUMN IF NOT EXISTS mtime_ns BIGINT")
+    return con
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sync_columns(con, table, source):
+    """Buat tabel dari skema source kalau belum ada; kolom baru di source ditambahkan ke tabel"""
+    con.execute(f"CREATE TABLE IF NOT EXISTS {table} AS SELECT * FROM {source} LIMIT 0")
+    existing = {r[0] for r in con.execute(f"DESCRIBE {table}").fetchall()}
+    columns = con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+    for name, col_type, *_ in columns:
+        if name not in existing: con.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(name)} {col_type}")
+    return [r[0] for r in columns]
+
+
+def merge_table(con, table, source, keys, delete_missing=False):
+    """
+    MERGE relasi `source` ke `table` berdasarkan kolom kunci.
+    Baris sama persis tidak disentuh; delete_missing=True -> tabel jadi cermin source (baris yang hilang dihapus).
+    Return jumlah baris per aksi, misal {"INSERT": 3, "UPDATE": 1}.
+    """
+    columns = _sync_columns(con, table, source)
+    values = [c for c in columns if c not in keys]
+    on = " AND ".join(f"t.{_quote(k)} = s.{_quote(k)}" for k in keys)
+    changed = " OR ".join(f"t.{_quote(c)} IS DISTINCT FROM s.{_quote(c)}" for c in values) or "FALSE"
+    update = ", ".join(f"{_quote(c)} = s.{_quote(c)}" for c in values)
+    col_list = ", ".join(_quote(c) for c in columns)
+    src_list = ", ".join(f"s.{_quote(c)}" for c in columns)
+    sql = f"""
+        MERGE INTO {table} t USING {source} s ON {on}
+        {f"WHEN MATCHED AND ({changed}) THEN UPDATE SET {update}" if values else ""}
+        WHEN NOT MATCHED THEN INSERT ({col_list}) VALUES ({src_list})
+        {"WHEN NOT MATCHED BY SOURCE THEN DELETE" if delete_missing else ""}
+        RETURNING merge_action
+    """
+    return dict(Counter(r[0] for r in con.execute(sql).fetchall()))
+
+
+def merge_frame(con, table, df, keys, delete_missing=False):
+    """merge_table untuk DataFrame (didaftarkan sementara sebagai view)"""
+    view = f"_src_{table}"
+    con.register(view, df)
+    try: return merge_table(con, table, view, keys, delete_missing)
+    finally: con.unregister(view)
+
+
+def load_new_parts(con, table, part_dir, keys, file_hash):
+    """
+    MERGE part file parquet yang belum pernah dimuat (atau isinya berubah) ke `table`.
+    Part dengan nama + size + mtime sama dengan catatan tidak di-hash lagi; hanya part baru/tersentuh yang di-hash
+    (isi sama -> cukup catatan size/mtime yang diperbarui, tanpa MERGE). Return jumlah part yang dimuat.
+    """
+    if not os.path.isdir(part_dir): return 0
+    loaded = {part: (sha, size, mtime) for part, sha, size, mtime
+              in con.execute("SELECT part, sha256, size, mtime_ns FROM lakehouse_parts").fetchall()}
+    todo = []
+    for name in sorted(os.listdir(part_dir)):
+        if not name.startswith("part-"): continue
+        part, path = f"{table}/{name}", os.path.join(part_dir, name)
+        st = os.stat(path)
+        sha, size, mtime = loaded.get(part, (None, None, None))
+        if sha and (size, mtime) == (st.st_size, st.st_mtime_ns): continue
+        digest = file_hash(path)
+        if digest == sha:
+            con.execute("UPDATE lakehouse_parts SET size = $size, mtime_ns = $mtime WHERE part = $part",
+                        {"part": part, "size": st.st_size, "mtime": st.st_mtime_ns})
+        else: todo.append((part, path, digest, st))
+    for part, path, digest, st in todo:
+        con.execute("CREATE OR REPLACE TEMP VIEW _src_part AS SELECT * FROM read_parquet('" + path.replace("'", "''") + "')")
+        merge_table(con, table, "_src_part", keys)
+        con.execute("INSERT OR REPLACE INTO lakehouse_parts (part, sha256, loaded_at, size, mtime_ns) "
+                    "VALUES ($part, $sha, now(), $size, $mtime)",
+                    {"part": part, "sha": digest, "size": st.st_size, "mtime": st.st_mtime_ns})
+    return len(todo)
+
+
+def reset_parts(con, table):
+    """Kosongkan tabel history + catatan part-nya (full refresh silver)"""
+    con.execute(f"DROP TABLE IF EXISTS {table}")
+    con.execute("DELETE FROM lakehouse_parts WHERE starts_with(part, $prefix)", {"prefix": f"{table}/"})
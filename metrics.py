@@ -0,0 +1,253 @@
+import cProfile
+import io
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytz
+
+# --- METRIK PIPELINE PER STAGE ---
+# Tiap siklus menghasilkan satu run report JSON (metrics/run-<id>.json di bucket) dan satu file
+# Prometheus text format (latest.prom di bucket + file lokal yang di-serve scheduler / textfile collector).
+METRICS_PREFIX = "metrics"
+METRICS_NAMESPACE = "social_radar"
+
+
+def peak_rss_bytes():
+    """
+    High-water mark RSS proses. Linux: VmHWM dari /proc/self/status (ikut reset_peak_rss; ru_maxrss proses hasil
+    spawn ikut menghitung RSS induk sebelum exec). Lainnya: ru_maxrss (KiB di Linux, byte di macOS).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"): return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_rss():
+    """
+    Reset high-water mark RSS proses ke RSS sekarang (Linux >= 4.0: /proc/self/clear_refs), supaya
+    peak_rss_bytes berikutnya hanya mencakup kerja sesudahnya. False kalau tidak didukung.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f: f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class StageMetrics:
+    """Hasil ukur satu stage; rows_in/rows_out/bytes diisi pemanggil, sisanya otomatis"""
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.status = "ok"
+        self.error = None
+        self.wall_s = None
+        self.cpu_s = None
+        self.peak_rss_bytes = None
+        self.rss_growth_bytes = None
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes = None
+        self.bytes_uploaded = None
+        self.profile = None
+        self.extra = {}
+
+    @property
+    def key(self):
+        return "-".join([self.name] + [str(v) for v in self.labels.values()])
+
+    def as_dict(self):
+        out = {k: v for k, v in vars(self).items() if k != "extra" and v is not None}
+        out.update(self.extra)
+        return out
+
+
+class RunMetrics:
+    """
+    Kolektor metrik satu run pipeline.
+    - stage(): context manager, mengukur wall time, CPU time proses, RSS puncak, byte yang ter-upload selama stage.
+    - record(): stage yang diukur di tempat lain (misal extract per sumber yang jalan di thread).
+    - profile_dir diisi -> tiap stage dijalankan di bawah cProfile dan dump .prof-nya ikut di-upload
+      (task isolated DagRunner diprofil di worker-nya sendiri, path-nya dicatat lewat record()).
+    """
+    def __init__(self, run_id=None, profile_dir=None):
+        self.run_id = run_id or datetime.now(pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.started_at = datetime.now(pytz.utc)
+        self.profile_dir = os.path.join(profile_dir, self.run_id) if profile_dir else None
+        self.stages = []
+        self.uploads = []
+        self.status = "ok"
+        self.error = None
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._profiling = False
+
+    def attach_uploads(self, upload_stats):
+        """Daftar upload ArtifactWriter (dibagi by reference, diisi worker thread)"""
+        self.uploads = upload_stats
+
+    def _uploaded_bytes(self, start):
+        return sum(u["bytes"] for u in self.uploads[start:] if u["ok"])
+
+    @contextmanager
+    def stage(self, name, **labels):
+        rec = StageMetrics(name, labels)
+        # cProfile tidak bisa bersarang -> stage di dalam stage lain ikut profil stage luarnya
+        profiler = cProfile.Profile() if self.profile_dir and not self._profiling else None
+        n_uploads, rss0 = len(self.uploads), peak_rss_bytes()
+        t0, cpu0 = time.perf_counter(), time.process_time()
+        if profiler:
+            self._profiling = True
+            profiler.enable()
+        try:
+            yield rec
+        except BaseException as e:
+            rec.status, rec.error = "failed", str(e)
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+                os.makedirs(self.profile_dir, exist_ok=True)
+                rec.profile = os.path.join(self.profile_dir, f"{rec.key}.prof")
+                profiler.dump_stats(rec.profile)
+            rec.wall_s = time.perf_counter() - t0
+            rec.cpu_s = time.process_time() - cpu0
+            rec.peak_rss_bytes = peak_rss_bytes()
+            rec.rss_growth_bytes = rec.peak_rss_bytes - rss0
+            rec.bytes_uploaded = self._uploaded_bytes(n_uploads)
+            self.stages.append(rec)
+
+    def record(self, name, wall_s, status="ok", rows_in=None, rows_out=None, bytes=None, labels=None, **extra):
+        rec = StageMetrics(name, labels or {})
+        rec.wall_s, rec.status, rec.rows_in, rec.rows_out, rec.bytes = wall_s, status, rows_in, rows_out, bytes
+        rec.extra = extra
+        self.stages.append(rec)
+        return rec
+
+    def fail(self, error):
+        self.status, self.error = "failed", str(error)
+
+    # --- EXPORT ---
+    def report(self):
+        duration = time.perf_counter() - self._t0
+        layers = {}
+        for u in self.uploads:
+            layer = layers.setdefault(u["object"].split("/", 1)[0], {"objects": 0, "failed": 0, "bytes": 0, "seconds": 0.0})
+            layer["objects" if u["ok"] else "failed"] += 1
+            layer["bytes"] += u["bytes"] if u["ok"] else 0
+            layer["seconds"] += u["seconds"]
+        return {
+            "run_id": self.run_id, "status": self.status, "error": self.error,
+            "started_at": self.started_at.isoformat(), "duration_s": duration,
+            "cpu_s": time.process_time() - self._cpu0, "peak_rss_bytes": peak_rss_bytes(),
+            "stages": [s.as_dict() for s in self.stages],
+            "uploads": {"by_layer": layers, "objects": list(self.uploads)},
+        }
+
+    def to_prometheus(self, report=None):
+        report = report or self.report()
+        ns = METRICS_NAMESPACE
+        metrics = {}
+
+        def add(name, help_text, labels, value):
+            if value is None: return
+            metrics.setdefault(name, (help_text, []))[1].append((labels, value))
+
+        add(f"{ns}_run_timestamp_seconds", "Waktu mulai run terakhir (unix)", {}, self.started_at.timestamp())
+        add(f"{ns}_run_duration_seconds", "Durasi run terakhir", {}, report["duration_s"])
+        add(f"{ns}_run_cpu_seconds", "CPU time proses selama run terakhir", {}, report["cpu_s"])
+        add(f"{ns}_run_success", "1 jika run terakhir selesai tanpa exception", {}, int(report["status"] == "ok"))
+        add(f"{ns}_run_peak_rss_bytes", "RSS puncak proses", {}, report["peak_rss_bytes"])
+        for s in self.stages:
+            labels = {"stage": s.name, **s.labels}
+            add(f"{ns}_stage_success", "1 jika stage sukses", labels, int(s.status == "ok"))
+            add(f"{ns}_stage_wall_seconds", "Wall time per stage", labels, s.wall_s)
+            add(f"{ns}_stage_cpu_seconds", "CPU time proses per stage", labels, s.cpu_s)
+            add(f"{ns}_stage_peak_rss_bytes", "RSS puncak per stage (proses utama: high-water proses; task worker: puncak selama task)", labels, s.peak_rss_bytes)
+            add(f"{ns}_stage_rows_in", "Baris masuk per stage", labels, s.rows_in)
+            add(f"{ns}_stage_rows_out", "Baris keluar per stage", labels, s.rows_out)
+            add(f"{ns}_stage_bytes", "Byte yang dibaca/ditulis stage", labels, s.bytes)
+            add(f"{ns}_stage_uploaded_bytes", "Byte yang ter-upload selama stage", labels, s.bytes_uploaded)
+        for layer, u in report["uploads"]["by_layer"].items():
+            add(f"{ns}_upload_objects", "Objek ter-upload per layer", {"layer": layer, "status": "ok"}, u["objects"])
+            add(f"{ns}_upload_objects", "Objek ter-upload per layer", {"layer": layer, "status": "failed"}, u["failed"])
+            add(f"{ns}_upload_bytes", "Byte ter-upload per layer", {"layer": layer}, u["bytes"])
+            add(f"{ns}_upload_seconds", "Total waktu upload per layer (jumlah semua worker)", {"layer": layer}, u["seconds"])
+
+        lines = []
+        for name, (help_text, samples) in metrics.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def publish(self, client, bucket, prom_path=None):
+        """Tulis run report + file Prometheus; gagal tulis metrik tidak menggagalkan pipeline"""
+        report = self.report()
+        prom = self.to_prometheus(report)
+        if prom_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(prom_path)), exist_ok=True)
+                # Tulis lalu rename -> scraper tidak pernah membaca file setengah jadi
+                with open(prom_path + ".tmp", "w") as f: f.write(prom)
+                os.replace(prom_path + ".tmp", prom_path)
+            except OSError as e: print(f"   ⚠️ Gagal tulis {prom_path}: {e}")
+        objects = {
+            f"{METRICS_PREFIX}/run-{self.run_id}.json": (json.dumps(report, indent=2, default=str).encode("utf-8"), "application/json"),
+            f"{METRICS_PREFIX}/latest.prom": (prom.encode("utf-8"), "text/plain; version=0.0.4"),
+        }
+        for s in self.stages:
+            if s.profile and os.path.exists(s.profile):
+                with open(s.profile, "rb") as f:
+                    objects[f"{METRICS_PREFIX}/profiles/{self.run_id}/{os.path.basename(s.profile)}"] = (f.read(), "application/octet-stream")
+        try:
+            if not client.bucket_exists(bucket): client.make_bucket(bucket)
+            for object_name, (data, content_type) in objects.items():
+                client.put_object(bucket, object_name, io.BytesIO(data), len(data), content_type=content_type)
+        except Exception as e: print(f"   ⚠️ Gagal upload metrik: {e}")
+        print(f"📊 [METRICS] run {self.run_id}: {report['status']}, {report['duration_s']:.2f}s, "
+              f"{len(self.stages)} stage -> {METRICS_PREFIX}/run-{self.run_id}.json")
+        return report
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def serve_metrics(prom_path, port, host="0.0.0.0"):
+    """HTTP /metrics di thread daemon yang menyajikan file Prometheus terakhir (untuk di-scrape)"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            try:
+                with open(prom_path, "rb") as f: body = f.read()
+            except OSError:
+                body = b""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
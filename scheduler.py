@@ -1,23 +1,126 @@
 import time
 import os
-from elt_pipeline import run_elt_pipeline
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+
+from cities import active_cities
+from calendar_dim import Calendar, build_calendar, merge_holidays, read_holidays_db, read_holidays_json
+from elt_pipeline import run_elt_pipeline, clean_csv_quotes, client, BUCKET_NAME, METRICS_PROM_FILE, CALENDAR_SILVER_PATH
+from extract import HOLIDAYS_DB, HOLIDAYS_JSON, probe_file, probe_sources
+from metrics import serve_metrics
+from storage import ObjectLock
+
+# Port endpoint /metrics (Prometheus scrape); 0 = tidak di-serve, file .prom tetap ditulis tiap siklus
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+# --- JADWAL ---
+# Pipeline jalan kalau: (1) jam transisi rule / pergantian hari tercapai, (2) fingerprint sumber berubah,
+# atau (3) sudah MAX_INTERVAL sejak run terakhir (cuaca). Di antaranya hanya probe murah tiap POLL_SECONDS.
+# Transisi dihitung di timezone tiap kota aktif; yang paling dekat menentukan run berikutnya.
+TIMEZONE = pytz.timezone("Asia/Makassar")
+CITY_TIMEZONES = sorted({city["timezone"] for city in active_cities()})
+RULES_FILE = "social_time_rules.csv"
+POLL_SECONDS = int(os.environ.get("SCHEDULER_POLL_SECONDS", "300"))
+MAX_INTERVAL_SECONDS = int(os.environ.get("SCHEDULER_MAX_INTERVAL", "1800"))
+LOCK_TTL = int(os.environ.get("PIPELINE_LOCK_TTL", "900"))
+
+
+def load_rule_hours(path=RULES_FILE):
+    """{day_category: jam-jam transisi (start_hour/end_hour)} dari social_time_rules.csv"""
+    if not os.path.exists(path): return {}
+    df = pd.read_csv(clean_csv_quotes(path))
+    df.columns = [c.lower().strip().replace(" ", "_") for c in df.columns]
+    hours = {}
+    for day, start, end in df[['day_category', 'start_hour', 'end_hour']].itertuples(index=False):
+        hours.setdefault(day, set()).update({int(start) % 24, int(end) % 24})
+    return hours
+
+
+def load_calendar():
+    """Dimensi kalender hasil run terakhir; sebelum run pertama dibangun langsung dari sumber libur"""
+    try:
+        if os.path.exists(CALENDAR_SILVER_PATH): return Calendar.from_parquet(CALENDAR_SILVER_PATH)
+        sources = [read(path) for read, path in [(read_holidays_db, HOLIDAYS_DB), (read_holidays_json, HOLIDAYS_JSON)] if os.path.exists(path)]
+        return Calendar(build_calendar(merge_holidays(*sources)))
+    except Exception as e:
+        print(f"   ⚠️ Kalender tidak terbaca ({e}), pakai nama hari biasa")
+        return Calendar()
+
+
+def next_boundary(now, rule_hours, calendar, timezone=TIMEZONE, horizon_days=8):
+    """Transisi berikutnya (> now) di satu timezone: jam start/end rule untuk day_category hari itu + tengah malam"""
+    local = now.astimezone(timezone)
+    for offset in range(horizon_days):
+        day = (local + timedelta(days=offset)).date()
+        for hour in sorted(rule_hours.get(calendar.day_category(day), set()) | {0}):
+            boundary = timezone.localize(datetime(day.year, day.month, day.day, hour))
+            if boundary > now: return boundary
+    return now + timedelta(days=1)
+
+
+def next_city_boundary(now, rule_hours, calendar):
+    """Transisi paling dekat di antara semua timezone kota aktif"""
+    return min(next_boundary(now, rule_hours, calendar, pytz.timezone(tz)) for tz in CITY_TIMEZONES)
+
+
+def probe_all():
+    fingerprints = probe_sources()
+    fingerprints["rules"] = probe_file(RULES_FILE) if os.path.exists(RULES_FILE) else None
+    return fingerprints
+
+
+def run_pipeline_locked(reason):
+    """Jalankan pipeline di bawah lock MinIO; False kalau replica lain sedang menjalankannya"""
+    lock = ObjectLock(client, BUCKET_NAME, ttl=LOCK_TTL)
+    if not lock.acquire():
+        print(f"🔒 [SCHEDULER] Lewati ({reason}): pipeline sedang dijalankan {(lock.holder or {}).get('owner', 'replica lain')}")
+        return False
+    try:
+        print(f"\n🚀 [JOB START] Memulai Siklus ELT Pipeline ({reason})...")
+        run_elt_pipeline(lock=lock)
+        print("✅ [JOB DONE] Siklus Selesai. Data di MinIO sudah terupdate.")
+    finally:
+        lock.release()
+    return True
 
 
 def job_runner():
     print("⏰ [SCHEDULER] Sistem Penjadwalan Aktif (MinIO Lakehouse Mode)")
-    
+    if METRICS_PORT:
+        serve_metrics(METRICS_PROM_FILE, METRICS_PORT)
+        print(f"📊 [SCHEDULER] Metrik pipeline di http://0.0.0.0:{METRICS_PORT}/metrics")
+
+    last_run, last_fp, boundary = None, {}, None
     while True:
         try:
-            print("\n🚀 [JOB START] Memulai Siklus ELT Pipeline...")
-            
-            run_elt_pipeline()
-            
-            print("✅ [JOB DONE] Siklus Selesai. Data di MinIO sudah terupdate.")
-            print("💤 Istirahat 30 Menit...")
-            
-            # Tunggu 30 Menit (1800 detik)
-            time.sleep(1800)
-            
+            now = datetime.now(TIMEZONE)
+            fp = probe_all()
+            changed = [name for name, value in fp.items() if value is not None and value != last_fp.get(name)]
+            if last_run is None:
+                reason = "start"
+            elif boundary is not None and now >= boundary:
+                reason = f"transisi {boundary:%a %H:%M}"
+            elif changed:
+                reason = f"sumber berubah: {', '.join(changed)}"
+            elif time.monotonic() - last_run >= MAX_INTERVAL_SECONDS:
+                reason = "refresh berkala"
+            else:
+                reason = None
+
+            if reason:
+                # Lock dipegang replica lain = siklus ini sudah ditangani -> jadwal & fingerprint tetap maju
+                run_pipeline_locked(reason)
+                last_run = time.monotonic()
+                last_fp = {name: value if value is not None else last_fp.get(name) for name, value in fp.items()}
+
+            now = datetime.now(TIMEZONE)
+            boundary = next_city_boundary(now, load_rule_hours(), load_calendar())
+            wait = min(POLL_SECONDS, MAX_INTERVAL_SECONDS - (time.monotonic() - last_run), (boundary - now).total_seconds())
+            if reason: print(f"💤 Transisi berikutnya {boundary:%a %H:%M %Z}, cek lagi dalam {max(wait, 1) / 60:.1f} menit")
+            time.sleep(max(wait, 1))
+
         except KeyboardInterrupt:
             print("🛑 Scheduler Dihentikan Manual.")
             break
@@ -28,5 +131,5 @@ def job_runner():
 if __name__ == "__main__":
     if not os.environ.get("MINIO_ENDPOINT"):
         print("⚠️ Warning: Env MINIO_ENDPOINT tidak terdeteksi (Mungkin aman jika pakai default code)")
-        
-    job_runner()
\ No newline at end of file
+
+    job_runner()
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+
+# --- INDEX SPASIAL GRID (tanpa dependency tambahan) ---
+# Bumi dibagi grid lat/lon berukuran GRID_CELL_DEG; tiap lokasi diberi id sel (grid_cell).
+# Tabel disimpan terurut grid_cell, jadi satu baris grid = satu rentang kontigu -> cukup searchsorted.
+GRID_CELL_DEG = 0.01            # ~1.1 km di khatulistiwa
+EARTH_RADIUS_M = 6_371_000
+METERS_PER_DEG = 111_320
+
+
+def _grid_cols(cell_deg):
+    return int(np.ceil(360 / cell_deg)) + 1
+
+
+def grid_cells(lat, lon, cell_deg=GRID_CELL_DEG):
+    """Id sel grid (int64) untuk array lat/lon"""
+    row = np.floor((np.asarray(lat, dtype='float64') + 90) / cell_deg).astype('int64')
+    col = np.floor((np.asarray(lon, dtype='float64') + 180) / cell_deg).astype('int64')
+    return row * _grid_cols(cell_deg) + col
+
+
+def add_grid_index(df, cell_deg=GRID_CELL_DEG):
+    """Tambah kolom grid_cell dan urutkan tabel per sel (skor tertinggi duluan di dalam sel)"""
+    df = df.assign(grid_cell=grid_cells(df['lat'], df['lon'], cell_deg))
+    sort_cols = ['grid_cell', 'score'] if 'score' in df.columns else ['grid_cell']
+    ascending = [True, False] if 'score' in df.columns else [True]
+    return df.sort_values(sort_cols, ascending=ascending, kind='stable').reset_index(drop=True)
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Jarak great-circle dalam meter (vectorized)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class SpatialIndex:
+    """
+    Query radius / k-terdekat di atas tabel lokasi yang sudah di-add_grid_index.
+    Kalau kolom grid_cell belum ada (atau tidak terurut), index dibangun ulang di memori.
+    """
+    def __init__(self, df, cell_deg=GRID_CELL_DEG):
+        if 'grid_cell' not in df.columns or not df['grid_cell'].is_monotonic_increasing:
+            df = add_grid_index(df, cell_deg)
+        self.df = df.reset_index(drop=True)
+        self.cell_deg = cell_deg
+        self._cols = _grid_cols(cell_deg)
+        self._cells = self.df['grid_cell'].to_numpy('int64')
+        self._lat = self.df['lat'].to_numpy('float64')
+        self._lon = self.df['lon'].to_numpy('float64')
+        self._kategori = self.df['kategori'].to_numpy() if 'kategori' in self.df.columns else None
+        # Kolom sebagai array numpy: membangun DataFrame hasil dari sini jauh lebih murah daripada df.iloc
+        self._columns = {c: self.df[c].to_numpy() for c in self.df.columns}
+
+    def __len__(self):
+        return len(self.df)
+
+    def _candidates(self, lat, lon, radius_m):
+        """Posisi baris di sel-sel yang beririsan dengan kotak pembatas radius"""
+        dlat = radius_m / METERS_PER_DEG
+        dlon = dlat / max(np.cos(np.radians(lat)), 1e-6)
+        r0, c0 = (np.floor((lat - dlat + 90) / self.cell_deg), np.floor((lon - dlon + 180) / self.cell_deg))
+        r1, c1 = (np.floor((lat + dlat + 90) / self.cell_deg), np.floor((lon + dlon + 180) / self.cell_deg))
+        rows = np.arange(int(r0), int(r1) + 1, dtype='int64') * self._cols
+        lo = np.searchsorted(self._cells, rows + int(c0), side='left')
+        hi = np.searchsorted(self._cells, rows + int(c1), side='right')
+        spans = [np.arange(a, b) for a, b in zip(lo, hi) if b > a]
+        return np.concatenate(spans) if spans else np.empty(0, dtype='int64')
+
+    def query_radius(self, lat, lon, radius_m, categories=None):
+        """(posisi baris, jarak meter) untuk semua lokasi dalam radius, opsional hanya kategori tertentu"""
+        idx = self._candidates(lat, lon, radius_m)
+        if categories is not None and self._kategori is not None and len(idx):
+            idx = idx[np.isin(self._kategori[idx], list(categories))]
+        dist = haversine_m(lat, lon, self._lat[idx], self._lon[idx])
+        keep = dist <= radius_m
+        return idx[keep], dist[keep]
+
+    def nearest_positions(self, lat, lon, k=5, radius_m=2000, categories=None):
+        """(posisi baris, jarak meter) k lokasi terdekat dalam radius, terurut dari yang terdekat"""
+        idx, dist = self.query_radius(lat, lon, radius_m, categories)
+        if len(idx) > k:
+            top = np.argpartition(dist, k - 1)[:k]
+            idx, dist = idx[top], dist[top]
+        order = np.argsort(dist, kind='stable')
+        return idx[order], dist[order]
+
+    def nearest(self, lat, lon, k=5, radius_m=2000, categories=None):
+        """k lokasi terdekat dalam radius -> DataFrame dengan kolom jarak_m"""
+        idx, dist = self.nearest_positions(lat, lon, k, radius_m, categories)
+        out = {c: values[idx] for c, values in self._columns.items()}
+        out['jarak_m'] = dist.round(0)
+        return pd.DataFrame(out)
+
+
+def allowed_categories(rules, archetype_categories, archetype, day_category, hour):
+    """
+    Kategori yang boleh untuk archetype di satu slot: kategori rule slot itu (RuleTable terkompilasi)
+    diiris mapping archetype -> kategori (gold_archetype_category).
+    """
+    return set(rules.categories(day_category, hour)) & set(archetype_categories.get(archetype, ()))
+
+
+def recommend_near(index, categories, lat, lon, k=5, radius_m=2000):
+    """Tempat terdekat dalam radius, hanya kategori yang diizinkan (lihat allowed_categories)"""
+    return index.nearest(lat, lon, k=k, radius_m=radius_m, categories=set(categories))
+
+
+# --- DEDUP VENUE OSM ---
+# Node/way untuk tempat yang sama muncul berkali-kali dengan koordinat sedikit beda.
+# Elemen dengan nama ternormalisasi sama & jarak <= DEDUP_RADIUS_M digabung jadi satu venue.
+DEDUP_RADIUS_M = 100
+
+
+def normalize_names(names):
+    """Nama untuk pencocokan: huruf kecil, tanpa tanda baca, spasi dirapikan"""
+    return (names.astype('string').str.lower()
+            .str.replace(r'[^\w]+', ' ', regex=True)
+            .str.strip())
+
+
+def _candidate_pairs(keys, lat, lon, radius_m):
+    """Pasangan (i, j), i < j, dengan key sama di sel grid yang sama/bertetangga dan jarak <= radius_m"""
+    cos_lat = max(np.cos(np.radians(np.abs(lat).max())), 0.01) if len(lat) else 1.0
+    cell_deg = radius_m / (METERS_PER_DEG * cos_lat)
+    base = pd.DataFrame({
+        'key': keys, 'r': np.floor(lat / cell_deg).astype('int64'), 'c': np.floor(lon / cell_deg).astype('int64'),
+        'pos': np.arange(len(keys)),
+    })
+    pairs = []
+    for dr in (-1, 0, 1):
+        shifted = base.assign(r=base['r'] + dr)
+        m = base.merge(shifted, on=['key', 'r'], suffixes=('_i', '_j'))
+        m = m[(m['pos_i'] < m['pos_j']) & ((m['c_i'] - m['c_j']).abs() <= 1)]
+        pairs.append(m[['pos_i', 'pos_j']].to_numpy('int64'))
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype='int64')
+    i, j = pairs[:, 0], pairs[:, 1]
+    keep = haversine_m(lat[i], lon[i], lat[j], lon[j]) <= radius_m
+    return i[keep], j[keep]
+
+
+def _connected_components(n, i, j):
+    """Label komponen terhubung (label propagation + pointer jumping, tanpa loop per elemen)"""
+    labels = np.arange(n)
+    while len(i):
+        m = np.minimum(labels[i], labels[j])
+        new = labels.copy()
+        np.minimum.at(new, i, m)
+        np.minimum.at(new, j, m)
+        new = new[new]
+        if np.array_equal(new, labels): break
+        labels = new
+    return labels
+
+
+def _mode_per_group(groups, values):
+    """Nilai terbanyak per group (seri -> nilai yang muncul paling awal)"""
+    codes, uniques = pd.factorize(values)
+    counts = pd.DataFrame({'g': groups, 'v': codes}).value_counts(sort=False).reset_index(name='n')
+    counts = counts.sort_values(['g', 'n', 'v'], ascending=[True, False, True], kind='stable')
+    best = counts.drop_duplicates('g')
+    return pd.Series(uniques.take(best['v'].to_numpy()), index=best['g'].to_numpy())
+
+
+def dedup_venues(df, radius_m=DEDUP_RADIUS_M):
+    """
+    Gabungkan elemen OSM duplikat jadi satu venue kanonik.
+    Output: kategori, nama_tempat, lat, lon (rata-rata cluster), score (jumlah elemen dalam cluster).
+    """
+    if df.empty:
+        return pd.DataFrame(columns=['kategori', 'nama_tempat', 'lat', 'lon', 'score'])
+    df = df.reset_index(drop=True)
+    lat = df['lat'].to_numpy('float64')
+    lon = df['lon'].to_numpy('float64')
+    # Nama ternormalisasi -> kode integer sekali saja (merge di atas int jauh lebih murah daripada string)
+    keys, _ = pd.factorize(normalize_names(df['nama_tempat']))
+    i, j = _candidate_pairs(keys, lat, lon, radius_m)
+    cluster = _connected_components(len(df), i, j)
+
+    grouped = pd.DataFrame({'cluster': cluster, 'lat': lat, 'lon': lon}).groupby('cluster')
+    venues = grouped.agg(lat=('lat', 'mean'), lon=('lon', 'mean'), score=('lat', 'size'))
+    venues['nama_tempat'] = _mode_per_group(cluster, df['nama_tempat'].to_numpy())
+    venues['kategori'] = _mode_per_group(cluster, df['kategori'].to_numpy())
+    return venues.reset_index(drop=True)[['kategori', 'nama_tempat', 'lat', 'lon', 'score']]
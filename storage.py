@@ -0,0 +1,295 @@
+import io
+import os
+import json
+import time
+import uuid
+import socket
+import hashlib
+import threading
+from datetime import datetime
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytz
+
+# Pointer gold: dashboard hanya membaca objek yang terdaftar di sini
+GOLD_POINTER_OBJECT = "gold/_CURRENT.json"
+GOLD_VERSION_PREFIX = "gold/v"
+# Dataset gold berpartisi Hive: gold/<dataset>/<kolom>=<nilai>/.../part-<hash>.parquet
+# Nama part = hash isi -> partisi yang isinya sama tidak ditulis ulang; daftar part aktif ada di manifest dataset berversi.
+GOLD_DATASET_PREFIX = "gold"
+# Lock run pipeline (dipegang satu replica scheduler pada satu waktu)
+PIPELINE_LOCK_OBJECT = "_locks/pipeline.lock"
+
+
+def table_to_parquet_bytes(table, **write_options):
+    """Serialisasi Arrow Table / DataFrame ke parquet di memori (tanpa file sementara)"""
+    if not isinstance(table, pa.Table):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink, **write_options)
+    return sink.getvalue().to_pybytes()
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def new_version_id():
+    return datetime.now(pytz.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+class ArtifactWriter:
+    """
+    Upload artefak ke MinIO lewat worker pool.
+    Bucket dicek/dibuat sekali per writer, bukan per upload.
+    Upload dikumpulkan dulu, lalu flush() menunggu semuanya selesai.
+    Tiap upload dicatat di upload_stats (object, bytes, seconds, ok) untuk metrik pipeline.
+    """
+    def __init__(self, client, bucket, max_workers=8):
+        self.client = client
+        self.bucket = bucket
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending = {}
+        self._bucket_ready = False
+        self._lock = threading.Lock()
+        self.upload_stats = []
+
+    def ensure_bucket(self):
+        with self._lock:
+            if not self._bucket_ready:
+                if not self.client.bucket_exists(self.bucket): self.client.make_bucket(self.bucket)
+                self._bucket_ready = True
+
+    def _timed(self, object_name, size, upload):
+        t0, ok = time.perf_counter(), False
+        try:
+            upload()
+            ok = True
+        finally:
+            self.upload_stats.append({"object": object_name, "bytes": size, "seconds": time.perf_counter() - t0, "ok": ok})
+
+    def _put_bytes(self, object_name, data, content_type):
+        self.ensure_bucket()
+        self._timed(object_name, len(data), lambda: self.client.put_object(
+            self.bucket, object_name, io.BytesIO(data), len(data), content_type=content_type))
+
+    def _put_file(self, object_name, file_path):
+        self.ensure_bucket()
+        self._timed(object_name, os.path.getsize(file_path), lambda: self.client.fput_object(self.bucket, object_name, file_path))
+
+    def put_bytes(self, object_name, data, content_type="application/octet-stream"):
+        self._pending[object_name] = self._pool.submit(self._put_bytes, object_name, data, content_type)
+
+    def put_json(self, object_name, payload):
+        self.put_bytes(object_name, json.dumps(payload, indent=2, sort_keys=True).encode("utf-8"), "application/json")
+
+    def put_table(self, object_name, table, **write_options):
+        self.put_bytes(object_name, table_to_parquet_bytes(table, **write_options))
+
+    def put_file(self, object_name, file_path):
+        self._pending[object_name] = self._pool.submit(self._put_file, object_name, file_path)
+
+    def flush(self, object_names=None):
+        """Tunggu upload (semua, atau hanya object_names); return {object_name: True/False}"""
+        names = list(self._pending) if object_names is None else [n for n in object_names if n in self._pending]
+        pending = {n: self._pending.pop(n) for n in names}
+        wait(list(pending.values()))
+        results = {}
+        for object_name, future in pending.items():
+            error = future.exception()
+            results[object_name] = error is None
+            if error is None: print(f"   ☁️ [MINIO] Uploaded: {object_name}")
+            else: print(f"   ❌ Error Upload MinIO {object_name}: {error}")
+        return results
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+def read_json_object(client, bucket, object_name, default=None):
+    try:
+        resp = client.get_object(bucket, object_name)
+        try: return json.loads(resp.read())
+        finally:
+            resp.close(); resp.release_conn()
+    except Exception:
+        return default
+
+
+def load_gold_pointer(client, bucket):
+    """Isi pointer gold aktif: {"version": ..., "objects": {nama_logis: object_name}}"""
+    pointer = read_json_object(client, bucket, GOLD_POINTER_OBJECT, default={}) or {}
+    pointer.setdefault("objects", {})
+    return pointer
+
+
+def commit_gold_pointer(client, bucket, version, objects):
+    """Tulis pointer baru dalam satu PUT -> pembaca melihat set gold lama atau baru, tidak pernah campuran"""
+    payload = {"version": version, "objects": objects, "committed_at": datetime.now(pytz.utc).isoformat()}
+    data = json.dumps(payload, indent=2, sort_keys=True).encode("utf-8")
+    client.put_object(bucket, GOLD_POINTER_OBJECT, io.BytesIO(data), len(data), content_type="application/json")
+    print(f"   📌 [GOLD] Pointer -> versi {version}")
+
+
+def prune_gold_versions(client, bucket, pointer, keep=3):
+    """Hapus versi gold lama yang tidak lagi dirujuk pointer aktif"""
+    referenced = set(pointer.get("objects", {}).values())
+    by_version = {}
+    try:
+        for obj in client.list_objects(bucket, prefix=f"{GOLD_VERSION_PREFIX}/", recursive=True):
+            version = obj.object_name[len(GOLD_VERSION_PREFIX) + 1:].split("/", 1)[0]
+            by_version.setdefault(version, []).append(obj.object_name)
+        for version in sorted(by_version)[:-keep] if keep else sorted(by_version):
+            for object_name in by_version[version]:
+                if object_name not in referenced: client.remove_object(bucket, object_name)
+    except Exception as e: print(f"   ⚠️ Gagal prune versi gold: {e}")
+
+
+def split_partitions(table, partition_by):
+    """
+    Pecah Arrow Table yang SUDAH terurut partition_by jadi (nilai partisi, sub-tabel tanpa kolom partisi).
+    Sub-tabel berupa slice (zero-copy).
+    """
+    if table.num_rows == 0: return
+    keys = table.select(partition_by).to_pandas()
+    starts = np.flatnonzero((keys != keys.shift()).any(axis=1).to_numpy())
+    ends = np.append(starts[1:], table.num_rows)
+    data = table.drop_columns(partition_by)
+    for start, end in zip(starts, ends):
+        row = keys.iloc[start]
+        values = {c: row[c].item() if isinstance(row[c], np.generic) else row[c] for c in partition_by}
+        yield values, data.slice(start, end - start)
+
+
+def partition_object_name(dataset, partition_by, values, digest):
+    """gold/<dataset>/archetype=Social%20Butterfly/day_category=Senin/hour=19/part-<hash>.parquet"""
+    path = "/".join(f"{c}={quote(str(values[c]), safe='')}" for c in partition_by)
+    return f"{GOLD_DATASET_PREFIX}/{dataset}/{path}/part-{digest[:16]}.parquet"
+
+
+def prune_dataset_parts(client, bucket, dataset):
+    """
+    Hapus part dataset yang tidak dirujuk manifest dataset mana pun yang masih ada di gold/v/ (jalankan setelah
+    prune_gold_versions). Return daftar object yang dihapus.
+    """
+    removed = []
+    try:
+        referenced = set()
+        for obj in client.list_objects(bucket, prefix=f"{GOLD_VERSION_PREFIX}/", recursive=True):
+            if obj.object_name.endswith(f"/{dataset}.json"):
+                ds = read_json_object(client, bucket, obj.object_name, default=None)
+                # Manifest tidak terbaca -> jangan hapus apa pun (lebih baik sisa sampah daripada part hilang)
+                if ds is None: return removed
+                referenced.update(p["path"] for p in ds.get("parts", []))
+        for obj in client.list_objects(bucket, prefix=f"{GOLD_DATASET_PREFIX}/{dataset}/", recursive=True):
+            if obj.object_name not in referenced:
+                client.remove_object(bucket, obj.object_name)
+                removed.append(obj.object_name)
+    except Exception as e: print(f"   ⚠️ Gagal prune part {dataset}: {e}")
+    return removed
+
+
+class LockLost(Exception):
+    """Lock tidak lagi dipegang (token ditimpa replica lain / lease habis tanpa diperpanjang)"""
+
+
+class ObjectLock:
+    """
+    Lease lock di atas satu objek MinIO, untuk mencegah run tumpang tindih antar replica.
+    - Isi lock: owner, token acak, expires_at (UTC). Lock yang lewat expires_at dianggap mati (replica crash).
+    - PUT bersyarat tidak tersedia di klien minio -> setelah menulis, lock dibaca ulang setelah `settle` detik;
+      kalau token sudah ditimpa replica lain, kita yang mundur (penulis terakhir menang).
+      Batasannya: replica yang tertahan lebih lama dari `settle` di antara membaca lock kosong dan menulis
+      lock-nya tetap bisa menimpa kita setelah read-back -> dua replica sempat sama-sama merasa memegang lock.
+      Karena itu penulisan state bersama (pointer gold, watermark) didahului ensure().
+    - Selama dipegang, thread heartbeat memperpanjang expires_at tiap ttl/3 detik. Token ditimpa atau lease
+      habis (perpanjangan gagal terus) -> lock ditandai hilang (self.lost) dan ensure() melempar LockLost.
+    """
+    def __init__(self, client, bucket, object_name=PIPELINE_LOCK_OBJECT, ttl=900, settle=1.0, owner=None):
+        self.client = client
+        self.bucket = bucket
+        self.object_name = object_name
+        self.ttl = ttl
+        self.settle = settle
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.token = None
+        self.acquired_at = None
+        self.holder = None
+        self.lost = None
+        self._renewed_at = None
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def _write(self):
+        now = datetime.now(pytz.utc)
+        payload = {"owner": self.owner, "token": self.token, "acquired_at": self.acquired_at,
+                   "expires_at": now.timestamp() + self.ttl}
+        data = json.dumps(payload, sort_keys=True).encode("utf-8")
+        t0 = time.monotonic()
+        self.client.put_object(self.bucket, self.object_name, io.BytesIO(data), len(data), content_type="application/json")
+        self._renewed_at = t0
+
+    def _current(self):
+        lock = read_json_object(self.client, self.bucket, self.object_name, default=None)
+        if lock and lock.get("expires_at", 0) > datetime.now(pytz.utc).timestamp(): return lock
+        return None
+
+    def acquire(self):
+        """True kalau lock didapat; False kalau replica lain memegang lock yang masih hidup (lihat self.holder)"""
+        if not self.client.bucket_exists(self.bucket): self.client.make_bucket(self.bucket)
+        self.holder = self._current()
+        if self.holder is not None: return False
+        self.token = uuid.uuid4().hex
+        self.acquired_at = datetime.now(pytz.utc).isoformat()
+        self.lost = None
+        self._write()
+        time.sleep(self.settle)
+        self.holder = self._current()
+        if not self.holder or self.holder.get("token") != self.token:
+            self.token = None
+            return False
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._renew, daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _lose(self, reason):
+        if self.lost is None:
+            self.lost = reason
+            print(f"   🔓 [LOCK] Lock hilang: {reason}")
+
+    def _renew(self):
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                lock = self._current()
+                if not lock or lock.get("token") != self.token:
+                    self._lose(f"diambil alih {(lock or {}).get('owner', 'lease habis')}")
+                    return
+                self._write()
+            except Exception as e:
+                print(f"   ⚠️ Gagal perpanjang lock: {e}")
+                if time.monotonic() - self._renewed_at >= self.ttl:
+                    self._lose("lease habis, perpanjangan gagal")
+                    return
+
+    def ensure(self):
+        """Pastikan lock masih milik kita tepat sebelum menulis state bersama; kalau tidak -> LockLost"""
+        if self.lost is None and self.token is None: self.lost = "lock tidak pernah didapat"
+        if self.lost is None and time.monotonic() - self._renewed_at >= self.ttl: self._lose("lease habis")
+        if self.lost is None:
+            lock = self._current()
+            if not lock or lock.get("token") != self.token: self._lose(f"diambil alih {(lock or {}).get('owner', 'lease habis')}")
+        if self.lost is not None: raise LockLost(self.lost)
+
+    def release(self):
+        self._stop.set()
+        if self._heartbeat: self._heartbeat.join()
+        try:
+            lock = read_json_object(self.client, self.bucket, self.object_name, default=None)
+            if lock and lock.get("token") == self.token: self.client.remove_object(self.bucket, self.object_name)
+        except Exception as e: print(f"   ⚠️ Gagal lepas lock: {e}")
+        self.token = None
@@ -0,0 +1,30 @@
+"""
+Fixture bersama: test jalan offline di atas pengganti MinIO/HTTP yang sama dengan benchmark (benchmarks/fakes.py).
+
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# elt_pipeline / extract membaca env saat import -> folder kerja test & backoff retry diset sebelum modul di-import
+os.environ.setdefault("PIPELINE_TEMP_DIR", tempfile.mkdtemp(prefix="social_radar_test_"))
+os.environ.setdefault("EXTRACT_RETRY_BACKOFF", "0")
+
+from benchmarks.fakes import MemoryObjectStore, StubHTTPServer  # noqa: E402
+
+
+@pytest.fixture
+def store():
+    return MemoryObjectStore()
+
+
+@pytest.fixture
+def http():
+    with StubHTTPServer() as server:
+        yield server
@@ -0,0 +1,63 @@
+import json
+import sqlite3
+from datetime import date
+
+import pandas as pd
+
+from calendar_dim import Calendar, build_calendar, merge_holidays, read_holidays_db, read_holidays_json, write_calendar
+
+
+def test_merge_holidays_one_row_per_date():
+    db = pd.DataFrame({"date": ["2026-01-01", "2026-03-20", "2026-03-20"], "name": ["Tahun Baru", "Idul Fitri", None], "type": None})
+    js = pd.DataFrame({"date": ["2026-03-20", "2026-01-01", "2026-08-17"], "name": ["Hari Raya Nyepi", "Tahun Baru", "HUT RI"],
+                       "type": ["national", "national", "national"]})
+    merged = merge_holidays(db, js, pd.DataFrame(), None)
+    assert merged["date"].tolist() == [date(2026, 1, 1), date(2026, 3, 20), date(2026, 8, 17)]
+    # Nama sama di dua sumber dihitung sekali; nama beda di tanggal sama digabung; type dari sumber pertama yang punya
+    assert merged["name"].tolist() == ["Tahun Baru", "Idul Fitri / Hari Raya Nyepi", "HUT RI"]
+    assert merged["type"].tolist() == ["national"] * 3
+
+
+def test_merge_holidays_empty_sources():
+    merged = merge_holidays(None, pd.DataFrame())
+    assert merged.empty and merged.columns.tolist() == ["date", "name", "type"]
+
+
+def test_build_calendar_holidays_become_minggu():
+    holidays = merge_holidays(pd.DataFrame({"date": ["2026-08-17", "2028-01-01"], "name": ["HUT RI", "Tahun Baru"]}))
+    cal = build_calendar(holidays, today=date(2026, 10, 17))
+    # Rentang: tahun lalu s/d tahun depan, diperluas sampai tahun libur terjauh di sumber
+    assert cal["date"].iloc[0] == date(2025, 1, 1) and cal["date"].iloc[-1] == date(2028, 12, 31)
+    assert len(cal) == (date(2028, 12, 31) - date(2025, 1, 1)).days + 1
+    row = cal.set_index("date").loc[date(2026, 8, 17)]
+    assert row["day_name"] == "Senin" and row["day_category"] == "Minggu" and row["is_holiday"] and row["holiday_name"] == "HUT RI"
+    normal = cal.set_index("date").loc[date(2026, 10, 17)]
+    assert normal["day_category"] == "Sabtu" and not normal["is_holiday"] and normal["weekday"] == 5
+    assert cal["is_holiday"].sum() == 2
+
+
+def test_calendar_lookup_round_trips_parquet(tmp_path):
+    holidays = merge_holidays(pd.DataFrame({"date": ["2026-08-17"], "name": ["HUT RI"], "type": ["national"]}))
+    path = str(tmp_path / "calendar.parquet")
+    write_calendar(build_calendar(holidays, today=date(2026, 10, 17)), path)
+    cal = Calendar.from_parquet(path)
+    assert cal.day_category(date(2026, 8, 17)) == "Minggu"
+    assert cal.holiday(date(2026, 8, 17)) == ("HUT RI", "national")
+    assert cal.holiday_dates() == {date(2026, 8, 17)}
+    # Di luar rentang tabel -> nama hari biasa
+    assert cal.day_category(date(2035, 1, 1)) == "Senin" and not cal.is_holiday(date(2035, 1, 1))
+    assert Calendar().day_category(date(2026, 8, 17)) == "Senin"
+
+
+def test_read_holiday_sources(tmp_path):
+    db = str(tmp_path / "holidays.db")
+    con = sqlite3.connect(db)
+    con.execute("CREATE TABLE holidays (date TEXT, name TEXT)")
+    con.execute("INSERT INTO holidays VALUES ('2026-08-17', 'HUT RI')")
+    con.commit()
+    con.close()
+    js = tmp_path / "holidays.json"
+    js.write_text(json.dumps([{"date": "2026-12-25", "name": "Natal", "type": "national", "extra": 1}]), encoding="utf-8")
+    merged = merge_holidays(read_holidays_json(str(js)), read_holidays_db(db))
+    assert merged["name"].tolist() == ["HUT RI", "Natal"]
+    assert merged["type"].tolist() == [None, "national"]
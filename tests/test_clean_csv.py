@@ -0,0 +1,50 @@
+import pandas as pd
+
+from elt_pipeline import CleanQuotedCsv, clean_csv_quotes, detect_encoding
+
+
+def write_lines(path, lines, newline=b"\r\n"):
+    path.write_bytes(newline.join(lines) + newline)
+    return str(path)
+
+
+def test_clean_csv_unwraps_quoted_rows(tmp_path):
+    path = write_lines(tmp_path / "sheet.csv", [
+        b"timestamp,ciri", b'"12/17/2025 11:28:38,""Kaca mata, Tas Laptop"""', b"12/17/2025 11:30:00,Batik",
+    ])
+    with clean_csv_quotes(path) as stream:
+        df = pd.read_csv(stream)
+    assert df["ciri"].tolist() == ["Kaca mata, Tas Laptop", "Batik"]
+
+
+def test_clean_csv_chunked_read_matches_full_read(tmp_path):
+    lines = [b"a,b"] + [f'"{i},""x, {i}"""'.encode() for i in range(5000)]
+    path = write_lines(tmp_path / "sheet.csv", lines)
+    with clean_csv_quotes(path) as stream:
+        chunks = list(pd.read_csv(stream, chunksize=777))
+    with clean_csv_quotes(path) as stream:
+        full = pd.read_csv(stream)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+    assert len(full) == 5000 and full["b"].iloc[-1] == "x, 4999"
+
+
+def test_clean_csv_latin1_line_after_sample(tmp_path, capsys):
+    # Baris Latin-1 jauh setelah sampel deteksi (64 KiB) -> dibaca Latin-1, baris UTF-8 lain tetap utuh
+    lines = [b"a,b"] + ['"{},é"'.format(i).encode("utf-8") for i in range(20000)] + ['"x,caf\xe9"'.encode("latin-1")]
+    path = write_lines(tmp_path / "mixed.csv", lines)
+    assert detect_encoding(path) == "utf-8"
+    stream = CleanQuotedCsv(path)
+    df = pd.read_csv(stream)
+    stream.close()
+    assert stream.fallback_lines == 1
+    assert df["b"].iloc[0] == "é" and df["b"].iloc[-1] == "café"
+    assert "�" not in "".join(df["b"])
+    assert "1 baris mixed.csv dibaca sebagai Latin-1" in capsys.readouterr().out
+
+
+def test_clean_csv_latin1_file(tmp_path):
+    path = write_lines(tmp_path / "latin.csv", [b"a,b", '"1,Jum\xe1t"'.encode("latin-1")])
+    assert detect_encoding(path) == "latin-1"
+    stream = CleanQuotedCsv(path)
+    assert pd.read_csv(stream)["b"].tolist() == ["Jum\xe1t"]
+    assert stream.fallback_lines == 0
@@ -0,0 +1,98 @@
+import functools
+import pstats
+
+import pytest
+
+from dag import DagRunner, Task, TaskFailed
+from metrics import RunMetrics
+
+
+def make_tasks(calls, fail):
+    """extract -> transform -> publish, plus side yang tidak bergantung pada transform"""
+    def step(name, fails=False):
+        def fn(inputs):
+            calls.append(name)
+            if fails and fail: raise RuntimeError(f"{name} rusak")
+            return {"value": name, "inputs": sorted(inputs)}
+        return fn
+
+    return [
+        Task("extract", step("extract"), key_fn=lambda inputs: "sumber-v1"),
+        Task("transform", step("transform", fails=True), deps=["extract"], key_fn=lambda inputs: "rule-v1"),
+        Task("side", step("side"), deps=["extract"], key_fn=lambda inputs: "v1"),
+        Task("publish", step("publish"), deps=["transform", "side"]),
+    ]
+
+
+def test_dag_resumes_from_failed_task(tmp_path):
+    state = str(tmp_path / "_dag_state.json")
+    calls, fail = [], [True]
+
+    with pytest.raises(TaskFailed, match="transform"):
+        DagRunner(make_tasks(calls, fail), state).run()
+    # Task yang tidak bergantung pada task gagal tetap selesai; publish tidak jalan
+    assert calls == ["extract", "transform", "side"]
+
+    calls.clear()
+    fail.clear()
+    results = DagRunner(make_tasks(calls, fail), state).run()
+    # extract & side dari cache state, mulai lagi dari transform
+    assert calls == ["transform", "publish"]
+    assert results["publish"]["inputs"] == ["side", "transform"]
+
+    calls.clear()
+    DagRunner(make_tasks(calls, fail), state).run()
+    # publish tanpa key_fn -> selalu dijalankan
+    assert calls == ["publish"]
+
+
+def test_dag_force_and_unknown_dependency(tmp_path):
+    state = str(tmp_path / "_dag_state.json")
+    calls = []
+    DagRunner(make_tasks(calls, []), state).run()
+    calls.clear()
+    DagRunner(make_tasks(calls, []), state).run(force=["extract"])
+    # Cache key turunan dari key_fn + key dependency, bukan hasilnya -> transform/side tetap dari cache
+    assert calls == ["extract", "publish"]
+
+    with pytest.raises(ValueError, match="dependency tidak dikenal"):
+        DagRunner([Task("a", lambda inputs: {}, deps=["b"])], state)
+
+
+def busy(inputs):
+    return {"rows_out": sum(i * i for i in range(20000))}
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_dag_profiles_isolated_task_inside_worker(tmp_path, workers):
+    metrics = RunMetrics(run_id="run-test", profile_dir=str(tmp_path / "profiles"))
+    tasks = [Task("recs", busy, isolated=True, stage=("final_recs", {"city": "banjarmasin"}))]
+    DagRunner(tasks, str(tmp_path / "_dag_state.json"), workers=workers, metrics=metrics).run()
+
+    [rec] = metrics.stages
+    assert rec.profile == str(tmp_path / "profiles" / "run-test" / "final_recs-banjarmasin.prof")
+    # Dump berasal dari proses yang menjalankan fn -> fungsi task ada di profilnya
+    functions = {func for (_, _, func) in pstats.Stats(rec.profile).stats}
+    assert "busy" in functions
+    assert rec.as_dict()["profile"] == rec.profile
+
+
+def allocate(inputs, mb=0):
+    block = bytearray(mb << 20)
+    block[::4096] = b"\1" * len(block[::4096])
+    return {"rows_out": len(block)}
+
+
+def test_dag_worker_peak_rss_is_per_task(tmp_path):
+    metrics = RunMetrics(run_id="run-test")
+    # Satu worker dipakai ulang: task besar dulu, lalu task kecil yang bergantung padanya
+    tasks = [
+        Task("besar", functools.partial(allocate, mb=200), isolated=True, stage=("task", {"n": "besar"})),
+        Task("kecil", allocate, deps=["besar"], isolated=True, stage=("task", {"n": "kecil"})),
+    ]
+    DagRunner(tasks, str(tmp_path / "_dag_state.json"), workers=1, metrics=metrics).run()
+    besar, kecil = metrics.stages
+    if besar.extra["rss_scope"] != "task": pytest.skip("high-water RSS tidak bisa di-reset di platform ini")
+    assert besar.peak_rss_bytes - kecil.peak_rss_bytes > 150 << 20
+    assert besar.rss_growth_bytes > 150 << 20 and kecil.rss_growth_bytes < 50 << 20
+    assert kecil.as_dict()["rss_scope"] == "task"
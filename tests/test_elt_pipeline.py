@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import elt_pipeline
+from elt_pipeline import iter_json_array, publish_gold
+from storage import ArtifactWriter, GOLD_POINTER_OBJECT, load_gold_pointer
+
+ELEMENTS = [
+    {"type": "node", "id": 1, "lat": -3.3194, "lon": 114.5908, "tags": {"name": "Kafe \"Kopi\" Ñusantara", "amenity": "cafe"}},
+    {"type": "way", "id": 22, "center": {"lat": -3.3, "lon": 114.6}, "tags": {}},
+    {"type": "node", "id": 333, "lat": 0.6, "lon": 1e-05, "tags": {"nested": [1, [2, {"x": None}]], "ok": True}},
+]
+
+
+@pytest.fixture
+def osm_json(tmp_path):
+    # Key lain sebelum & sesudah array (dilewati), spasi/newline di antara token
+    payload = {"version": 0.6, "osm3s": {"copyright": "ODbL"}, "elements": ELEMENTS, "remark": "selesai"}
+    path = tmp_path / "lokasi.json"
+    path.write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 20])
+def test_iter_json_array_chunk_sizes(osm_json, chunk_size):
+    # Chunk 1-2 karakter memotong angka ("0." dari "0.6"), string escape & karakter non-ASCII di tengah token
+    assert list(iter_json_array(osm_json, "elements", chunk_size=chunk_size)) == ELEMENTS
+
+
+def test_iter_json_array_truncated(tmp_path):
+    path = tmp_path / "terpotong.json"
+    path.write_text('{"elements": [{"id": 1}, {"id": 2}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(path, "elements", chunk_size=4))
+
+
+def test_iter_json_array_missing_key(osm_json):
+    assert list(iter_json_array(osm_json, "tidak_ada")) == []
+
+
+def test_publish_gold_moves_pointer_after_all_uploads(store, monkeypatch):
+    monkeypatch.setattr(elt_pipeline, "client", store)
+    objects = {"recommendations": "gold/v/v2/recommendations.parquet", "rules": "gold/v/v2/rules.parquet"}
+    writer = ArtifactWriter(store, elt_pipeline.BUCKET_NAME)
+    manifest, staged = {"sources": {}, "artifacts": {}, "inputs": {}}, {}
+    for name, obj in objects.items(): elt_pipeline.stage_upload(writer, manifest, staged, obj, data=name.encode())
+
+    assert publish_gold(writer, manifest, staged, {"objects": {}}, "v2", objects)
+    pointer = load_gold_pointer(store, elt_pipeline.BUCKET_NAME)
+    assert pointer["version"] == "v2" and pointer["objects"] == objects
+    assert all(obj in store.objects for obj in objects.values())
+
+
+def test_publish_gold_keeps_pointer_when_upload_fails(store, monkeypatch):
+    monkeypatch.setattr(elt_pipeline, "client", store)
+    old = {"recommendations": "gold/v/v1/recommendations.parquet"}
+    store.objects[GOLD_POINTER_OBJECT] = json.dumps({"version": "v1", "objects": old}).encode()
+    put_object = store.put_object
+
+    def flaky_put(bucket, name, data, length, **kwargs):
+        if name.endswith("rules.parquet"): raise OSError("koneksi putus")
+        return put_object(bucket, name, data, length, **kwargs)
+
+    monkeypatch.setattr(store, "put_object", flaky_put)
+    objects = {"recommendations": "gold/v/v2/recommendations.parquet", "rules": "gold/v/v2/rules.parquet"}
+    writer = ArtifactWriter(store, elt_pipeline.BUCKET_NAME)
+    manifest, staged = {"sources": {}, "artifacts": {}, "inputs": {}}, {}
+    for name, obj in objects.items(): elt_pipeline.stage_upload(writer, manifest, staged, obj, data=name.encode())
+
+    assert not publish_gold(writer, manifest, staged, {"objects": old}, "v2", objects)
+    assert load_gold_pointer(store, elt_pipeline.BUCKET_NAME)["version"] == "v1"
+    # Hash artefak yang gagal tidak dicatat -> di-upload ulang run berikutnya
+    assert "gold/v/v2/rules.parquet" not in manifest["artifacts"]
@@ -0,0 +1,71 @@
+import extract
+from extract import extract_source, fetch_http
+from scheduler import POLL_SECONDS
+
+
+def source(http, path="/sheet.csv", **kwargs):
+    return {"name": "survey", "filename": "hasil_survey.csv", "fetch": fetch_http(http.url(path)),
+            "timeout": 5, "retries": 0, "seed": None, **kwargs}
+
+
+def test_fetch_http_304_is_not_modified(http, tmp_path):
+    http.routes["/sheet.csv"] = (b"timestamp,gender\n1,Pria\n", "text/csv")
+    first = extract_source(source(http), str(tmp_path))
+    assert first["status"] == "fresh" and first["bytes_received"] == 24
+
+    second = extract_source(source(http), str(tmp_path))
+    assert second["status"] == "not_modified"
+    assert second["sha256"] == first["sha256"]
+    assert http.not_modified == {"/sheet.csv": 1}
+
+    # Isi berubah -> ETag berubah -> 200 dengan isi baru
+    http.routes["/sheet.csv"] = (b"timestamp,gender\n1,Pria\n2,Wanita\n", "text/csv")
+    third = extract_source(source(http), str(tmp_path))
+    assert third["status"] == "fresh" and third["sha256"] != first["sha256"]
+    assert (tmp_path / "hasil_survey.csv").read_bytes().endswith(b"2,Wanita\n")
+
+
+def test_fetch_http_without_validators_never_sends_conditional_get(http, tmp_path):
+    http.routes["/sheet.csv"] = (b"a,b\n", "text/csv")
+    extract_source(source(http), str(tmp_path))
+    # Salinan bronze bukan hasil fetch URL ini (misal dari seed) -> validator tidak dipakai
+    (tmp_path / "hasil_survey.csv").write_bytes(b"a,b\n")
+    assert extract_source(source(http), str(tmp_path))["status"] == "fresh"
+    assert http.not_modified == {}
+
+
+def test_extract_source_falls_back_to_seed(http, tmp_path):
+    seed = tmp_path / "seed.csv"
+    seed.write_bytes(b"seed\n")
+    bronze = tmp_path / "bronze"
+    bronze.mkdir()
+    result = extract_source(source(http, "/hilang.csv", seed=str(seed)), str(bronze))
+    assert result["status"] == "seed" and "404" in result["error"]
+    assert (bronze / "hasil_survey.csv").read_bytes() == b"seed\n"
+
+
+def test_probe_http_hashes_once_per_interval(http, monkeypatch):
+    http.routes["/sheet.csv"] = (b"a,b\n", "text/csv")
+    monkeypatch.setattr(extract, "_probe_hashes", {})
+    url = http.url("/sheet.csv")
+    # Stub tanpa HEAD -> probe jatuh ke GET + hash, yang dibatasi sekali per interval
+    first = extract.probe_http(url, hash_interval=3600)
+    assert extract.probe_http(url, hash_interval=3600) == first
+    assert http.hits["/sheet.csv"] == 1
+
+
+def test_probe_http_default_interval_follows_scheduler_poll(http, monkeypatch):
+    # Default = 2 poll scheduler, bukan SCHEDULER_MAX_INTERVAL -> perubahan sheet terlihat di poll kedua
+    assert extract.PROBE_HASH_INTERVAL == 2 * POLL_SECONDS
+    http.routes["/sheet.csv"] = (b"a,b\n", "text/csv")
+    monkeypatch.setattr(extract, "_probe_hashes", {})
+    now = [1000.0]
+    monkeypatch.setattr(extract.time, "monotonic", lambda: now[0])
+    url = http.url("/sheet.csv")
+    first = extract.probe_http(url)
+    http.routes["/sheet.csv"] = (b"a,b\n1,2\n", "text/csv")
+    now[0] += POLL_SECONDS
+    assert extract.probe_http(url) == first
+    now[0] += POLL_SECONDS
+    assert extract.probe_http(url) != first
+    assert http.hits["/sheet.csv"] == 2
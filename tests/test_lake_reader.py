@@ -0,0 +1,204 @@
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from lake_reader import GoldCache, MinioObjectFile, ParquetObject, PartitionedDataset
+from storage import (
+    commit_gold_pointer, partition_object_name, prune_dataset_parts, sha256_bytes, split_partitions, table_to_parquet_bytes,
+)
+
+BUCKET = "datalake"
+
+
+def put(store, name, df):
+    store.objects[name] = table_to_parquet_bytes(df)
+
+
+def publish(store, version, frames):
+    """Satu versi gold: objek gold/v/<versi>/<nama>.parquet + pointer"""
+    objects = {}
+    for name, df in frames.items():
+        objects[name] = f"gold/v/{version}/{name}.parquet"
+        put(store, objects[name], df)
+    commit_gold_pointer(store, BUCKET, version, objects)
+    return objects
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Waktu monotonic yang dimajukan manual (TTL cache)"""
+    now = [1000.0]
+    monkeypatch.setattr("lake_reader.time.monotonic", lambda: now[0])
+    return now
+
+
+def recs(n):
+    return pd.DataFrame({"archetype": ["Sporty"] * n, "rank_urutan": range(n)})
+
+
+def test_gold_cache_checks_pointer_once_per_ttl(store, clock):
+    publish(store, "v1", {"recommendations": recs(2), "gold_rule_table": pd.DataFrame({"x": [1]})})
+    cache = GoldCache(store, BUCKET, ["recommendations", "gold_rule_table"], ttl=30)
+    snapshot, status = cache.get()
+    assert status == (True, "Data Terupdate") and snapshot.version == "v1"
+    assert len(snapshot.frame("recommendations")) == 2
+
+    requests = store.requests
+    clock[0] += 10
+    assert cache.get()[0] is snapshot and store.requests == requests
+
+    # TTL lewat, pointer sama -> cukup stat pointer, snapshot dipakai ulang
+    clock[0] += 30
+    assert cache.get()[0] is snapshot and store.requests == requests + 1
+
+
+def test_gold_cache_reuses_unchanged_objects_across_versions(store, clock):
+    objects = publish(store, "v1", {"recommendations": recs(2), "gold_rule_table": pd.DataFrame({"x": [1]})})
+    cache = GoldCache(store, BUCKET, ["recommendations", "gold_rule_table"], ttl=30)
+    first, _ = cache.get()
+
+    # Versi baru hanya mengganti recommendations; rule table tetap menunjuk objek lama
+    put(store, "gold/v/v2/recommendations.parquet", recs(3))
+    commit_gold_pointer(store, BUCKET, "v2", {**objects, "recommendations": "gold/v/v2/recommendations.parquet"})
+    sent = store.bytes_sent
+    clock[0] += 31
+    second, status = cache.get()
+    assert second.version == "v2" and status[0]
+    assert len(second.frame("recommendations")) == 3
+    assert second.frame("gold_rule_table") is first.frame("gold_rule_table")
+    # Yang diunduh hanya pointer + objek yang berubah
+    assert store.bytes_sent - sent == len(store.objects["gold/_CURRENT.json"]) + len(store.objects["gold/v/v2/recommendations.parquet"])
+
+
+def test_gold_cache_serves_stale_snapshot_when_minio_down(store, clock, monkeypatch):
+    publish(store, "v1", {"recommendations": recs(2)})
+    cache = GoldCache(store, BUCKET, ["recommendations"], ttl=30)
+    snapshot, _ = cache.get()
+
+    def down(*args, **kwargs): raise ConnectionError("minio mati")
+    monkeypatch.setattr(store, "stat_object", down)
+    clock[0] += 31
+    stale, (ok, message) = cache.get()
+    assert stale is snapshot and not ok
+    assert message.startswith("Offline, memakai data versi v1")
+
+    # Kegagalan juga dicatat -> tidak ada percobaan ulang sebelum TTL lewat
+    calls = []
+    monkeypatch.setattr(store, "stat_object", lambda *a, **k: calls.append(1) or down())
+    clock[0] += 5
+    assert cache.get()[0] is snapshot and calls == []
+
+
+def test_gold_cache_without_snapshot_reports_waiting(store, clock, monkeypatch):
+    def down(*args, **kwargs): raise ConnectionError("minio mati")
+    monkeypatch.setattr(store, "stat_object", down)
+    cache = GoldCache(store, BUCKET, ["recommendations"])
+    snapshot, (ok, message) = cache.get()
+    assert snapshot is None and not ok and message.startswith("Menunggu Koneksi")
+
+
+def cube(n_per_arch=500):
+    archs = ["Creative", "Healing", "Sporty", "Techie"]
+    return pd.DataFrame({
+        "archetype": [a for a in archs for _ in range(n_per_arch)],
+        "hour": [h % 24 for _ in archs for h in range(n_per_arch)],
+        "nama_tempat": [f"Tempat {i}" for i in range(n_per_arch * len(archs))],
+        "score": range(n_per_arch * len(archs)),
+    })
+
+
+def test_minio_object_file_range_reads(store):
+    store.objects["blob"] = bytes(range(256)) * 4
+    f = MinioObjectFile(store, BUCKET, "blob")
+    assert f.size == 1024
+    f.seek(10)
+    assert f.read(5) == bytes(range(10, 15)) and f.tell() == 15
+    f.seek(-3, io.SEEK_END)
+    assert f.read(100) == bytes([253, 254, 255]) and f.read(1) == b""
+    assert f.bytes_read == 8
+
+
+def test_parquet_object_row_group_pushdown(store):
+    df = cube()
+    store.objects["gold/v/v1/recommendations.parquet"] = table_to_parquet_bytes(df, row_group_size=250)
+    table = ParquetObject(store, BUCKET, "gold/v/v1/recommendations.parquet")
+    assert table.metadata.num_row_groups == 8
+    # Data terurut archetype -> hanya 2 row group yang lolos statistik min/max
+    assert table.row_groups({"archetype": "Sporty"}) == [4, 5]
+    assert table.row_groups({"archetype": "Sporty", "hour": 99}) == []
+
+    before = table.source.bytes_read
+    out = table.read(["nama_tempat", "score"], archetype="Sporty", hour=3)
+    expected = df[(df["archetype"] == "Sporty") & (df["hour"] == 3)][["nama_tempat", "score"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected)
+    # Hanya column chunk yang diminta dari row group yang lolos, bukan seluruh objek
+    assert table.source.bytes_read - before < len(store.objects["gold/v/v1/recommendations.parquet"]) / 4
+
+
+def test_parquet_object_no_match_and_distinct(store):
+    store.objects["recs.parquet"] = table_to_parquet_bytes(cube(10), row_group_size=10)
+    table = ParquetObject(store, BUCKET, "recs.parquet")
+    empty = table.read(["nama_tempat"], archetype="Religius", kolom_tidak_ada=1)
+    assert empty.empty and empty.columns.tolist() == ["nama_tempat"]
+    assert table.distinct("archetype") == ["Creative", "Healing", "Sporty", "Techie"]
+
+
+def stage_dataset(store, name, df, partition_by, version):
+    """Seperti stage_gold_dataset di pipeline: part content-addressed + manifest berversi"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    parts = []
+    for values, part in split_partitions(table, partition_by):
+        data = table_to_parquet_bytes(part)
+        object_name = partition_object_name(name, partition_by, values, sha256_bytes(data))
+        store.objects[object_name] = data
+        parts.append({"path": object_name, "values": values, "rows": part.num_rows})
+    manifest = {"dataset": name, "partition_by": partition_by, "parts": parts,
+                "columns": [c for c in table.schema.names if c not in partition_by]}
+    store.objects[f"gold/v/{version}/{name}.json"] = json.dumps(manifest).encode()
+    return manifest
+
+
+def test_split_partitions_and_object_names():
+    df = pd.DataFrame({"archetype": ["Social Butterfly", "Social Butterfly", "Sporty"], "hour": [19, 20, 19], "x": [1, 2, 3]})
+    parts = list(split_partitions(pa.Table.from_pandas(df, preserve_index=False), ["archetype", "hour"]))
+    assert [values for values, _ in parts] == [
+        {"archetype": "Social Butterfly", "hour": 19}, {"archetype": "Social Butterfly", "hour": 20}, {"archetype": "Sporty", "hour": 19},
+    ]
+    assert all(part.schema.names == ["x"] for _, part in parts)
+    assert isinstance(parts[0][0]["hour"], int)
+    assert partition_object_name("recommendations", ["archetype", "hour"], parts[0][0], "ab" * 32) == \
+        "gold/recommendations/archetype=Social%20Butterfly/hour=19/part-abababababababab.parquet"
+    assert list(split_partitions(pa.Table.from_pandas(df.iloc[:0], preserve_index=False), ["archetype"])) == []
+
+
+def test_partitioned_dataset_reads_only_matching_parts(store):
+    df = cube(48).sort_values(["archetype", "hour"], kind="stable").reset_index(drop=True)
+    manifest = stage_dataset(store, "recommendations", df, ["archetype", "hour"], "v1")
+    ds = PartitionedDataset(store, BUCKET, "gold/v/v1/recommendations.json")
+    assert len(ds.files(archetype="Sporty")) == 24 and len(ds.files(archetype="Sporty", hour=7)) == 1
+
+    out = ds.read(["archetype", "hour", "nama_tempat"], archetype="Sporty", hour=7)
+    expected = df[(df["archetype"] == "Sporty") & (df["hour"] == 7)][["archetype", "hour", "nama_tempat"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+    one_part = next(p["path"] for p in manifest["parts"] if p["values"] == {"archetype": "Sporty", "hour": 7})
+    assert ds.bytes_read == len(store.objects[one_part])
+    assert ds.distinct("archetype") == ["Creative", "Healing", "Sporty", "Techie"]
+    assert ds.read(["nama_tempat"], archetype="Religius").empty
+
+
+def test_unchanged_partitions_keep_object_and_prune_drops_orphans(store):
+    df = cube(48).sort_values(["archetype", "hour"], kind="stable").reset_index(drop=True)
+    v1 = stage_dataset(store, "recommendations", df, ["archetype"], "v1")
+    df.loc[df["archetype"] == "Techie", "score"] += 1
+    v2 = stage_dataset(store, "recommendations", df, ["archetype"], "v2")
+    changed = {p["values"]["archetype"] for p, q in zip(v1["parts"], v2["parts"]) if p["path"] != q["path"]}
+    assert changed == {"Techie"}
+
+    # Versi v1 sudah di-prune dari gold/v/ -> part Techie lama tidak dirujuk lagi
+    del store.objects["gold/v/v1/recommendations.json"]
+    removed = prune_dataset_parts(store, BUCKET, "recommendations")
+    assert removed == [v1["parts"][3]["path"]]
+    assert all(p["path"] in store.objects for p in v2["parts"])
@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+
+from elt_pipeline import file_sha256
+from lakehouse import connect_lakehouse, load_new_parts, merge_frame
+
+
+def test_merge_table_counts():
+    con = connect_lakehouse()
+    df = pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"], "score": [1.0, 2.0, None]})
+    assert merge_frame(con, "venues", df, ["id"]) == {"INSERT": 3}
+    # Baris sama persis (termasuk NULL) tidak disentuh
+    assert merge_frame(con, "venues", df, ["id"]) == {}
+
+    df2 = pd.DataFrame({"id": [1, 2, 4], "name": ["a", "B", "d"], "score": [1.0, 2.0, 4.0]})
+    assert merge_frame(con, "venues", df2, ["id"], delete_missing=True) == {"INSERT": 1, "UPDATE": 1, "DELETE": 1}
+    rows = con.execute("SELECT id, name FROM venues ORDER BY id").fetchall()
+    assert rows == [(1, "a"), (2, "B"), (4, "d")]
+
+
+def test_merge_table_adds_new_columns():
+    con = connect_lakehouse()
+    merge_frame(con, "t", pd.DataFrame({"id": [1], "a": [1]}), ["id"])
+    assert merge_frame(con, "t", pd.DataFrame({"id": [1], "a": [1], "b": ["x"]}), ["id"]) == {"UPDATE": 1}
+    assert con.execute("SELECT b FROM t").fetchall() == [("x",)]
+
+
+def test_load_new_parts_hashes_only_new_or_changed(tmp_path):
+    part_dir = tmp_path / "parts"
+    part_dir.mkdir()
+    pd.DataFrame({"k": [1, 2], "v": [1, 2]}).to_parquet(part_dir / "part-1.parquet")
+    hashed = []
+
+    def file_hash(path):
+        hashed.append(os.path.basename(path))
+        return file_sha256(path)
+
+    con = connect_lakehouse(str(tmp_path / "lake.duckdb"))
+    assert load_new_parts(con, "t", str(part_dir), ["k"], file_hash) == 1
+    assert load_new_parts(con, "t", str(part_dir), ["k"], file_hash) == 0
+    assert hashed == ["part-1.parquet"]
+
+    # Part disentuh tanpa ubah isi -> di-hash ulang sekali, tidak di-MERGE
+    os.utime(part_dir / "part-1.parquet", ns=(1, 1))
+    assert load_new_parts(con, "t", str(part_dir), ["k"], file_hash) == 0
+    assert load_new_parts(con, "t", str(part_dir), ["k"], file_hash) == 0
+    assert hashed == ["part-1.parquet"] * 2
+
+    pd.DataFrame({"k": [2, 3], "v": [20, 3]}).to_parquet(part_dir / "part-2.parquet")
+    assert load_new_parts(con, "t", str(part_dir), ["k"], file_hash) == 1
+    assert hashed[-1] == "part-2.parquet"
+    assert con.execute("SELECT k, v FROM t ORDER BY k").fetchall() == [(1, 1), (2, 20), (3, 3)]
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+import pytz
+
+import elt_pipeline
+from calendar_dim import TIME_PLANS, plan_label, resolve_plan_time
+from lakehouse import connect_lakehouse
+from time_rules import DAYS, compile_rules
+
+TZ = pytz.timezone("Asia/Makassar")
+
+
+def at(hour, minute, day=17):
+    return TZ.localize(datetime(2026, 10, day, hour, minute))
+
+
+@pytest.mark.parametrize("now, expected", [
+    (at(18, 59), at(19, 0)),
+    (at(19, 0), at(19, 0)),
+    (at(19, 1), at(19, 1)),
+    (at(23, 30), at(23, 30)),
+    (at(0, 15), at(19, 0)),
+])
+def test_nanti_malam_never_past_and_never_tomorrow(now, expected):
+    assert resolve_plan_time("Nanti Malam (19:00)", now) == expected
+
+
+def test_plan_options_stay_distinct_after_evening_starts():
+    for now in [at(18, 59), at(19, 1)]:
+        times = [resolve_plan_time(plan, now) for plan in TIME_PLANS[1:]]
+        assert len(set(times)) == 3
+    assert resolve_plan_time("Besok Malam (19:00)", at(19, 1)) == at(19, 0, day=18)
+    assert resolve_plan_time("Besok Pagi (08:00)", at(19, 1)) == at(8, 0, day=18)
+    assert plan_label("Nanti Malam (19:00)", at(18, 59)) == "Nanti Malam (19:00)"
+    assert plan_label("Nanti Malam (19:00)", at(19, 1)) == "Malam Ini (sekarang)"
+
+
+def build_cube(df_feat, df_loc, rules_df, label_map=None):
+    con = connect_lakehouse()
+    elt_pipeline.load_dimension_tables(con)
+    con.execute("CREATE TABLE gold_features AS SELECT * FROM df_feat")
+    con.execute("CREATE TABLE gold_locations AS SELECT * FROM df_loc")
+    elt_pipeline.load_rule_slots(con, compile_rules(rules_df, label_map or elt_pipeline.HABITAT_CATEGORY_MAP))
+    elt_pipeline.build_final_recs(con, max_rank=2, fallback_top_n=2)
+    return con.execute("SELECT * FROM final_recs").df()
+
+
+def week_rules():
+    """Pagi (0-12) hanya taman, malam (12-24) hanya cafe, tiap hari"""
+    rows = []
+    for day in DAYS:
+        rows.append({"day_category": day, "start_hour": 0, "end_hour": 12, "phase_name": "pagi", "rekomendasi_prioritas": "Taman Kota"})
+        rows.append({"day_category": day, "start_hour": 12, "end_hour": 24, "phase_name": "malam", "rekomendasi_prioritas": "Cafe"})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def cube():
+    df_feat = pd.DataFrame({"archetype": ["Sporty", "Social Butterfly"], "jumlah": [5, 3]})
+    df_loc = pd.DataFrame({
+        "nama_tempat": ["Taman A", "Taman B", "Kafe A", "Kafe B", "Kafe C", "Gym A"],
+        "kategori": ["park", "park", "cafe", "cafe", "cafe", "gym"],
+        "lat": [0.0] * 6, "lon": [0.0] * 6, "score": [5, 4, 9, 8, 7, 6],
+    })
+    return build_cube(df_feat, df_loc, week_rules())
+
+
+def test_cube_covers_every_slot_and_weather(cube):
+    sporty = cube[cube["archetype"] == "Sporty"]
+    # Sporty: park diizinkan pagi saja (gym tidak ada di rule) -> 12 jam x 7 hari x 2 kelas cuaca x 2 tempat
+    assert set(sporty["kategori"]) == {"park"}
+    assert len(sporty) == 7 * 12 * len(elt_pipeline.WEATHER_CLASSES) * 2
+    assert sporty["hour"].max() == 11
+
+
+def test_cube_respects_slot_categories_and_rank(cube):
+    social = cube[(cube["archetype"] == "Social Butterfly") & (cube["day_category"] == "Senin") & (cube["hour"] == 19)]
+    clear = social[social["weather_class"] == "Clear"].sort_values("rank_urutan")
+    assert clear["nama_tempat"].tolist() == ["Kafe A", "Kafe B"]
+    assert social["metode"].eq("Personalized").all()
+    # Cafe indoor -> pesan hujan tetap "mendukung"; taman saat hujan dapat peringatan
+    rain_park = cube[(cube["weather_class"] == "Rain") & (cube["kategori"] == "park")]
+    assert rain_park["pesan_strategi"].str.contains("payung").all()
+    assert not social["pesan_strategi"].str.contains("payung").any()
+
+
+def test_cube_fallback_for_archetypes_without_survey(cube):
+    techie = cube[cube["archetype"] == "Techie"]
+    assert techie["metode"].eq("Global Top (Fallback)").all()
+    # Fallback = tempat skor tertinggi global, sama untuk semua slot
+    assert set(techie["nama_tempat"]) == {"Kafe A", "Kafe B"}
+    assert techie.groupby(["day_category", "hour", "weather_class"]).size().eq(2).all()
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from elt_pipeline import ARCHETYPE_CATEGORY_MAP, archetype_category_frame
+from spatial import (
+    GRID_CELL_DEG, METERS_PER_DEG, SpatialIndex, _connected_components, allowed_categories, dedup_venues, haversine_m, recommend_near,
+)
+from time_rules import DAYS, compile_rules
+
+# Titik acuan tepat di sisi timur batas sel grid -> lokasi di sel sebelah barat juga harus ikut terambil
+LAT, LON = -3.3150, 114.59 + 1e-7
+
+
+def offset(north_m, east_m):
+    return LAT + north_m / METERS_PER_DEG, LON + east_m / (METERS_PER_DEG * np.cos(np.radians(LAT)))
+
+
+@pytest.fixture
+def locations():
+    places = [("Kafe Barat", "cafe", 0, -300), ("Taman Utara", "park", 800, 0), ("Kafe Dekat", "cafe", 50, 50),
+              ("Masjid Jauh", "mosque", 0, 5000), ("Perpus Selatan", "library", -1500, 0), ("Gym Timur", "gym", 0, 1200)]
+    rows = [{"nama_tempat": n, "kategori": k, "lat": offset(dn, de)[0], "lon": offset(dn, de)[1], "score": 1} for n, k, dn, de in places]
+    return pd.DataFrame(rows)
+
+
+def test_query_radius_matches_brute_force_across_cells(locations):
+    index = SpatialIndex(locations)
+    assert index.df["grid_cell"].is_monotonic_increasing
+    idx, dist = index.query_radius(LAT, LON, 1000)
+    assert sorted(index.df["nama_tempat"].iloc[idx]) == ["Kafe Barat", "Kafe Dekat", "Taman Utara"]
+    brute = haversine_m(LAT, LON, index.df["lat"].to_numpy(), index.df["lon"].to_numpy())
+    np.testing.assert_allclose(np.sort(dist), np.sort(brute[brute <= 1000]))
+    # Kafe Barat ada di sel lain dari titik acuan, tetap masuk lewat sel tetangga
+    assert index._cells[index.df["nama_tempat"] == "Kafe Barat"][0] != index._cells[index.df["nama_tempat"] == "Kafe Dekat"][0]
+
+
+def test_nearest_orders_by_distance_and_filters_categories(locations):
+    index = SpatialIndex(locations)
+    near = index.nearest(LAT, LON, k=3, radius_m=2000)
+    assert near["nama_tempat"].tolist() == ["Kafe Dekat", "Kafe Barat", "Taman Utara"]
+    assert near["jarak_m"].is_monotonic_increasing
+    cafes = index.nearest(LAT, LON, k=5, radius_m=2000, categories={"cafe", "library"})
+    assert cafes["nama_tempat"].tolist() == ["Kafe Dekat", "Kafe Barat", "Perpus Selatan"]
+    assert index.nearest(LAT, LON, radius_m=2000, categories=set()).empty
+    assert index.nearest(-80.0, 10.0).empty
+
+
+def test_grid_cell_from_pipeline_is_reused():
+    df = pd.DataFrame({"nama_tempat": ["A", "B"], "kategori": ["cafe", "cafe"], "lat": [0.0, GRID_CELL_DEG * 5], "lon": [0.0, 0.0]})
+    index = SpatialIndex(df)
+    assert index.nearest(GRID_CELL_DEG * 5, 0.0, k=1)["nama_tempat"].tolist() == ["B"]
+
+
+def week_rules():
+    """Pagi (0-12) taman & masjid, malam (12-24) cafe & perpustakaan"""
+    rows = []
+    for day in DAYS:
+        rows.append({"day_category": day, "start_hour": 0, "end_hour": 12, "phase_name": "pagi", "rekomendasi_prioritas": "Taman Kota, Tempat Ibadah"})
+        rows.append({"day_category": day, "start_hour": 12, "end_hour": 24, "phase_name": "malam", "rekomendasi_prioritas": "Cafe, Perpustakaan"})
+    return pd.DataFrame(rows)
+
+
+def arch_categories():
+    """Mapping seperti yang dibangun dashboard dari gold_archetype_category"""
+    return archetype_category_frame().groupby("archetype")["kategori"].agg(set).to_dict()
+
+
+def test_archetype_category_frame_round_trips_map():
+    mapping = arch_categories()
+    assert mapping == {arch: set(cats) for arch, cats in ARCHETYPE_CATEGORY_MAP.items()}
+
+
+def test_allowed_categories_is_rule_slot_intersect_archetype():
+    label_map = {"taman kota": ["park", "garden"], "tempat ibadah": ["mosque"], "cafe": ["cafe"], "perpustakaan": ["library"]}
+    rules = compile_rules(week_rules(), label_map)
+    mapping = arch_categories()
+    assert allowed_categories(rules, mapping, "Intellectual", "Senin", 19) == {"library"}
+    assert allowed_categories(rules, mapping, "Healing", "Senin", 7) == {"park", "garden"}
+    # Slot tidak mengizinkan kategori archetype ini -> kosong, bukan jatuh ke kategori lain
+    assert allowed_categories(rules, mapping, "Sporty", "Senin", 19) == set()
+    assert allowed_categories(rules, mapping, "Tidak Ada", "Senin", 19) == set()
+
+
+def test_recommend_near_uses_allowed_categories_not_top_recs(locations):
+    label_map = {"taman kota": ["park"], "tempat ibadah": ["mosque"], "cafe": ["cafe"], "perpustakaan": ["library"]}
+    rules = compile_rules(week_rules(), label_map)
+    index = SpatialIndex(locations)
+    # Intellectual malam: hanya library yang boleh, walau kafe lebih dekat
+    categories = allowed_categories(rules, arch_categories(), "Intellectual", "Sabtu", 20)
+    near = recommend_near(index, categories, LAT, LON, k=5, radius_m=2000)
+    assert near["nama_tempat"].tolist() == ["Perpus Selatan"]
+    # Social Butterfly malam: semua cafe dalam radius, terurut jarak
+    categories = allowed_categories(rules, arch_categories(), "Social Butterfly", "Sabtu", 20)
+    assert recommend_near(index, categories, LAT, LON, k=5, radius_m=2000)["nama_tempat"].tolist() == ["Kafe Dekat", "Kafe Barat"]
+
+
+def test_connected_components_chains_and_singletons():
+    # 0-1-2 berantai (tidak langsung 0-2), 3 sendiri, 4-5
+    labels = _connected_components(6, np.array([1, 0, 4]), np.array([2, 1, 5]))
+    assert labels.tolist() == [0, 0, 0, 3, 4, 4]
+    assert _connected_components(3, np.empty(0, dtype="int64"), np.empty(0, dtype="int64")).tolist() == [0, 1, 2]
+
+
+def test_connected_components_long_chain_matches_union_find():
+    rng = np.random.default_rng(7)
+    n = 500
+    i, j = rng.integers(0, n, 300), rng.integers(0, n, 300)
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in zip(i, j):
+        ra, rb = find(a), find(b)
+        if ra != rb: parent[max(ra, rb)] = min(ra, rb)
+    expected = [find(x) for x in range(n)]
+    assert _connected_components(n, i, j).tolist() == expected
+
+
+def test_dedup_venues_merges_same_name_within_radius():
+    lat0, lon0 = -3.3194, 114.5908
+    df = pd.DataFrame([
+        {"nama_tempat": "Kopi Kenangan", "kategori": "cafe", "lat": lat0, "lon": lon0},
+        {"nama_tempat": "kopi kenangan!", "kategori": "cafe", "lat": lat0 + 60 / METERS_PER_DEG, "lon": lon0},
+        # Berantai: 60 m dari elemen kedua, 120 m dari yang pertama -> tetap satu venue
+        {"nama_tempat": "Kopi  Kenangan", "kategori": "restaurant", "lat": lat0 + 120 / METERS_PER_DEG, "lon": lon0},
+        # Nama sama tapi 1 km jauhnya -> cabang lain
+        {"nama_tempat": "Kopi Kenangan", "kategori": "cafe", "lat": lat0 + 1000 / METERS_PER_DEG, "lon": lon0},
+        # Dekat tapi nama beda -> venue lain
+        {"nama_tempat": "Taman Kamboja", "kategori": "park", "lat": lat0, "lon": lon0 + 1e-5},
+    ])
+    venues = dedup_venues(df, radius_m=100).sort_values(["nama_tempat", "lat"]).reset_index(drop=True)
+    assert venues["nama_tempat"].tolist() == ["Kopi Kenangan", "Kopi Kenangan", "Taman Kamboja"]
+    assert venues["score"].tolist() == [3, 1, 1]
+    # Kategori & nama kanonik = yang terbanyak di cluster; koordinat = rata-rata
+    assert venues.loc[0, "kategori"] == "cafe"
+    assert venues.loc[0, "lat"] == pytest.approx(lat0 + 60 / METERS_PER_DEG)
+
+
+def test_dedup_venues_empty():
+    out = dedup_venues(pd.DataFrame(columns=["nama_tempat", "kategori", "lat", "lon"]))
+    assert out.empty and out.columns.tolist() == ["kategori", "nama_tempat", "lat", "lon", "score"]
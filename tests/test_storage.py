@@ -0,0 +1,81 @@
+import io
+import json
+
+import pytest
+
+from storage import (
+    ArtifactWriter, GOLD_POINTER_OBJECT, LockLost, ObjectLock, commit_gold_pointer, load_gold_pointer,
+)
+
+BUCKET = "datalake"
+
+
+def test_object_lock_two_owners(store):
+    a = ObjectLock(store, BUCKET, settle=0, owner="replica-a")
+    b = ObjectLock(store, BUCKET, settle=0, owner="replica-b")
+    assert a.acquire()
+    try:
+        assert not b.acquire()
+        assert b.holder["owner"] == "replica-a"
+        a.ensure()
+    finally:
+        a.release()
+    assert b.acquire()
+    b.release()
+    assert store.objects == {}
+
+
+def test_object_lock_takeover_is_detected(store):
+    a = ObjectLock(store, BUCKET, settle=0, owner="replica-a")
+    b = ObjectLock(store, BUCKET, settle=0, owner="replica-b")
+    assert a.acquire()
+    # Replica B menulis lock-nya setelah read-back A (celah settle) -> A harus tahu sebelum menulis state bersama
+    b.token = "token-b"
+    b._write()
+    with pytest.raises(LockLost, match="replica-b"):
+        a.ensure()
+    assert a.lost
+    a.release()
+    # Lock milik B tidak ikut dihapus saat A melepas
+    assert json.loads(store.objects[b.object_name])["owner"] == "replica-b"
+
+
+def test_object_lock_expired_lease_can_be_taken(store):
+    stale = {"owner": "replica-mati", "token": "x", "expires_at": 0}
+    data = json.dumps(stale).encode()
+    store.put_object(BUCKET, "_locks/pipeline.lock", io.BytesIO(data), len(data))
+    lock = ObjectLock(store, BUCKET, settle=0, owner="replica-a")
+    assert lock.acquire()
+    lock.release()
+
+
+def test_artifact_writer_then_pointer_commit(store):
+    writer = ArtifactWriter(store, BUCKET, max_workers=4)
+    objects = {f"artefak{i}": f"gold/v/v1/artefak{i}.parquet" for i in range(5)}
+    for obj in objects.values(): writer.put_bytes(obj, obj.encode())
+    results = writer.flush()
+    writer.close()
+    assert results == {obj: True for obj in objects.values()}
+    assert [s["ok"] for s in writer.upload_stats] == [True] * 5
+    # Pointer belum ada sebelum di-commit -> pembaca tidak melihat set yang setengah jadi
+    assert load_gold_pointer(store, BUCKET) == {"objects": {}}
+
+    commit_gold_pointer(store, BUCKET, "v1", objects)
+    pointer = load_gold_pointer(store, BUCKET)
+    assert pointer["version"] == "v1" and pointer["objects"] == objects
+    assert GOLD_POINTER_OBJECT in store.objects
+
+
+def test_artifact_writer_flush_reports_failures(store, monkeypatch):
+    put_object = store.put_object
+
+    def flaky_put(bucket, name, data, length, **kwargs):
+        if name == "gold/v/v1/rusak.parquet": raise OSError("koneksi putus")
+        return put_object(bucket, name, data, length, **kwargs)
+
+    monkeypatch.setattr(store, "put_object", flaky_put)
+    writer = ArtifactWriter(store, BUCKET)
+    writer.put_bytes("gold/v/v1/ok.parquet", b"ok")
+    writer.put_bytes("gold/v/v1/rusak.parquet", b"rusak")
+    assert writer.flush() == {"gold/v/v1/ok.parquet": True, "gold/v/v1/rusak.parquet": False}
+    writer.close()
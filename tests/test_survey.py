@@ -0,0 +1,188 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import elt_pipeline
+from elt_pipeline import (
+    SURVEY_FACT_SCHEMA, SURVEY_TRAIT_FOLDER, SURVEY_TRAIT_SCHEMA, build_survey_parts, local_part_dir, task_gold_traits,
+)
+
+COLUMNS = ["timestamp", "gender", "intel_fisik_cowo", "sporty_fisik_cowo", "intel_fisik_cewe", "sporty_fisik_cewe",
+           "intel_lokasi", "sporty_lokasi"]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Folder kerja survey terpisah per test (part, dimensi, akumulasi trait)"""
+    monkeypatch.setattr(elt_pipeline, "TEMP_DIR", str(tmp_path))
+    for name in ["TRAIT_MATRIX_PATH", "TRAIT_COUNTS_PATH", "TRAIT_COUNTS_STATE"]:
+        monkeypatch.setattr(elt_pipeline, name, str(tmp_path / os.path.basename(getattr(elt_pipeline, name))))
+    return tmp_path
+
+
+def write_sheet(path, rows):
+    """Sheet seperti export Google Sheets: tiap baris dibungkus quote, field berisi koma di-quote ganda"""
+    lines = [",".join(COLUMNS)]
+    for row in rows:
+        fields = [row.get(c, "") for c in COLUMNS]
+        line = ",".join(f'""{f}""' if "," in f else f for f in fields)
+        lines.append(f'"{line}"')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def respon(ts, intel="Kaca mata, Tas Laptop", **extra):
+    return {"timestamp": ts, "gender": "Laki-laki", "intel_fisik_cowo": intel, "intel_lokasi": "Perpustakaan", **extra}
+
+
+def run(sheet, state=None):
+    """Satu run silver survey + state yang akan disimpan commit_survey_parts"""
+    state = state or {"watermark": None, "next_id": 0, "seen": None}
+    result = build_survey_parts(sheet, state["watermark"], state["next_id"], state["seen"])
+    new_state = {"watermark": result.get("new_watermark", state["watermark"]), "next_id": result.get("next_id", state["next_id"]),
+                 "seen": {"boundary_rows": result.get("boundary_rows", []), "undated_rows": result.get("undated_rows", [])}}
+    return result, new_state
+
+
+def test_watermark_includes_same_second_rows_once(workdir):
+    rows = [respon("12/17/2025 11:28:38"), respon("12/17/2025 11:30:00", intel="Batik"), respon("bukan tanggal", intel="Kemeja")]
+    sheet = write_sheet(workdir / "sheet.csv", rows)
+    result, state = run(sheet)
+    assert result["rows_in"] == 3
+    assert state["watermark"] == "2025-12-17T11:30:00" and len(state["seen"]["boundary_rows"]) == 1
+    assert len(state["seen"]["undated_rows"]) == 1
+
+    # Sheet sama -> tidak ada yang masuk dua kali (termasuk baris di detik watermark & baris tanpa timestamp)
+    result, state = run(sheet, state)
+    assert result["rows_in"] == 0
+
+    # Respon baru di detik watermark (muncul setelah fetch sebelumnya) + baris tanpa timestamp baru
+    rows += [respon("12/17/2025 11:30:00", intel="Tas Ransel"), respon("", intel="Heels")]
+    sheet = write_sheet(workdir / "sheet.csv", rows)
+    result, state = run(sheet, state)
+    assert result["rows_in"] == 2
+    assert result["part_name"] == "part-20251217113000-3.parquet"
+    assert len(state["seen"]["boundary_rows"]) == 2 and len(state["seen"]["undated_rows"]) == 2
+    assert run(sheet, state)[0]["rows_in"] == 0
+
+    facts = pq.read_table(os.path.join(local_part_dir(elt_pipeline.SURVEY_SILVER_FOLDER), result["part_name"]),
+                          schema=SURVEY_FACT_SCHEMA).to_pandas()
+    assert sorted(facts["response_id"].unique()) == [3, 4]
+
+
+def test_watermark_legacy_state_does_not_duplicate(workdir):
+    rows = [respon("12/17/2025 11:28:38"), respon("12/17/2025 11:30:00"), respon("rusak")]
+    sheet = write_sheet(workdir / "sheet.csv", rows)
+    # State format lama: watermark tanpa hash baris -> baris s/d detik watermark & tanpa timestamp dianggap sudah masuk
+    legacy = {"watermark": "2025-12-17T11:30:00", "next_id": 3, "seen": {"boundary_rows": None, "undated_rows": None}}
+    result, state = run(sheet, legacy)
+    assert result["rows_in"] == 0
+
+    rows.append(respon("12/17/2025 11:31:00"))
+    result, state = run(write_sheet(workdir / "sheet.csv", rows), legacy)
+    assert result["rows_in"] == 1 and result["next_id"] == 4
+    assert state["watermark"] == "2025-12-17T11:31:00"
+
+
+def test_gold_traits_reads_only_new_parts(workdir, monkeypatch):
+    sheet = write_sheet(workdir / "sheet.csv", [respon("12/17/2025 11:28:38"), respon("12/17/2025 11:29:00", intel="Batik")])
+    _, state = run(sheet)
+    first = task_gold_traits({})
+    assert first["rows_in"] == 3
+
+    read = []
+    read_table = pq.read_table
+
+    def spy(source, *args, **kwargs):
+        if isinstance(source, str) and "/survey_traits/" in source: read.append(os.path.basename(source))
+        return read_table(source, *args, **kwargs)
+
+    monkeypatch.setattr(pq, "read_table", spy)
+    sheet = write_sheet(workdir / "sheet.csv", [respon("12/17/2025 11:28:38"), respon("12/17/2025 11:29:00", intel="Batik"),
+                                                respon("12/17/2025 11:40:00", intel="Batik")])
+    result, _ = run(sheet, state)
+    second = task_gold_traits({})
+    assert read == [result["part_name"]] and second["rows_in"] == 1
+
+    # Akumulasi sama dengan membangun dari semua part sekaligus
+    incremental = pd.read_parquet(elt_pipeline.TRAIT_MATRIX_PATH)
+    os.remove(elt_pipeline.TRAIT_COUNTS_STATE)
+    assert task_gold_traits({})["rows_in"] == 4
+    pd.testing.assert_frame_equal(incremental, pd.read_parquet(elt_pipeline.TRAIT_MATRIX_PATH))
+
+
+def test_gold_traits_rebuilds_when_part_changes(workdir):
+    sheet = write_sheet(workdir / "sheet.csv", [respon("12/17/2025 11:28:38")])
+    run(sheet)
+    assert task_gold_traits({})["rows_in"] == 2
+    # Part ditimpa (run crash diulang / full refresh) -> akumulasi dibangun ulang, bukan dijumlah dua kali
+    part = os.path.join(local_part_dir(SURVEY_TRAIT_FOLDER), "part-initial-0.parquet")
+    table = pq.read_table(part, schema=SURVEY_TRAIT_SCHEMA)
+    pq.write_table(table.slice(0, 1), part)
+    assert task_gold_traits({})["rows_in"] == 1
+
+
+def test_unpivot_survey_one_row_per_response_archetype():
+    df_raw = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2025-12-17 11:28:38", "2025-12-17 11:30:00"]), "gender": ["Laki-laki", "Perempuan"],
+        "intel_fisik_cowo": ["Kaca mata", None], "sporty_fisik_cowo": ["Baju Jersey", "Tas Ransel"],
+        "intel_lokasi": ["Perpustakaan", None], "sporty_lokasi": ["Gym", "Taman Kota"],
+    })
+    long = elt_pipeline.unpivot_survey(df_raw, first_response_id=10)
+    intel, sporty = elt_pipeline.SURVEY_ARCHETYPES.index("Intellectual"), elt_pipeline.SURVEY_ARCHETYPES.index("Sporty")
+    # Kolom archetype yang tidak ada di sheet (NaN) & sel kosong tidak jadi baris
+    assert sorted(zip(long["response_id"], long["archetype_id"], long["ciri_fisik"])) == [
+        (10, intel, "Kaca mata"), (10, sporty, "Baju Jersey"), (11, sporty, "Tas Ransel"),
+    ]
+    assert long.set_index(["response_id", "archetype_id"]).loc[(11, sporty), "habitat"] == "Taman Kota"
+    assert long.set_index("response_id").loc[11, "gender"] == "Perempuan"
+
+
+def test_explode_multi_value_keeps_commas_inside_parentheses():
+    long = pd.DataFrame({"response_id": [1, 2], "archetype_id": [0, 0], "ciri_fisik": [
+        "Batik, Aksesoris Etnik (Gelang Manik, Cincin Batu),  Tote Bag", "Batik,Batik, "]})
+    mapping = {"Tote Bag": 0}
+    ex = elt_pipeline.explode_multi_value(long, "ciri_fisik", "trait_id", mapping)
+    assert mapping == {"Tote Bag": 0, "Batik": 1, "Aksesoris Etnik (Gelang Manik, Cincin Batu)": 2}
+    # Nilai kosong dibuang, duplikat per respon-archetype dihitung sekali
+    assert sorted(map(tuple, ex.to_numpy().tolist())) == [(1, 0, 0), (1, 0, 1), (1, 0, 2), (2, 0, 1)]
+
+
+def test_survey_dimension_ids_stable_across_runs(workdir):
+    sheet = write_sheet(workdir / "sheet.csv", [respon("12/17/2025 11:28:38", intel="Kaca mata, Tas Laptop")])
+    _, state = run(sheet)
+    first = elt_pipeline.load_dimension("trait")
+    sheet = write_sheet(workdir / "sheet.csv", [respon("12/17/2025 11:28:38", intel="Kaca mata, Tas Laptop"),
+                                                respon("12/17/2025 11:29:00", intel="Batik, Kaca mata")])
+    run(sheet, state)
+    second = elt_pipeline.load_dimension("trait")
+    assert {k: second[k] for k in first} == first and second["Batik"] == len(first)
+
+
+def test_fisik_cewe_feeds_traits_only(workdir):
+    rows = [
+        respon("12/17/2025 11:28:38", intel="Kaca mata", intel_fisik_cewe="Kaca mata, Totebag"),
+        # Hanya kolom cewe terisi -> trait masuk, tapi bukan baris fakta/habitat baru
+        {"timestamp": "12/17/2025 11:29:00", "gender": "Perempuan", "sporty_fisik_cewe": "Legging", "sporty_lokasi": "Gym"},
+    ]
+    result, _ = run(write_sheet(workdir / "sheet.csv", rows))
+    part = result["part_name"]
+    read = lambda folder, schema: pq.read_table(os.path.join(local_part_dir(folder), part), schema=schema).to_pandas()
+    facts = read(elt_pipeline.SURVEY_SILVER_FOLDER, SURVEY_FACT_SCHEMA)
+    traits = read(SURVEY_TRAIT_FOLDER, SURVEY_TRAIT_SCHEMA)
+    intel, sporty = elt_pipeline.SURVEY_ARCHETYPES.index("Intellectual"), elt_pipeline.SURVEY_ARCHETYPES.index("Sporty")
+
+    assert list(zip(facts["response_id"], facts["archetype_id"])) == [(0, intel)] and result["rows_out"] == 1
+    habitat = read(elt_pipeline.SURVEY_HABITAT_FOLDER, elt_pipeline.SURVEY_HABITAT_SCHEMA)
+    assert habitat["response_id"].tolist() == [0]
+
+    names = {v: k for k, v in elt_pipeline.load_dimension("trait").items()}
+    # Kolom cowo & cewe sama-sama menyumbang trait; ciri yang disebut di keduanya dihitung sekali
+    assert sorted((r, a, names[t]) for r, a, t in traits.itertuples(index=False)) == [
+        (0, intel, "Kaca mata"), (0, intel, "Totebag"), (1, sporty, "Legging"),
+    ]
+    task_gold_traits({})
+    matrix = pd.read_parquet(elt_pipeline.TRAIT_MATRIX_PATH)
+    assert set(matrix["trait"]) == {"Kaca mata", "Totebag", "Legging"}
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from time_rules import DAYS, RuleValidationError, compile_rules
+
+LABEL_MAP = {"cafe": ["cafe", "restaurant"], "taman kota": ["park"], "kampus": ["university"]}
+
+
+def full_week(overrides=None):
+    """Tiga rule per hari yang menutup 0-24 tanpa celah; overrides {(hari, start): kolom} mengubah satu rule"""
+    rows = []
+    for day in DAYS:
+        for start, end, labels in [(0, 8, "Taman Kota"), (8, 17, "Kampus, Cafe"), (17, 24, '"Cafe"')]:
+            row = {"day_category": day, "start_hour": start, "end_hour": end, "phase_name": f"{day} {start}",
+                   "status_kampus": "-", "status_sosial": "-", "rekomendasi_prioritas": labels}
+            row.update((overrides or {}).get((day, start), {}))
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def test_compile_rules_full_week():
+    rules = compile_rules(full_week(), LABEL_MAP).validate()
+    assert rules.errors == [] and rules.warnings == []
+    assert rules.categories("Senin", 9) == {"university", "cafe", "restaurant"}
+    assert rules.categories("Minggu", 23) == {"cafe", "restaurant"}
+    assert rules.phase("Rabu", 17)["phase_name"] == "Rabu 17"
+
+
+def test_compile_rules_reports_gap():
+    rules = compile_rules(full_week({("Selasa", 8): {"end_hour": 15}}), LABEL_MAP)
+    assert rules.errors == ["Selasa: jam 15-17 tidak tercakup rule"]
+    assert rules.categories("Selasa", 16) == frozenset()
+    with pytest.raises(RuleValidationError):
+        rules.validate()
+
+
+def test_compile_rules_reports_overlap_first_rule_wins():
+    rules = compile_rules(full_week({("Jumat", 17): {"start_hour": 15}}), LABEL_MAP)
+    assert len(rules.errors) == 1
+    assert "Jumat jam 15-17 tumpang tindih" in rules.errors[0]
+    assert rules.phase("Jumat", 15)["phase_name"] == "Jumat 8"
+    assert rules.phase("Jumat", 17)["phase_name"] == "Jumat 17"
+
+
+def test_compile_rules_invalid_rows_and_unmapped_labels():
+    df = full_week({("Kamis", 0): {"rekomendasi_prioritas": "Taman Kota, Pantai"}})
+    df = pd.concat([df, pd.DataFrame([
+        {"day_category": "Libur", "start_hour": 0, "end_hour": 1},
+        {"day_category": "Senin", "start_hour": 20, "end_hour": 18},
+    ])], ignore_index=True)
+    rules = compile_rules(df, LABEL_MAP)
+    assert any("'Libur' tidak dikenal" in e for e in rules.errors)
+    assert any("rentang jam 20-18 tidak valid" in e for e in rules.errors)
+    assert rules.warnings and "pantai" in rules.warnings[0]
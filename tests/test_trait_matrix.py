@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trait_matrix import TraitMatrix, add_trait_counts, build_trait_matrix, count_traits, trait_matrix_from_counts
+
+ARCHETYPES = ["Intellectual", "Sporty", "Techie"]
+TRAITS = {0: "Kaca mata", 1: "Tas Laptop", 2: "Baju Jersey", 3: "Kaos"}
+
+
+def responses(*rows):
+    """(response_id, archetype_id, [trait_id...]) -> df_traits silver"""
+    return pd.DataFrame([(r, a, t) for r, a, ts in rows for t in ts], columns=["response_id", "archetype_id", "trait_id"])
+
+
+@pytest.fixture
+def df_traits():
+    return responses((0, 0, [0, 1, 3]), (1, 0, [0, 0]), (2, 1, [2, 3]), (3, 1, [2]), (4, 2, [1, 3]))
+
+
+def test_build_trait_matrix_tfidf_rows_normalized(df_traits):
+    matrix = build_trait_matrix(df_traits, ARCHETYPES, TRAITS)
+    frame = matrix.to_frame()
+    # Trait dobel di satu respon dihitung sekali
+    assert frame.set_index(["archetype", "trait"]).loc[("Intellectual", "Kaca mata"), "responses"] == 2
+    norms = frame.groupby("archetype")["weight"].apply(lambda w: float(np.sqrt((w ** 2).sum())))
+    assert norms.to_numpy() == pytest.approx([1.0, 1.0, 1.0], abs=1e-6)
+    # Kaos muncul di semua archetype -> bobotnya paling kecil di Sporty
+    sporty = dict(matrix.top_traits("Sporty"))
+    assert sporty["Baju Jersey"] > sporty["Kaos"]
+    assert [a for a, _ in matrix.match(["kaca  MATA", "Tas Laptop"])][:1] == ["Intellectual"]
+    assert matrix.match(["Baju Jersey"]) == [("Sporty", pytest.approx(sporty["Baju Jersey"]))]
+    assert matrix.match(["tidak ada"]) == []
+
+
+def test_trait_counts_accumulate_like_single_build(df_traits):
+    first, second = df_traits[df_traits["response_id"] < 2], df_traits[df_traits["response_id"] >= 2]
+    counts = add_trait_counts(count_traits(first, 3), count_traits(second, 3))
+    incremental = trait_matrix_from_counts(*counts, ARCHETYPES, TRAITS).to_frame()
+    pd.testing.assert_frame_equal(incremental, build_trait_matrix(df_traits, ARCHETYPES, TRAITS).to_frame())
+
+
+def test_from_frame_maps_rows_by_archetype_name(df_traits):
+    frame = build_trait_matrix(df_traits, ARCHETYPES, TRAITS).to_frame()
+    # Dashboard punya urutan archetype sendiri + archetype tanpa baris; nama di luar daftar dibuang
+    dashboard = ["Sporty", "Healing", "Intellectual"]
+    matrix = TraitMatrix.from_frame(frame, dashboard)
+    assert matrix.archetypes == dashboard
+    assert matrix.top_traits("Healing") == []
+    assert matrix.top_traits("Sporty")[0][0] == "Baju Jersey"
+    assert [a for a, _ in matrix.match(["Tas Laptop"])] == ["Intellectual"]
+    assert "Techie" not in matrix.archetypes and len(matrix) == len(frame[frame["archetype"] != "Techie"])
+    assert matrix.trait_names() == ["Baju Jersey", "Kaca mata", "Kaos", "Tas Laptop"]
+
+
+def test_from_parquet_round_trip(df_traits, tmp_path):
+    matrix = build_trait_matrix(df_traits, ARCHETYPES, TRAITS)
+    path = str(tmp_path / "trait_matrix.parquet")
+    matrix.write(path)
+    loaded = TraitMatrix.from_parquet(path, ARCHETYPES)
+    (names, scores), (expected_names, expected_scores) = (zip(*m.match(["Kaos", "Tas Laptop"])) for m in (loaded, matrix))
+    assert names == expected_names and scores == pytest.approx(expected_scores)
+    pd.testing.assert_frame_equal(loaded.to_frame(), matrix.to_frame())
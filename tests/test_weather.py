@@ -0,0 +1,60 @@
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+from weather import DEFAULT_WEATHER, WeatherForecast, hourly_forecast, parse_forecast, weather_class, write_forecast
+
+NOW = pd.Timestamp("2026-10-17 10:20", tz="UTC")
+
+
+def steps(*rows):
+    """Langkah forecast: (jam UTC hari NOW, main, temp)"""
+    return pd.DataFrame({
+        "time": [NOW.floor("D") + pd.Timedelta(hours=h) for h, _, _ in rows], "main": [m for _, m, _ in rows],
+        "description": [m.lower() for _, m, _ in rows], "temp": [float(t) for _, _, t in rows],
+    })
+
+
+def test_hourly_forecast_uses_nearest_step_within_tolerance():
+    df = hourly_forecast(steps((9, "Rain", 26), (12, "Clear", 31), (15, "Clouds", 30)), "banjarmasin", now=NOW, hours=12)
+    assert df["time"].iloc[0] == pd.Timestamp("2026-10-17 10:00", tz="UTC") and len(df) == 12
+    by_hour = df.set_index(df["time"].dt.hour)
+    # 10:00 lebih dekat ke langkah 09:00, 11:00 ke 12:00
+    assert by_hour.loc[10, "main"] == "Rain" and by_hour.loc[10, "weather_class"] == "Rain"
+    assert by_hour.loc[11, "main"] == "Clear" and by_hour.loc[11, "temp"] == 31.0
+    # 18:00 = 3 jam dari langkah terakhir (masih dalam toleransi), 19:00 ke atas -> default
+    assert by_hour.loc[18, "main"] == "Clouds"
+    assert by_hour.loc[19, "main"] == DEFAULT_WEATHER["main"] and by_hour.loc[21, "temp"] == DEFAULT_WEATHER["temp"]
+    assert (df["city"] == "banjarmasin").all()
+
+
+def test_hourly_forecast_stale_or_empty_falls_back_to_default():
+    stale = steps((0, "Rain", 25)).assign(time=lambda d: d["time"] - pd.Timedelta(days=2))
+    for source in [stale, None, steps()]:
+        df = hourly_forecast(source, "banjarmasin", now=NOW, hours=6)
+        assert (df["main"] == DEFAULT_WEATHER["main"]).all() and (df["weather_class"] == "Clear").all()
+        assert (df["description"] == DEFAULT_WEATHER["description"]).all()
+
+
+def test_forecast_round_trip_and_lookup_in_city_timezone(tmp_path):
+    raw = {"list": [
+        {"dt": int((NOW.floor("D") + pd.Timedelta(hours=h)).timestamp()), "main": {"temp": t},
+         "weather": [{"main": m, "description": m.lower()}]}
+        for h, m, t in [(15, "Thunderstorm", 27), (12, "Light Rain", 28)]
+    ]}
+    path = tmp_path / "forecast.json"
+    path.write_text(json.dumps(raw), encoding="utf-8")
+    parsed = parse_forecast(str(path))
+    assert parsed["main"].tolist() == ["Light Rain", "Thunderstorm"]
+
+    out = str(tmp_path / "forecast.parquet")
+    write_forecast(hourly_forecast(parsed, "banjarmasin", now=NOW, hours=12), out)
+    forecast = WeatherForecast.from_parquet(out)
+    # 20:40 WITA = 12:40 UTC -> jam 12 UTC
+    when = pytz.timezone("Asia/Makassar").localize(datetime(2026, 10, 17, 20, 40))
+    assert forecast.at("banjarmasin", when)["weather_class"] == "Rain"
+    assert forecast.at("banjarmasin", when)["temp"] == 28.0
+    assert forecast.at("martapura", when) is None
+    assert weather_class(None) == "Clear"
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- RULE WAKTU TERKOMPILASI ---
+# social_time_rules.csv dikompilasi sekali per perubahan jadi grid padat 7x24: tiap sel berisi id set kategori
+# teknis (+ id fase). Celah jam, tumpang tindih & rentang tidak valid ketahuan saat build, bukan diam-diam jadi
+# rekomendasi kosong. Pipeline & dashboard cukup lookup grid[hari, jam] tanpa SQL / parsing string.
+DAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+HOURS = 24
+NO_RULE = -1
+PHASE_COLUMNS = ['phase_name', 'status_kampus', 'status_sosial', 'rekomendasi_prioritas']
+
+RULE_TABLE_SCHEMA = pa.schema([
+    ("day_category", pa.string()), ("hour", pa.int8()), ("set_id", pa.int16()), ("phase_id", pa.int16()),
+    ("categories", pa.list_(pa.string())), ("phase_name", pa.string()), ("status_kampus", pa.string()),
+    ("status_sosial", pa.string()), ("rekomendasi_prioritas", pa.string()),
+])
+
+
+class RuleValidationError(ValueError):
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+def split_labels(text):
+    """'"Cafe, Mall, Taman Kota"' -> ['cafe', 'mall', 'taman kota']"""
+    if not isinstance(text, str): return []
+    return [label for label in (part.replace('"', '').strip().lower() for part in text.split(',')) if label]
+
+
+def _hour_ranges(hours):
+    """[0, 1, 2, 5] -> '0-3, 5-6' (jam akhir eksklusif, sama seperti end_hour di CSV)"""
+    ranges = []
+    for h in hours:
+        if ranges and ranges[-1][1] == h: ranges[-1][1] = h + 1
+        else: ranges.append([h, h + 1])
+    return ", ".join(f"{a}-{b}" for a, b in ranges)
+
+
+def compile_rules(df_rules, label_map):
+    """
+    df_rules (kolom social_time_rules.csv, sudah lower_snake) + label_map {label: [kategori]} -> RuleTable.
+    Jam yang tumpang tindih tetap dimiliki rule yang muncul duluan, tapi dicatat sebagai error bersama
+    celah jam, hari tidak dikenal & rentang tidak valid. Label tanpa mapping kategori hanya warning.
+    """
+    set_grid = np.full((len(DAYS), HOURS), NO_RULE, dtype=np.int16)
+    phase_grid = np.full((len(DAYS), HOURS), NO_RULE, dtype=np.int16)
+    set_ids, phases, errors, warnings = {}, [], [], []
+    for i, rule in enumerate(df_rules.to_dict('records')):
+        where = f"baris {i + 2}"
+        day = rule.get('day_category')
+        if day not in DAYS:
+            errors.append(f"{where}: day_category '{day}' tidak dikenal")
+            continue
+        try: start, end = int(rule['start_hour']), int(rule['end_hour'])
+        except (KeyError, TypeError, ValueError):
+            errors.append(f"{where}: start_hour/end_hour bukan angka")
+            continue
+        if not 0 <= start < end <= HOURS:
+            errors.append(f"{where}: rentang jam {start}-{end} tidak valid")
+            continue
+        labels = split_labels(rule.get('rekomendasi_prioritas'))
+        unmapped = [label for label in labels if label not in label_map]
+        if unmapped: warnings.append(f"{where} ({day} {start}-{end}): label tanpa kategori {unmapped}")
+        categories = tuple(sorted({cat for label in labels for cat in label_map.get(label, [])}))
+        set_id = set_ids.setdefault(categories, len(set_ids))
+        phases.append({c: rule.get(c) for c in PHASE_COLUMNS})
+
+        d, hours = DAYS.index(day), np.arange(start, end)
+        taken = phase_grid[d, hours] != NO_RULE
+        if taken.any(): errors.append(f"{where}: {day} jam {_hour_ranges(hours[taken].tolist())} tumpang tindih dengan rule sebelumnya")
+        set_grid[d, hours[~taken]] = set_id
+        phase_grid[d, hours[~taken]] = len(phases) - 1
+    for d, day in enumerate(DAYS):
+        gaps = np.flatnonzero(phase_grid[d] == NO_RULE).tolist()
+        if gaps: errors.append(f"{day}: jam {_hour_ranges(gaps)} tidak tercakup rule")
+    return RuleTable(set_grid, phase_grid, list(set_ids), phases, errors, warnings)
+
+
+class RuleTable:
+    """
+    Grid 7x24 id set kategori + id fase. Lookup O(1) per (day_category, hour):
+
+        rules = RuleTable.from_parquet(path)
+        rules.categories('Senin', 19)   # frozenset kategori teknis
+        rules.phase('Senin', 19)        # {'phase_name': ..., 'status_kampus': ..., ...}
+    """
+    def __init__(self, set_grid, phase_grid, category_sets, phases, errors=(), warnings=()):
+        self.set_grid = np.asarray(set_grid, dtype=np.int16)
+        self.phase_grid = np.asarray(phase_grid, dtype=np.int16)
+        self.category_sets = [frozenset(s) for s in category_sets]
+        self.phases = list(phases)
+        self.errors = list(errors)
+        self.warnings = list(warnings)
+        self._day_index = {day: i for i, day in enumerate(DAYS)}
+
+    def validate(self):
+        if self.errors: raise RuleValidationError(self.errors)
+        return self
+
+    def categories(self, day_category, hour):
+        set_id = self.set_grid[self._day_index[day_category], hour % HOURS]
+        return self.category_sets[set_id] if set_id != NO_RULE else frozenset()
+
+    def phase(self, day_category, hour):
+        phase_id = self.phase_grid[self._day_index[day_category], hour % HOURS]
+        return self.phases[phase_id] if phase_id != NO_RULE else None
+
+    # --- ARTEFAK ---
+    def to_frame(self):
+        """Satu baris per slot yang tercakup rule (<= 168 baris), kolom RULE_TABLE_SCHEMA"""
+        days, hours = np.nonzero(self.phase_grid != NO_RULE)
+        set_ids, phase_ids = self.set_grid[days, hours], self.phase_grid[days, hours]
+        df = pd.DataFrame({
+            'day_category': [DAYS[d] for d in days], 'hour': hours.astype('int8'),
+            'set_id': set_ids, 'phase_id': phase_ids,
+            'categories': [sorted(self.category_sets[s]) for s in set_ids],
+        })
+        for c in PHASE_COLUMNS: df[c] = [self.phases[p].get(c) for p in phase_ids]
+        return df
+
+    def write(self, path):
+        pq.write_table(pa.Table.from_pandas(self.to_frame(), schema=RULE_TABLE_SCHEMA, preserve_index=False), path)
+
+    @classmethod
+    def from_frame(cls, df):
+        n_sets = int(df['set_id'].max()) + 1 if len(df) else 0
+        n_phases = int(df['phase_id'].max()) + 1 if len(df) else 0
+        set_grid = np.full((len(DAYS), HOURS), NO_RULE, dtype=np.int16)
+        phase_grid = np.full((len(DAYS), HOURS), NO_RULE, dtype=np.int16)
+        category_sets, phases = [()] * n_sets, [None] * n_phases
+        for row in df.to_dict('records'):
+            d, h = DAYS.index(row['day_category']), int(row['hour'])
+            set_grid[d, h], phase_grid[d, h] = row['set_id'], row['phase_id']
+            category_sets[row['set_id']] = tuple(row['categories'])
+            phases[row['phase_id']] = {c: row.get(c) for c in PHASE_COLUMNS}
+        return cls(set_grid, phase_grid, category_sets, phases)
+
+    @classmethod
+    def from_parquet(cls, path):
+        return cls.from_frame(pq.read_table(path).to_pandas())
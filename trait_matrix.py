@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- MATRIKS ARCHETYPE x TRAIT ---
+# Semua respon survey (silver survey_traits) dikodekan jadi matriks sparse archetype x trait (CSR: indptr/indices/data).
+# Bobot = TF-IDF: tf = porsi respon archetype yang menyebut trait itu, idf menurunkan trait yang muncul di semua
+# archetype (kaos, tanpa makeup, ...). Baris dinormalisasi L2 -> skor match = cosine antara ciri yang diamati & archetype.
+# Artefak gold cukup baris non-nol (COO terurut archetype, trait) -> CSR dibangun ulang tanpa sort.
+TRAIT_MATRIX_SCHEMA = pa.schema([
+    ("archetype_id", pa.int8()), ("archetype", pa.string()), ("trait_id", pa.int32()), ("trait", pa.string()),
+    ("responses", pa.int32()), ("weight", pa.float32()),
+])
+
+
+def count_traits(df_traits, n_arch):
+    """
+    df_traits (response_id, archetype_id, trait_id) -> (cells, responses): cells = DataFrame (archetype_id, trait_id,
+    responses) terurut, responses = jumlah respon per archetype. Respon tidak pernah dipecah antar part silver ->
+    hasil beberapa part cukup dijumlah (add_trait_counts), tidak perlu membaca ulang part lama.
+    """
+    df_traits = df_traits[['response_id', 'archetype_id', 'trait_id']].drop_duplicates()
+    cells = (df_traits.groupby(['archetype_id', 'trait_id'], sort=True).size().rename('responses').reset_index()
+             .astype({'archetype_id': 'int64', 'trait_id': 'int64', 'responses': 'int64'}))
+    responses = np.bincount(df_traits.drop_duplicates(['response_id', 'archetype_id'])['archetype_id'].to_numpy(dtype=np.int64),
+                            minlength=n_arch)
+    return cells, responses
+
+
+def add_trait_counts(a, b):
+    """Jumlah dua hasil count_traits"""
+    cells = pd.concat([a[0], b[0]], ignore_index=True).groupby(['archetype_id', 'trait_id'], sort=True)['responses'].sum().reset_index()
+    return cells, a[1] + b[1]
+
+
+def build_trait_matrix(df_traits, archetypes, traits):
+    """
+    df_traits (response_id, archetype_id, trait_id) + nama archetype per id + dimensi trait {trait_id: nama}
+    -> TraitMatrix. Dihitung vektor penuh (groupby / bincount), tanpa loop per respon.
+    """
+    return trait_matrix_from_counts(*count_traits(df_traits, len(archetypes)), archetypes, traits)
+
+
+def trait_matrix_from_counts(cells, responses, archetypes, traits):
+    """Hasil count_traits (bisa akumulasi banyak part) -> TraitMatrix TF-IDF"""
+    n_arch = len(archetypes)
+    rows = cells['archetype_id'].to_numpy(dtype=np.int64)
+    indices = cells['trait_id'].to_numpy(dtype=np.int64)
+    counts = cells['responses'].to_numpy(dtype=np.int64)
+    responses = np.asarray(responses, dtype=np.int64)
+    n_traits = int(max(indices.max() + 1 if len(indices) else 0, max(traits, default=-1) + 1))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n_arch))])
+
+    # IDF smooth (+1 supaya trait yang ada di semua archetype tetap berbobot, hanya paling kecil)
+    n_docs = int((responses > 0).sum())
+    idf = np.log((1 + n_docs) / (1 + np.bincount(indices, minlength=n_traits))) + 1
+    data = counts / responses[rows] * idf[indices]
+    norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=n_arch))
+    data = data / norms[rows]
+    return TraitMatrix(indptr, indices, data.astype(np.float32), archetypes, traits, counts)
+
+
+def _norm(name):
+    return " ".join(str(name).split()).lower()
+
+
+class TraitMatrix:
+    """
+    Matriks CSR archetype x trait + inverted index trait -> (archetype, bobot) untuk match per query:
+
+        matrix = TraitMatrix.from_parquet(path, archetypes)
+        matrix.match(['Kaca mata', 'Tas Laptop'])   # [('Intellectual', 0.61), ('Techie', 0.42), ...]
+        matrix.top_traits('Sporty', 5)              # ciri paling khas satu archetype
+
+    Match = cosine query biner vs baris ternormalisasi: hanya kolom trait yang disebut yang dijumlah, jadi
+    biayanya ~ jumlah trait query x archetype (mikrodetik), bukan ukuran matriks.
+    """
+    def __init__(self, indptr, indices, data, archetypes, traits, counts=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = np.asarray(data, dtype=np.float32)
+        self.counts = np.asarray(counts if counts is not None else np.zeros(len(self.indices)), dtype=np.int32)
+        self.archetypes = list(archetypes)
+        self.traits = dict(traits)
+        # Nama persis (input dashboard) langsung ketemu; variasi huruf besar/spasi lewat kunci _norm
+        self._trait_ids = {}
+        for trait_id, name in self.traits.items(): self._trait_ids.setdefault(_norm(name), []).append(trait_id)
+        for trait_id, name in self.traits.items(): self._trait_ids.setdefault(name, self._trait_ids[_norm(name)])
+
+        # Inverted index: trait -> bobot per archetype (tuple sepanjang jumlah archetype, yang kecil) ->
+        # skor query = jumlah kolom per posisi lewat zip/sum (C), tanpa loop Python per sel
+        rows = np.repeat(np.arange(len(self.archetypes)), np.diff(self.indptr))
+        cols = np.unique(self.indices)
+        columns = np.zeros((len(cols), len(self.archetypes)))
+        columns[np.searchsorted(cols, self.indices), rows] = self.data
+        self._columns = dict(zip(cols.tolist(), map(tuple, columns.tolist())))
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def shape(self):
+        return len(self.archetypes), max(self.traits, default=-1) + 1
+
+    def trait_names(self):
+        """Trait yang pernah muncul di survey (pilihan input dashboard), urut abjad"""
+        return sorted({self.traits[t] for t in self._columns if t in self.traits}, key=_norm)
+
+    def trait_ids(self, traits):
+        """Nama (tidak peka huruf besar/spasi) atau id trait -> set id; nama tidak dikenal diabaikan"""
+        ids = set()
+        for t in traits:
+            if isinstance(t, str): ids.update(self._trait_ids.get(t) or self._trait_ids.get(_norm(t), ()))
+            else: ids.add(int(t))
+        return ids
+
+    def scores(self, traits):
+        """Cosine per archetype (list sejajar self.archetypes) untuk ciri yang diamati"""
+        observed = set(traits)
+        columns = [self._columns[t] for t in self.trait_ids(observed) if t in self._columns]
+        if not columns: return [0.0] * len(self.archetypes)
+        # Ciri yang tidak dikenal tetap dihitung di norma query (menurunkan keyakinan, bukan diabaikan)
+        norm = len(observed) ** 0.5
+        return [sum(weights) / norm for weights in zip(*columns)]
+
+    def match(self, traits, top=None):
+        """Archetype terurut skor (hanya skor > 0, seri -> urutan archetype): [(archetype, skor)]"""
+        scores = self.scores(traits)
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:top]
+        return [(self.archetypes[a], scores[a]) for a in ranked if scores[a] > 0]
+
+    def top_traits(self, archetype, n=5):
+        """n trait berbobot terbesar satu archetype: [(trait, bobot)]"""
+        a = self.archetypes.index(archetype)
+        lo, hi = self.indptr[a], self.indptr[a + 1]
+        best = lo + np.argsort(-self.data[lo:hi], kind='stable')[:n]
+        return [(self.traits.get(int(self.indices[i]), str(self.indices[i])), float(self.data[i])) for i in best]
+
+    # --- ARTEFAK ---
+    def to_frame(self):
+        """Satu baris per sel non-nol, kolom TRAIT_MATRIX_SCHEMA (terurut archetype_id, trait_id)"""
+        rows = np.repeat(np.arange(len(self.archetypes)), np.diff(self.indptr))
+        return pd.DataFrame({
+            'archetype_id': rows.astype('int8'), 'archetype': [self.archetypes[a] for a in rows],
+            'trait_id': self.indices, 'trait': [self.traits.get(int(t)) for t in self.indices],
+            'responses': self.counts, 'weight': self.data,
+        })
+
+    def write(self, path):
+        pq.write_table(pa.Table.from_pandas(self.to_frame(), schema=TRAIT_MATRIX_SCHEMA, preserve_index=False), path)
+
+    @classmethod
+    def from_frame(cls, df, archetypes):
+        """
+        Baris dipetakan ke `archetypes` lewat nama (urutan bebas), bukan archetype_id: archetype tanpa baris
+        (belum ada respon / dikecualikan dari match) tetap bernama, nama di luar daftar dibuang.
+        """
+        index = {a: i for i, a in enumerate(archetypes)}
+        df = df.assign(_row=df['archetype'].map(index)).dropna(subset=['_row'])
+        df = df.sort_values(['_row', 'trait_id'], kind='stable')
+        rows = df['_row'].to_numpy(dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(archetypes)))])
+        traits = dict(zip(df['trait_id'].astype(int), df['trait']))
+        return cls(indptr, df['trait_id'].to_numpy(), df['weight'].to_numpy(), archetypes, traits, df['responses'].to_numpy())
+
+    @classmethod
+    def from_parquet(cls, path, archetypes):
+        return cls.from_frame(pq.read_table(path).to_pandas(), archetypes)
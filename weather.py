@@ -0,0 +1,82 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- PRAKIRAAN CUACA PER JAM ---
+# Respon forecast OpenWeather (langkah 3 jam) di-cache di bronze dan hanya di-fetch ulang setelah TTL habis.
+# Di silver diratakan jadi tabel per jam (city, time UTC) -> kelas cuaca kubus final_recs bisa dipilih
+# untuk jam yang direncanakan, bukan hanya cuaca saat pipeline jalan.
+FORECAST_HOURS = int(os.environ.get("WEATHER_FORECAST_HOURS", "48"))
+# Langkah forecast terdekat dipakai maksimal sejauh ini; di luar itu jatuh ke cuaca default
+FORECAST_STEP = pd.Timedelta(hours=3)
+DEFAULT_WEATHER = {"main": "Clouds", "temp": 29.5, "description": "berawan (default)"}
+
+WEATHER_FORECAST_SCHEMA = pa.schema([
+    ("city", pa.string()), ("time", pa.timestamp("s", tz="UTC")), ("main", pa.string()),
+    ("description", pa.string()), ("temp", pa.float64()), ("weather_class", pa.string()),
+])
+
+
+def weather_class(main):
+    """Kelas cuaca di kubus rekomendasi: 'Rain' kalau kondisi mengandung "Rain", selain itu 'Clear'"""
+    return 'Rain' if isinstance(main, str) and "Rain" in main else 'Clear'
+
+
+def parse_forecast(path):
+    """Respon /data/2.5/forecast -> DataFrame (time, main, description, temp) per langkah, terurut waktu"""
+    with open(path, 'r', encoding='utf-8') as f: steps = json.load(f).get("list", [])
+    df = pd.DataFrame({
+        'time': pd.to_datetime([s['dt'] for s in steps], unit='s', utc=True),
+        'main': [s['weather'][0]['main'] for s in steps],
+        'description': [s['weather'][0]['description'] for s in steps],
+        'temp': [float(s['main']['temp']) for s in steps],
+    })
+    return df.sort_values('time', ignore_index=True)
+
+
+def hourly_forecast(steps, city, now=None, hours=FORECAST_HOURS):
+    """
+    Langkah forecast -> satu baris per jam dari jam sekarang (UTC) sampai `hours` ke depan.
+    Tiap jam memakai langkah terdekat (<= FORECAST_STEP); jam tanpa langkah (forecast basi / kosong) = DEFAULT_WEATHER.
+    """
+    start = pd.Timestamp(now or pd.Timestamp.now(tz='UTC')).tz_convert('UTC').floor('h')
+    df = pd.DataFrame({'time': pd.date_range(start, periods=hours, freq='h').astype('datetime64[ns, UTC]')})
+    if steps is not None and not steps.empty:
+        steps = steps.astype({'time': 'datetime64[ns, UTC]'})
+        df = pd.merge_asof(df, steps, on='time', direction='nearest', tolerance=FORECAST_STEP)
+    for column, value in DEFAULT_WEATHER.items():
+        df[column] = df[column].fillna(value) if column in df else value
+    df['city'] = city
+    df['weather_class'] = df['main'].map(weather_class)
+    return df[WEATHER_FORECAST_SCHEMA.names]
+
+
+def write_forecast(df, path):
+    pq.write_table(pa.Table.from_pandas(df, schema=WEATHER_FORECAST_SCHEMA, preserve_index=False), path)
+
+
+class WeatherForecast:
+    """
+    Lookup O(1) cuaca per (kota, jam):
+
+        forecast = WeatherForecast(df)
+        forecast.at('banjarmasin', when)   # {'main', 'description', 'temp', 'weather_class'} atau None
+    """
+    def __init__(self, df=None):
+        df = df if df is not None else pd.DataFrame(columns=WEATHER_FORECAST_SCHEMA.names)
+        times = pd.to_datetime(df['time'], utc=True)
+        values = df[['main', 'description', 'temp', 'weather_class']].to_dict('records')
+        self._hours = dict(zip(zip(df['city'], times), values))
+
+    @classmethod
+    def from_parquet(cls, path):
+        return cls(pq.read_table(path).to_pandas())
+
+    def __len__(self):
+        return len(self._hours)
+
+    def at(self, city, when):
+        return self._hours.get((city, pd.Timestamp(when).tz_convert('UTC').floor('h')))